@@ -0,0 +1,167 @@
+import asyncio
+import collections
+import time
+from typing import Deque, Iterable, Optional
+
+from starlette.responses import JSONResponse
+
+from app.core.metrics import REGISTRY
+
+READ = "read"
+WRITE = "write"
+_READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+ADMISSION_ACTIVE = REGISTRY.gauge(
+    "admission_active_requests",
+    "Requests admitted and currently being handled, by class (read or write).",
+    ["class"],
+)
+ADMISSION_QUEUE_DEPTH = REGISTRY.gauge(
+    "admission_queue_depth",
+    "Requests waiting for admission, by class.",
+    ["class"],
+)
+ADMISSION_SHED = REGISTRY.counter(
+    "admission_shed_total",
+    "Requests rejected with 503, by class and reason (queue_full or timeout).",
+    ["class", "reason"],
+)
+ADMISSION_WAIT_SECONDS = REGISTRY.histogram(
+    "admission_wait_seconds",
+    "Time admitted requests spent queued before being handled, by class.",
+    ["class"],
+)
+
+
+class _RequestClass:
+    __slots__ = ("name", "limit", "max_queue", "active", "waiters")
+
+    def __init__(self, name: str, limit: int, max_queue: int):
+        self.name = name
+        self.limit = max(1, limit)
+        self.max_queue = max(0, max_queue)
+        self.active = 0
+        self.waiters: Deque["asyncio.Future[None]"] = collections.deque()
+
+
+class AdmissionController:
+    """
+    Bounded concurrency and queue depth per request class.
+
+    A request is handled at once if its class has a free slot, waits in a FIFO queue
+    if not, and is shed when the queue is full or it has waited longer than
+    queue_timeout. Reads take priority: a queued write is only admitted while no
+    read is waiting, so a burst of writes can't hold up the interactive views.
+
+    All state is touched only from the event loop, so no locking is needed.
+    """
+
+    def __init__(self, read_limit: int, read_queue: int, write_limit: int, write_queue: int,
+                 queue_timeout: float):
+        self.classes = {
+            READ: _RequestClass(READ, read_limit, read_queue),
+            WRITE: _RequestClass(WRITE, write_limit, write_queue),
+        }
+        self.queue_timeout = queue_timeout
+
+    def _can_start(self, request_class: _RequestClass) -> bool:
+        if request_class.active >= request_class.limit:
+            return False
+        return request_class.name == READ or not self.classes[READ].waiters
+
+    async def acquire(self, name: str) -> Optional[str]:
+        """Wait for a slot in the class. Returns None once admitted, or the reason it was shed."""
+        request_class = self.classes[name]
+        if not request_class.waiters and self._can_start(request_class):
+            request_class.active += 1
+            ADMISSION_ACTIVE.set(request_class.active, name)
+            return None
+
+        if len(request_class.waiters) >= request_class.max_queue:
+            ADMISSION_SHED.inc(name, "queue_full")
+            return "queue_full"
+
+        waiter = asyncio.get_running_loop().create_future()
+        request_class.waiters.append(waiter)
+        ADMISSION_QUEUE_DEPTH.set(len(request_class.waiters), name)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if not waiter.done():
+                self._remove_waiter(request_class, waiter)
+                ADMISSION_SHED.inc(name, "timeout")
+                return "timeout"
+        except asyncio.CancelledError:
+            # The client went away while queued; give back a slot handed to it meanwhile
+            if waiter.done():
+                self.release(name)
+            else:
+                self._remove_waiter(request_class, waiter)
+            raise
+        ADMISSION_WAIT_SECONDS.observe(time.perf_counter() - start, name)
+        return None
+
+    def release(self, name: str):
+        request_class = self.classes[name]
+        request_class.active -= 1
+        ADMISSION_ACTIVE.set(request_class.active, name)
+        self._dispatch()
+
+    def _remove_waiter(self, request_class: _RequestClass, waiter: "asyncio.Future[None]"):
+        request_class.waiters.remove(waiter)
+        waiter.cancel()
+        ADMISSION_QUEUE_DEPTH.set(len(request_class.waiters), request_class.name)
+        # A read leaving the queue may unblock writes held back for it
+        self._dispatch()
+
+    def _dispatch(self):
+        """Hand free slots to queued requests, reads first."""
+        for request_class in (self.classes[READ], self.classes[WRITE]):
+            while request_class.waiters and self._can_start(request_class):
+                waiter = request_class.waiters.popleft()
+                request_class.active += 1
+                waiter.set_result(None)
+                ADMISSION_ACTIVE.set(request_class.active, request_class.name)
+                ADMISSION_QUEUE_DEPTH.set(len(request_class.waiters), request_class.name)
+
+
+class AdmissionControlMiddleware:
+    """
+    ASGI middleware that applies an AdmissionController to every HTTP request.
+
+    GET/HEAD/OPTIONS requests are reads and everything else is a write. Requests
+    that can't be admitted get an immediate 503 with a Retry-After header instead
+    of piling up behind the single data file, so latency stays bounded under a
+    burst and clients know when to come back. Paths in `exempt_paths` (health
+    checks, /metrics) are never queued.
+    """
+
+    def __init__(self, app, read_limit: int = 64, read_queue: int = 256, write_limit: int = 4,
+                 write_queue: int = 32, queue_timeout: float = 10.0, retry_after: int = 1,
+                 exempt_paths: Iterable[str] = ("/", "/metrics")):
+        self.app = app
+        self.controller = AdmissionController(read_limit, read_queue, write_limit, write_queue, queue_timeout)
+        self.retry_after = retry_after
+        self.exempt_paths = set(exempt_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        name = READ if scope["method"] in _READ_METHODS else WRITE
+        shed_reason = await self.controller.acquire(name)
+        if shed_reason is not None:
+            response = JSONResponse(
+                {"detail": "Server is busy, please retry shortly"},
+                status_code=503,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(name)
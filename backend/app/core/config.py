@@ -0,0 +1,89 @@
+from decouple import config
+
+# Application settings, read from environment variables or a .env file in backend/.
+# Every setting has a safe default so `uvicorn app.main:app --reload` works unchanged.
+
+# Minimum level for the structured JSON logs (DEBUG also logs every data file read)
+LOG_LEVEL = config("LOG_LEVEL", default="INFO")
+
+# Parse each version of the data once for all uvicorn worker processes, which then
+# decode a memory-mapped snapshot of it instead of the JSON - each into its own copy
+# (see app/services/shared_snapshot.py).
+# start.py --prod turns this on automatically when running several workers.
+SHARED_SNAPSHOT_ENABLED = config("SHARED_SNAPSHOT_ENABLED", default=False, cast=bool)
+SHARED_SNAPSHOT_DIR = config("SHARED_SNAPSHOT_DIR", default="data/.shared")
+
+# Uploaded document contents, stored once per unique file (see app/services/blob_store.py)
+BLOB_STORE_DIR = config("BLOB_STORE_DIR", default="data/blobs")
+# Largest accepted document upload, in bytes (default 2 GB)
+DOCUMENT_MAX_UPLOAD_BYTES = config("DOCUMENT_MAX_UPLOAD_BYTES", default=2 * 1024 ** 3, cast=int)
+
+# Append-only history of every bid revision, one file per category (see app/services/bid_history.py)
+BID_HISTORY_DIR = config("BID_HISTORY_DIR", default="data/bid_history")
+
+# Incremental point-in-time snapshots of the data file (see app/services/snapshot_store.py).
+# One is taken before every project deletion; manage them with `python snapshots.py`.
+SNAPSHOT_DIR = config("SNAPSHOT_DIR", default="data/snapshots")
+# Retention: the newest N snapshots, plus the newest of each of the last N days
+SNAPSHOT_KEEP_LAST = config("SNAPSHOT_KEEP_LAST", default=50, cast=int)
+SNAPSHOT_KEEP_DAILY = config("SNAPSHOT_KEEP_DAILY", default=14, cast=int)
+
+# Log of every record change with a sequence number, for /api/changes (see
+# app/services/change_log.py). Once it holds more than CHANGE_LOG_MAX_ENTRIES changes
+# the older half is dropped, and clients that synced before that do a full resync.
+CHANGE_LOG_DIR = config("CHANGE_LOG_DIR", default="data/changes")
+CHANGE_LOG_MAX_ENTRIES = config("CHANGE_LOG_MAX_ENTRIES", default=100_000, cast=int)
+
+# Most ids one batch read (/api/vendors?ids=, /api/categories/batch?ids=) accepts
+BATCH_MAX_IDS = config("BATCH_MAX_IDS", default=500, cast=int)
+
+# Idempotency-Key support for creates and bulk invites (see app/core/idempotency.py).
+# Responses are kept for IDEMPOTENCY_TTL_SECONDS, at most IDEMPOTENCY_MAX_KEYS of them,
+# so a retry within that window gets the original response instead of running again.
+IDEMPOTENCY_ENABLED = config("IDEMPOTENCY_ENABLED", default=True, cast=bool)
+IDEMPOTENCY_DIR = config("IDEMPOTENCY_DIR", default="data/idempotency")
+IDEMPOTENCY_TTL_SECONDS = config("IDEMPOTENCY_TTL_SECONDS", default=24 * 3600, cast=int)
+IDEMPOTENCY_MAX_KEYS = config("IDEMPOTENCY_MAX_KEYS", default=10_000, cast=int)
+
+# Bid tabulation reports (see app/services/bid_tab.py), generated by REPORT_WORKERS
+# lower-priority processes and kept in REPORT_DIR until the bids they show change.
+# A request waits up to REPORT_WAIT_SECONDS for a report; after that it gets a 202
+# with Retry-After and the report finishes in the background.
+REPORT_DIR = config("REPORT_DIR", default="data/reports")
+REPORT_WORKERS = config("REPORT_WORKERS", default=1, cast=int)
+REPORT_WAIT_SECONDS = config("REPORT_WAIT_SECONDS", default=10.0, cast=float)
+REPORT_RETRY_AFTER = config("REPORT_RETRY_AFTER", default=2, cast=int)
+
+# Score (0-1) from which a vendor counts as a likely duplicate of another: name similarity
+# plus matching phone, company email domain and zip (see app/services/vendor_service.py)
+VENDOR_DUPLICATE_THRESHOLD = config("VENDOR_DUPLICATE_THRESHOLD", default=0.5, cast=float)
+
+# Run identical concurrent reads of a project or a quote comparison once and share
+# the result (see app/core/single_flight.py)
+REQUEST_COALESCING_ENABLED = config("REQUEST_COALESCING_ENABLED", default=True, cast=bool)
+
+# Admission control (see app/core/admission.py). Reads (GET) and writes (everything
+# else) each get a number of concurrent requests and a queue; requests that find the
+# queue full, or wait longer than ADMISSION_QUEUE_TIMEOUT seconds, get a 503 with
+# Retry-After. Queued reads are admitted before queued writes.
+ADMISSION_CONTROL_ENABLED = config("ADMISSION_CONTROL_ENABLED", default=True, cast=bool)
+ADMISSION_READ_CONCURRENCY = config("ADMISSION_READ_CONCURRENCY", default=64, cast=int)
+ADMISSION_READ_QUEUE = config("ADMISSION_READ_QUEUE", default=256, cast=int)
+# Writes lock only the partitions they touch, so writes to different project groups
+# run in parallel; creates and vendor writes still share a partition and go one at a time
+ADMISSION_WRITE_CONCURRENCY = config("ADMISSION_WRITE_CONCURRENCY", default=4, cast=int)
+ADMISSION_WRITE_QUEUE = config("ADMISSION_WRITE_QUEUE", default=32, cast=int)
+ADMISSION_QUEUE_TIMEOUT = config("ADMISSION_QUEUE_TIMEOUT", default=10.0, cast=float)
+ADMISSION_RETRY_AFTER = config("ADMISSION_RETRY_AFTER", default=1, cast=int)
+
+# On-demand request profiling (see app/core/profiling.py).
+# When PROFILING_ENABLED is false the profiling middleware is not installed at all.
+PROFILING_ENABLED = config("PROFILING_ENABLED", default=False, cast=bool)
+# Secret that activates profiling for one request via the X-Profile header or ?__profile= query flag.
+# Left empty, only sampling can trigger a profile.
+PROFILING_TOKEN = config("PROFILING_TOKEN", default="")
+# Profile one in every N requests automatically (0 disables sampling)
+PROFILING_SAMPLE_EVERY = config("PROFILING_SAMPLE_EVERY", default=0, cast=int)
+PROFILING_OUTPUT_DIR = config("PROFILING_OUTPUT_DIR", default="data/profiles")
+# Newest profiles to keep on disk; older ones are deleted after each capture
+PROFILING_MAX_FILES = config("PROFILING_MAX_FILES", default=50, cast=int)
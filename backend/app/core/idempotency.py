@@ -0,0 +1,148 @@
+import hashlib
+import re
+from typing import Iterable, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, Response
+
+from app.core.metrics import REGISTRY
+from app.services.idempotency import IN_PROGRESS, PROCEED, REPLAY, IdempotencyStore
+
+IDEMPOTENCY_HEADER = b"idempotency-key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+IDEMPOTENT_REQUESTS = REGISTRY.counter(
+    "idempotency_requests_total",
+    "Requests sent with an Idempotency-Key, by result: executed, replayed (the stored "
+    "response was returned), in_progress (409) or mismatch (422).",
+    ["result"],
+)
+
+# Response headers worth replaying; the rest (content-length, date, request ids) belong to each response
+_REPLAYED_HEADERS = {"content-type", "location"}
+
+
+class IdempotencyMiddleware:
+    """
+    ASGI middleware that makes requests carrying an Idempotency-Key header safe to retry.
+
+    For the methods and paths it covers, the first request with a key runs as usual
+    and its response is stored in an IdempotencyStore. A retry with the same key and
+    the same request (method, path, query and body) gets the stored response back,
+    marked with an Idempotent-Replayed header, without running again. A retry that
+    arrives while the first request is still running gets 409 with Retry-After; the
+    same key sent with a different request gets 422. Server errors aren't stored, so
+    a request that failed with a 5xx runs again when retried.
+
+    Requests without the header, and paths not covered, pass straight through.
+    """
+
+    def __init__(self, app, store: IdempotencyStore, paths: Iterable[str], methods: Iterable[str] = ("POST",),
+                 retry_after: int = 1):
+        self.app = app
+        self.store = store
+        self.paths = [re.compile(f"^{path}$") for path in paths]
+        self.methods = set(methods)
+        self.retry_after = retry_after
+
+    def _key(self, scope) -> Optional[str]:
+        if scope["type"] != "http" or scope["method"] not in self.methods:
+            return None
+        if not any(path.match(scope["path"]) for path in self.paths):
+            return None
+        for name, value in scope["headers"]:
+            if name == IDEMPOTENCY_HEADER:
+                return value.decode("latin-1").strip()
+        return None
+
+    async def __call__(self, scope, receive, send):
+        key = self._key(scope)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not 0 < len(key) <= MAX_KEY_LENGTH:
+            response = JSONResponse({"detail": f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters"},
+                                    status_code=400)
+            await response(scope, receive, send)
+            return
+
+        # The body is part of what makes two requests the same, so read it up front
+        chunks = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunks.append(message.get("body", b""))
+            more_body = message.get("more_body", False)
+        body = b"".join(chunks)
+        fingerprint = hashlib.sha256(b"\0".join((
+            scope["method"].encode(), scope["path"].encode(), scope.get("query_string", b""), body,
+        ))).hexdigest()
+
+        result, record = await run_in_threadpool(self.store.begin, key, fingerprint)
+        if result != PROCEED:
+            await self._respond_without_running(result, record, scope, receive, send)
+            return
+        IDEMPOTENT_REQUESTS.inc("executed")
+
+        body_sent = False
+
+        async def replay_receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        status = 500
+        headers: List[Tuple[str, str]] = []
+        response_chunks = []
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers.extend((name.decode("latin-1").lower(), value.decode("latin-1"))
+                               for name, value in message.get("headers", [])
+                               if name.decode("latin-1").lower() in _REPLAYED_HEADERS)
+            elif message["type"] == "http.response.body":
+                response_chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, send_wrapper)
+        except BaseException:
+            await run_in_threadpool(self.store.release, key)
+            raise
+
+        try:
+            response_body = b"".join(response_chunks).decode("utf-8")
+        except UnicodeDecodeError:
+            response_body = None
+        if status >= 500 or response_body is None:
+            await run_in_threadpool(self.store.release, key)
+        else:
+            await run_in_threadpool(self.store.complete, key, fingerprint, status, headers, response_body)
+
+    async def _respond_without_running(self, result, record, scope, receive, send):
+        if result == REPLAY:
+            IDEMPOTENT_REQUESTS.inc("replayed")
+            stored = record["response"]
+            response = Response(stored["body"].encode("utf-8"), status_code=stored["status"],
+                                headers={**dict(stored["headers"]), REPLAYED_HEADER: "true"})
+        elif result == IN_PROGRESS:
+            IDEMPOTENT_REQUESTS.inc("in_progress")
+            response = JSONResponse(
+                {"detail": "A request with this Idempotency-Key is still being processed"},
+                status_code=409,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+        else:  # MISMATCH
+            IDEMPOTENT_REQUESTS.inc("mismatch")
+            response = JSONResponse(
+                {"detail": "This Idempotency-Key was already used for a different request"},
+                status_code=422,
+            )
+        await response(scope, receive, send)
@@ -0,0 +1,177 @@
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import re
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+# Request correlation state. Context variables follow each request through
+# awaits and into run_in_threadpool calls, so DataService logs carry the id too.
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+request_start_var: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("request_start", default=None)
+request_timings_var: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar(
+    "request_timings", default=None
+)
+
+REQUEST_ID_HEADER = b"x-request-id"
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{1,64}$")
+
+# Attributes every LogRecord has - anything else came in through `extra=` and is logged as a field
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def add_request_timing(name: str, seconds: float):
+    """
+    Add time spent in a named phase (e.g. "storageRead") to the current request.
+    The totals are reported on the request's completion log entry.
+    """
+    timings = request_timings_var.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats each record as one JSON object per line.
+    Fields passed with `extra={...}` become top-level keys, and the current
+    request id and elapsed request time are added automatically.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+
+        request_id = request_id_var.get()
+        if request_id is not None:
+            entry["requestId"] = request_id
+            start = request_start_var.get()
+            if start is not None:
+                entry["requestElapsedMs"] = round((time.perf_counter() - start) * 1000, 3)
+
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class _PreformattedQueueHandler(logging.handlers.QueueHandler):
+    """
+    Formats the record to JSON in the calling thread - where the request's context
+    variables are visible - and hands only the finished line to the queue.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        line = self.format(record)
+        record = logging.makeLogRecord({"name": record.name, "levelno": record.levelno,
+                                        "levelname": record.levelname, "msg": line})
+        return record
+
+
+def setup_logging(level: str = "INFO"):
+    """
+    Route all app logs through a queue to a background writer thread.
+    Request handlers only pay for formatting and a queue put; the stream write
+    happens on the listener thread, so a slow stdout or log collector never
+    blocks the event loop. Safe to call more than once.
+    """
+    global _listener
+    root = logging.getLogger("app")
+    root.setLevel(level.upper())
+    if _listener is not None:
+        return
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    queue_handler = _PreformattedQueueHandler(log_queue)
+    queue_handler.setFormatter(JsonFormatter())
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(logging.Formatter("%(message)s"))
+
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=False)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    root.addHandler(queue_handler)
+    # App records are complete JSON lines; don't let them be re-printed by the root logger
+    root.propagate = False
+
+
+def _request_id_from(scope) -> str:
+    for name, value in scope.get("headers", ()):
+        if name == REQUEST_ID_HEADER:
+            candidate = value.decode("latin-1")
+            if _VALID_REQUEST_ID.match(candidate):
+                return candidate
+            break
+    return uuid.uuid4().hex
+
+
+class RequestContextMiddleware:
+    """
+    ASGI middleware that gives every request an id and logs its completion.
+    The id comes from the caller's X-Request-ID header when it is well-formed,
+    otherwise a new one is generated; either way it is echoed in the response.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.logger = logging.getLogger("app.request")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = _request_id_from(scope)
+        start = time.perf_counter()
+        timings: Dict[str, float] = {}
+        tokens = (
+            request_id_var.set(request_id),
+            request_start_var.set(start),
+            request_timings_var.set(timings),
+        )
+        status_holder = {"status": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder["status"] = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((REQUEST_ID_HEADER, request_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            self.logger.exception("request failed", extra={"method": scope["method"], "path": scope["path"]})
+            raise
+        finally:
+            fields = {
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": getattr(scope.get("route"), "path", None),
+                "status": status_holder["status"],
+                "durationMs": round((time.perf_counter() - start) * 1000, 3),
+            }
+            fields.update({f"{name}Ms": round(seconds * 1000, 3) for name, seconds in timings.items()})
+            level = logging.ERROR if status_holder["status"] >= 500 else logging.INFO
+            self.logger.log(level, "request completed", extra=fields)
+
+            request_timings_var.reset(tokens[2])
+            request_start_var.reset(tokens[1])
+            request_id_var.reset(tokens[0])
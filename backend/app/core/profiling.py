@@ -0,0 +1,226 @@
+import cProfile
+import contextvars
+import hmac
+import itertools
+import os
+import pstats
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import unquote_plus
+
+from starlette.concurrency import run_in_threadpool
+
+# A pstats function key: (filename, line number, function name)
+FunctionKey = Tuple[str, int, str]
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_QUERY_FLAG = "__profile"
+
+# Recursion guard for very deep call graphs when folding stacks
+MAX_STACK_DEPTH = 128
+
+# Profiles of the worker-thread calls made for the request being profiled (see profiled_call)
+_thread_profiles: contextvars.ContextVar[Optional[List[cProfile.Profile]]] = contextvars.ContextVar(
+    "thread_profiles", default=None
+)
+
+
+def profiled_call(fn: Callable[..., Any], *args: Any) -> Any:
+    """
+    Call fn(*args) in a worker thread, under a profiler of its own if the request
+    that handed it over is being profiled. cProfile only sees the thread it was
+    enabled in, so work sent to the threadpool through run_in_threadpool(profiled_call, ...)
+    is captured this way and merged into the request's profile.
+    """
+    profiles = _thread_profiles.get()
+    if profiles is None:
+        return fn(*args)
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        return fn(*args)
+    finally:
+        profile.disable()
+        # Added once finished, so a call that outlives the request is never saved half-way
+        profiles.append(profile)
+
+
+def _frame_label(func: FunctionKey) -> str:
+    filename, lineno, name = func
+    if filename == "~":
+        # Built-ins have no file, e.g. "<built-in method builtins.sorted>"
+        label = name
+    else:
+        label = f"{name} ({os.path.basename(filename)}:{lineno})"
+    # Semicolons separate frames in the collapsed format
+    return label.replace(";", ",")
+
+
+def collapse_stats(stats: pstats.Stats) -> List[str]:
+    """
+    Fold cProfile's caller/callee graph into collapsed stacks ("a;b;c <microseconds>").
+    This is the input format of flamegraph.pl, speedscope and most flame graph viewers.
+
+    cProfile records call edges, not full stacks, so time below a function that is
+    reached from several callers is split proportionally to each caller's share.
+    """
+    entries = stats.stats
+    children: Dict[FunctionKey, List[Tuple[FunctionKey, float]]] = {}
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller, edge in callers.items():
+            # edge is (primitive calls, calls, own time, cumulative time) for this caller
+            children.setdefault(caller, []).append((func, edge[3]))
+
+    roots = [func for func, (_, _, _, _, callers) in entries.items() if not callers]
+    folded: Dict[str, float] = {}
+
+    def walk(func: FunctionKey, budget: float, path: Tuple[FunctionKey, ...], labels: str):
+        _, _, own_time, cumulative, _ = entries[func]
+        scale = budget / cumulative if cumulative > 0 else 0.0
+        self_time = own_time * scale
+        if self_time > 0:
+            folded[labels] = folded.get(labels, 0.0) + self_time
+        if len(path) >= MAX_STACK_DEPTH:
+            return
+        for child, edge_time in children.get(func, ()):
+            if child in path or edge_time <= 0:
+                continue  # Recursion - its time is already counted in this stack
+            walk(child, edge_time * scale, path + (child,), f"{labels};{_frame_label(child)}")
+
+    for root in roots:
+        walk(root, entries[root][3], (root,), _frame_label(root))
+
+    lines = []
+    for stack, seconds in sorted(folded.items()):
+        microseconds = int(round(seconds * 1_000_000))
+        if microseconds > 0:
+            lines.append(f"{stack} {microseconds}")
+    return lines
+
+
+class ProfileStore:
+    """
+    Writes captured profiles to a directory and keeps only the newest ones.
+    Each capture produces a .prof file (for pstats/snakeviz) and a .collapsed file (for flame graphs).
+    """
+
+    def __init__(self, output_dir: str, max_files: int):
+        self.output_dir = output_dir
+        self.max_files = max(1, max_files)
+        self._lock = threading.Lock()
+
+    def new_capture_name(self, method: str, path: str) -> str:
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", path).strip("_") or "root"
+        millis = int(time.time() * 1000) % 1000
+        return f"{time.strftime('%Y%m%d-%H%M%S')}-{millis:03d}_{method}_{slug}"
+
+    def save(self, profiles: List[cProfile.Profile], name: str):
+        """Save the profiles of one request - its event loop and worker threads - as one capture."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, name)
+
+        stats = pstats.Stats(*profiles)
+        stats.dump_stats(base + ".prof")
+        with open(base + ".collapsed", "w", encoding="utf-8") as file:
+            file.write("\n".join(collapse_stats(stats)) + "\n")
+
+        self._prune()
+
+    def _prune(self):
+        with self._lock:
+            captures: Dict[str, float] = {}
+            for filename in os.listdir(self.output_dir):
+                stem, ext = os.path.splitext(filename)
+                if ext in (".prof", ".collapsed"):
+                    path = os.path.join(self.output_dir, filename)
+                    captures[stem] = max(captures.get(stem, 0.0), os.path.getmtime(path))
+
+            expired = sorted(captures, key=captures.get, reverse=True)[self.max_files:]
+            for stem in expired:
+                for ext in (".prof", ".collapsed"):
+                    try:
+                        os.remove(os.path.join(self.output_dir, stem + ext))
+                    except FileNotFoundError:
+                        pass
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that captures a cProfile profile of selected requests.
+
+    A request is profiled when it carries the configured token in the X-Profile header
+    or the ?__profile= query flag, or when it is the Nth request under 1-in-N sampling.
+    Only add this middleware when profiling is enabled - when it is not installed,
+    requests pay nothing for it.
+
+    cProfile follows the event loop thread, so other requests interleaving with the
+    profiled one on the same loop can show up in its stacks. Work the request hands
+    to the threadpool runs in other threads and is only captured when it goes
+    through profiled_call, as coalesced reads (SingleFlight) do; each such call is
+    profiled on its own and merged into the capture, as a separate root. Other
+    threadpool work shows up only as the time the event loop spent waiting for it.
+    Only one request is profiled at a time; triggers that arrive meanwhile are
+    served unprofiled.
+    """
+
+    def __init__(self, app, output_dir: str, token: str = "", sample_every: int = 0, max_files: int = 50):
+        self.app = app
+        self.token = token.encode("utf-8")
+        self.sample_every = max(0, sample_every)
+        self.store = ProfileStore(output_dir, max_files)
+        self._counter = itertools.count(1)
+        self._active = threading.Lock()
+
+    def _token_matches(self, value: bytes) -> bool:
+        return hmac.compare_digest(value, self.token)
+
+    def _requested(self, scope) -> bool:
+        if self.token:
+            for name, value in scope.get("headers", ()):
+                if name == PROFILE_HEADER and self._token_matches(value):
+                    return True
+            query = scope.get("query_string", b"").decode("latin-1")
+            if PROFILE_QUERY_FLAG in query:
+                for pair in query.split("&"):
+                    key, _, value = pair.partition("=")
+                    if key == PROFILE_QUERY_FLAG and self._token_matches(unquote_plus(value).encode("utf-8")):
+                        return True
+        if self.sample_every:
+            return next(self._counter) % self.sample_every == 0
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        if not self._active.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            name = self.store.new_capture_name(scope["method"], scope["path"])
+
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    # Tell the caller which capture to look for in the profile directory
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-profile-id", name.encode("latin-1")))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            thread_profiles: List[cProfile.Profile] = []
+            token = _thread_profiles.set(thread_profiles)
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                profile.disable()
+                _thread_profiles.reset(token)
+
+            await run_in_threadpool(self.store.save, [profile, *thread_profiles], name)
+        finally:
+            self._active.release()
@@ -0,0 +1,63 @@
+import asyncio
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.metrics import REGISTRY
+from app.core.profiling import profiled_call
+
+SINGLE_FLIGHT_REQUESTS = REGISTRY.counter(
+    "single_flight_requests_total",
+    "Coalesced read requests by route: executed (computed the result) or coalesced "
+    "(shared the result of an identical request already in flight).",
+    ["route", "result"],
+)
+
+
+class SingleFlight:
+    """
+    Runs identical concurrent computations once and shares the result.
+
+    The first request for a key starts the computation in the threadpool; requests
+    for the same key that arrive while it is running wait for it instead of doing
+    the same work again. Nothing is kept once it finishes - this is not a cache, so
+    callers put the data version in the key and a request never gets a result built
+    from data older than what it could already see.
+
+    Coalescing is per worker process and per event loop, which is where the
+    duplicate work happens.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._calls: Dict[Tuple[str, Hashable], "asyncio.Future[Any]"] = {}
+
+    async def run(self, route: str, key: Hashable, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Return fn(*args), computed in the threadpool, shared with every concurrent
+        call for the same route and key. Exceptions are shared the same way.
+        The result is handed to every caller as-is, so treat it as read-only.
+        """
+        if not self.enabled:
+            return await run_in_threadpool(profiled_call, fn, *args)
+
+        call_key = (route, key)
+        call = self._calls.get(call_key)
+        if call is None:
+            # The task copies this request's context, so a profiled request profiles the call
+            call = asyncio.ensure_future(run_in_threadpool(profiled_call, fn, *args))
+            self._calls[call_key] = call
+            call.add_done_callback(lambda done: self._finished(call_key, done))
+            SINGLE_FLIGHT_REQUESTS.inc(route, "executed")
+        else:
+            SINGLE_FLIGHT_REQUESTS.inc(route, "coalesced")
+
+        # A client disconnecting cancels only its own wait, not the shared computation
+        return await asyncio.shield(call)
+
+    def _finished(self, call_key: Tuple[str, Hashable], call: "asyncio.Future[Any]"):
+        if self._calls.get(call_key) is call:
+            del self._calls[call_key]
+        if not call.cancelled():
+            # Mark the exception as retrieved even if every waiter went away
+            call.exception()
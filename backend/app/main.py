@@ -1,16 +1,113 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Dict, Any
-from app.services.data_service import DataService
-from datetime import datetime
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Optional, Set, Tuple
+import asyncio
+import logging
+import os
+import time
+from app.core import config
+from app.core.admission import AdmissionControlMiddleware
+from app.core.idempotency import IdempotencyMiddleware
+from app.core.log import RequestContextMiddleware, setup_logging
+from app.core.metrics import REGISTRY, MetricsMiddleware
+from app.core.profiling import ProfilingMiddleware
+from app.core.single_flight import SingleFlight
+from app.services import award_optimizer
+from app.services.bid_tab import FORMATS as REPORT_FORMATS, BidTabReports, ReportNotReadyError
+from app.services.blob_store import BlobStore, UploadTooLargeError
+from app.services.change_log import ChangeLog
+from app.services.idempotency import IdempotencyStore
+from app.services.data_service import ACTIVE_PROJECT_STATUSES, COMPLETED_PROJECT_STATUS, DataService
+from app.services.snapshot_store import SnapshotNotFoundError, SnapshotStore
+from app.services.vendor_service import DuplicateVendorError
+from datetime import datetime, timezone
+
+# When this worker started importing the app - used to report startup time
+_IMPORT_STARTED = time.perf_counter()
+
+# Structured JSON logs, written from a background thread
+setup_logging(config.LOG_LEVEL)
+logger = logging.getLogger("app.api")
+
+# Initialize the data service
+data_service = DataService(
+    shared_snapshot_dir=config.SHARED_SNAPSHOT_DIR if config.SHARED_SNAPSHOT_ENABLED else None,
+    bid_history_dir=config.BID_HISTORY_DIR,
+    snapshots=SnapshotStore(config.SNAPSHOT_DIR, keep_last=config.SNAPSHOT_KEEP_LAST,
+                            keep_daily=config.SNAPSHOT_KEEP_DAILY),
+    change_log=ChangeLog(config.CHANGE_LOG_DIR, max_entries=config.CHANGE_LOG_MAX_ENTRIES)
+)
+
+# Uploaded document contents, stored once per unique file
+blob_store = BlobStore(config.BLOB_STORE_DIR)
+
+# Shares one computation between identical concurrent reads
+single_flight = SingleFlight(enabled=config.REQUEST_COALESCING_ENABLED)
+
+# Bid tabulation reports, generated in worker processes and cached on disk
+bid_tab_reports = BidTabReports(config.REPORT_DIR, workers=config.REPORT_WORKERS)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Warm the data cache before the worker starts accepting requests,
+    so the first user doesn't pay for reading and parsing the data file.
+    """
+    warm_seconds = data_service.warm_cache()
+    fields = {
+        "pid": os.getpid(),
+        "cacheWarmMs": round(warm_seconds * 1000, 3),
+        "workerStartupMs": round((time.perf_counter() - _IMPORT_STARTED) * 1000, 3),
+    }
+    # start.py records when the launch began, so the full cold start can be reported
+    launch_started = os.environ.get("APP_LAUNCH_STARTED")
+    if launch_started:
+        fields["launchToReadyMs"] = round((time.time() - float(launch_started)) * 1000, 3)
+    logger.info("worker ready", extra=fields)
+    yield
+    bid_tab_reports.shutdown()
 
 # Create the FastAPI application
 app = FastAPI(
     title="Construction Management API",
     description="API for managing construction projects, vendors, and bidding processes",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Retries of creates and bulk invites that carry an Idempotency-Key get the original
+# response instead of running again. Innermost, so a request shed by admission
+# control never claims its key.
+if config.IDEMPOTENCY_ENABLED:
+    app.add_middleware(
+        IdempotencyMiddleware,
+        store=IdempotencyStore(config.IDEMPOTENCY_DIR, max_entries=config.IDEMPOTENCY_MAX_KEYS,
+                               ttl=config.IDEMPOTENCY_TTL_SECONDS),
+        paths=[
+            "/api/projects",
+            "/api/projects/from-template",
+            "/api/vendors",
+            r"/api/categories/\d+/vendors/bulk-invite",
+        ],
+    )
+
+# Bound concurrent reads and writes and shed the excess with 503 + Retry-After.
+# Added first so it runs inside CORS, metrics and request logging: rejected
+# requests still get CORS headers and are counted and logged.
+if config.ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        read_limit=config.ADMISSION_READ_CONCURRENCY,
+        read_queue=config.ADMISSION_READ_QUEUE,
+        write_limit=config.ADMISSION_WRITE_CONCURRENCY,
+        write_queue=config.ADMISSION_WRITE_QUEUE,
+        queue_timeout=config.ADMISSION_QUEUE_TIMEOUT,
+        retry_after=config.ADMISSION_RETRY_AFTER,
+    )
+
 # Configure CORS to allow your React frontend to communicate with this backend
 app.add_middleware(
     CORSMiddleware,
@@ -20,8 +117,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize the data service
-data_service = DataService()
+# Record per-route latency and in-flight requests for /metrics
+app.add_middleware(MetricsMiddleware)
+
+# Tag every request with an id (X-Request-ID) and log its status and timings
+app.add_middleware(RequestContextMiddleware)
+
+# Opt-in request profiling - only installed when enabled, so it costs nothing otherwise
+if config.PROFILING_ENABLED:
+    app.add_middleware(
+        ProfilingMiddleware,
+        output_dir=config.PROFILING_OUTPUT_DIR,
+        token=config.PROFILING_TOKEN,
+        sample_every=config.PROFILING_SAMPLE_EVERY,
+        max_files=config.PROFILING_MAX_FILES,
+    )
 
 @app.get("/")
 async def root():
@@ -31,85 +141,236 @@ async def root():
     """
     return {"message": "Construction Management API is running"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Expose request, storage and cache metrics in the Prometheus text format.
+    Point a Prometheus scrape job at this endpoint to see where time goes.
+    """
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+def _sparse_fieldset(fields: Optional[str], include: Optional[str], allowed: List[str],
+                     default: List[str]) -> Tuple[Optional[Set[str]], Set[str]]:
+    """
+    Parse the fields= and include= query parameters of a read endpoint.
+    fields is a comma-separated list of top-level fields to return (None = all).
+    include lists the embeddings to compute (absent = the endpoint's defaults,
+    empty = none). An embedding that fields leaves out is not computed either.
+    """
+    selected = {f.strip() for f in fields.split(",") if f.strip()} if fields is not None else None
+    included = {i.strip() for i in include.split(",") if i.strip()} if include is not None else set(default)
+    unknown = included - set(allowed)
+    if unknown:
+        raise HTTPException(status_code=400,
+                            detail=f"Unknown include: {', '.join(sorted(unknown))}. Allowed: {', '.join(allowed)}")
+    if selected is not None:
+        # A nested embedding such as categories.vendors needs its parent field
+        included = {name for name in included if name.split(".")[0] in selected}
+    return selected, included
+
+def _select_fields(document: Dict[str, Any], selected: Optional[Set[str]]) -> Dict[str, Any]:
+    if selected is None:
+        return dict(document)
+    return {key: value for key, value in document.items() if key in selected}
+
 @app.get("/api/projects", response_model=List[Dict[str, Any]])
-async def get_projects():
+async def get_projects(fields: Optional[str] = None, include: Optional[str] = None):
     """
     Get all projects with calculated metrics.
     This endpoint provides the data your React dashboard needs.
+    
+    Card views can ask for less: ?fields=id,name,status returns only those fields,
+    and ?include= (empty) skips computing metrics.
     """
     try:
+        selected, included = _sparse_fieldset(fields, include, ["metrics"], ["metrics"])
+        
         # Get all projects from storage
         projects = data_service.get_all_projects()
         
         # Enrich each project with calculated metrics
         enriched_projects = []
         for project in projects:
-            # Get real-time metrics for this project
-            metrics = data_service.calculate_project_metrics(project["id"])
-            
-            # Combine project data with calculated metrics
-            enriched_project = {
-                **project,  # Original project data
-                "metrics": metrics  # Calculated metrics
-            }
+            enriched_project = _select_fields(project, selected)
+            if "metrics" in included:
+                # Get real-time metrics for this project
+                enriched_project["metrics"] = data_service.calculate_project_metrics(project["id"])
             enriched_projects.append(enriched_project)
         
         return enriched_projects
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving projects: {str(e)}")
 
 @app.get("/api/projects/{project_id}", response_model=Dict[str, Any])
-async def get_project(project_id: int):
+async def get_project(project_id: int, fields: Optional[str] = None, include: Optional[str] = None):
     """
     Get a specific project with full details including categories and vendors.
     This endpoint supports your detailed project view.
+    
+    include= chooses the embeddings: categories, categories.vendors (categories with
+    full vendor profiles) and metrics; all three by default. fields= limits the
+    top-level fields returned, e.g. ?fields=id,name,categories&include=categories.
+    
+    Identical requests arriving together (same project, fields and include, same
+    data version) are computed once and share the result.
     """
     try:
+        selected, included = _sparse_fieldset(
+            fields, include, ["categories", "categories.vendors", "metrics"],
+            ["categories", "categories.vendors", "metrics"]
+        )
+        
+        key = (project_id, _coalescing_key(selected), _coalescing_key(included), data_service.data_version())
+        return await single_flight.run("/api/projects/{project_id}", key, _project_detail,
+                                       project_id, selected, included)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving project: {str(e)}")
+
+def _coalescing_key(names: Optional[Set[str]]) -> Optional[Tuple[str, ...]]:
+    return tuple(sorted(names)) if names is not None else None
+
+def _project_detail(project_id: int, selected: Optional[Set[str]], included: Set[str]) -> Dict[str, Any]:
+    with data_service.consistent_reads():
         # Get the project
         project = data_service.get_project_by_id(project_id)
         if not project:
             raise HTTPException(status_code=404, detail="Project not found")
         
-        # Get categories for this project
-        categories = data_service.get_categories_for_project(project_id)
+        result = _select_fields(project, selected)
         
-        # Enrich categories with vendor information
-        enriched_categories = []
-        for category in categories:
-            enriched_vendors = data_service.get_enriched_vendors_for_category(category["id"])
-            enriched_category = {
-                **category,
-                "vendors": enriched_vendors  # Full vendor profiles with bid info
-            }
-            enriched_categories.append(enriched_category)
+        if "categories" in included or "categories.vendors" in included:
+            # Get categories for this project
+            categories = data_service.get_categories_for_project(project_id)
+            
+            # Enrich categories with vendor information, only when asked for
+            enriched_categories = []
+            for category in categories:
+                enriched_category = dict(category)
+                if "categories.vendors" in included:
+                    # Full vendor profiles with bid info
+                    enriched_category["vendors"] = data_service.get_enriched_vendors_for_category(category["id"])
+                enriched_categories.append(enriched_category)
+            result["categories"] = enriched_categories
+        
+        if "metrics" in included:
+            # Calculate project metrics
+            result["metrics"] = data_service.calculate_project_metrics(project_id)
+        
+        return result
+
+@app.get("/api/dashboard", response_model=Dict[str, Any])
+async def get_dashboard(groupId: Optional[int] = None, activityLimit: int = 10):
+    """
+    Everything the dashboard shows, in one request: groups with rollups, project
+    summaries with metrics, portfolio totals and recent bid activity.
+    Pass groupId to scope it to one group (as on the group dashboard).
+    
+    All sections are read from the same snapshot, so they agree with each other even
+    if a write lands mid-request, and they are assembled concurrently in the threadpool.
+    """
+    try:
+        if not 0 <= activityLimit <= 100:
+            raise HTTPException(status_code=400, detail="activityLimit must be between 0 and 100")
+        
+        with data_service.consistent_reads():
+            if groupId is not None:
+                groups_section = run_in_threadpool(data_service.get_group_with_projects, groupId)
+            else:
+                groups_section = run_in_threadpool(data_service.get_groups_with_rollups)
+            
+            groups, projects, activity = await asyncio.gather(
+                groups_section,
+                run_in_threadpool(data_service.get_project_summaries, groupId),
+                run_in_threadpool(data_service.get_recent_bid_activity, groupId, activityLimit),
+            )
         
-        # Calculate project metrics
-        metrics = data_service.calculate_project_metrics(project_id)
+        if groupId is not None:
+            # One group, without its projects - those are in the projects section
+            if not groups:
+                raise HTTPException(status_code=404, detail="Group not found")
+            groups.pop("projects")
+            groups = [groups]
+        
+        portfolio = {
+            "totalProjects": len(projects),
+            "totalGroups": len(groups),
+            "activeProjects": len([p for p in projects if p.get("status") in ACTIVE_PROJECT_STATUSES]),
+            "completedProjects": len([p for p in projects if p.get("status") == COMPLETED_PROJECT_STATUS]),
+            "totalValue": sum(p.get("estimatedValue") or 0 for p in projects)
+        }
         
         return {
-            **project,
-            "categories": enriched_categories,
-            "metrics": metrics
+            "groups": groups,
+            "projects": projects,
+            "portfolio": portfolio,
+            "recentActivity": activity,
+            "timestamp": datetime.now().isoformat()
         }
         
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error retrieving project: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error retrieving dashboard: {str(e)}")
+
+def _parse_ids(ids: str) -> List[int]:
+    """Parse the ids= query parameter of a batch read: comma-separated integer ids."""
+    try:
+        parsed = [int(value) for value in ids.split(",") if value.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be a comma-separated list of integers")
+    if len(parsed) > config.BATCH_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {config.BATCH_MAX_IDS} ids per request")
+    return parsed
 
 @app.get("/api/vendors", response_model=List[Dict[str, Any]])
-async def get_vendors():
+async def get_vendors(ids: Optional[str] = None, include: Optional[str] = None):
     """
     Get all vendors from the catalog.
     This supports the owner rep vendor management functionality.
+    
+    ?ids=1,2,3 returns just those vendors, in that order, from one read of the
+    data; include=stats adds each one's category count and bids by status.
     """
     try:
-        vendors = data_service.get_all_vendors()
-        return vendors
+        if ids is None:
+            if include:
+                raise HTTPException(status_code=400, detail="include= needs ids=")
+            vendors = data_service.get_all_vendors()
+            return vendors
+        
+        _, included = _sparse_fieldset(None, include, ["stats"], [])
+        return data_service.get_vendors_by_ids(_parse_ids(ids), include_stats="stats" in included)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving vendors: {str(e)}")
 
+@app.get("/api/categories/batch", response_model=List[Dict[str, Any]])
+async def get_categories_batch(ids: str, include: Optional[str] = None):
+    """
+    Get several categories in one request, in the order of ?ids=, from one read of
+    the data. Unknown ids are left out. include= adds vendors (each category's
+    enriched vendor list, as from /api/categories/{id}/vendors) and project (the
+    owning project's id, name, status and groupId).
+    """
+    try:
+        _, included = _sparse_fieldset(None, include, ["vendors", "project"], [])
+        return data_service.get_categories_by_ids(
+            _parse_ids(ids),
+            include_vendors="vendors" in included,
+            include_project="project" in included,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving categories: {str(e)}")
+
 @app.get("/api/categories/{category_id}/vendors", response_model=List[Dict[str, Any]])
 async def get_category_vendors(category_id: int):
     """
@@ -132,8 +393,20 @@ async def get_category_quotes(category_id: int):
     """
     Get detailed quote comparison data for a specific category.
     This supports the Quote Comparison page with enriched vendor and bid information.
+    Identical requests for the same data version are computed once and share the result.
     """
     try:
+        return await single_flight.run("/api/categories/{category_id}/quotes",
+                                       (category_id, data_service.data_version()),
+                                       _category_quotes, category_id)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving category quotes: {str(e)}")
+
+def _category_quotes(category_id: int) -> Dict[str, Any]:
+    with data_service.consistent_reads():
         category = data_service.get_category_by_id(category_id)
         if not category:
             raise HTTPException(status_code=404, detail="Category not found")
@@ -145,9 +418,15 @@ async def get_category_quotes(category_id: int):
         submitted_bids = [v for v in vendors_with_bids if v.get('bidStatus') == 'submitted']
         best_quote = min([v['bidAmount'] for v in submitted_bids], default=0) if submitted_bids else None
         
+        # Line-by-line leveling matrix, when the category has been broken into line items
+        line_item_table = data_service.get_line_item_table(category_id)
+        
         return {
             "category": category,
             "vendors": vendors_with_bids,
+            "leveling": line_item_table.level() if line_item_table else None,
+            # How these bids compare with every bid in the same trade
+            "priceIndex": data_service.get_price_index_summary(category_id),
             "analytics": {
                 "totalVendors": len(vendors_with_bids),
                 "submittedQuotes": len(submitted_bids),
@@ -156,11 +435,69 @@ async def get_category_quotes(category_id: int):
                 "competitionLevel": "High" if len(submitted_bids) >= 3 else "Low" if len(submitted_bids) > 0 else "None"
             }
         }
+
+@app.put("/api/categories/{category_id}/line-items", response_model=Dict[str, Any])
+async def set_category_line_items(category_id: int, request_data: Dict[str, Any]):
+    """
+    Replace the line items of a category.
+    Expects {"items": [{"description": "W12x26 beam", "quantity": 40, "unit": "ea"}, ...]}.
+    Vendor unit prices already entered stay with their line.
+    """
+    try:
+        items = request_data.get("items")
+        if not isinstance(items, list):
+            raise HTTPException(status_code=400, detail="items must be a list of line items")
+        
+        if not data_service.get_category_by_id(category_id):
+            raise HTTPException(status_code=404, detail="Category not found")
+        
+        category = data_service.set_category_line_items(category_id, items)
+        
+        return {
+            "success": True,
+            "message": f"Category now has {category['totalItems']} line items",
+            "lineItems": category["lineItems"],
+            "timestamp": datetime.now().isoformat()
+        }
         
     except HTTPException:
         raise
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error retrieving category quotes: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error updating line items: {str(e)}")
+
+@app.put("/api/categories/{category_id}/vendors/{vendor_id}/unit-prices", response_model=Dict[str, Any])
+async def set_vendor_unit_prices(category_id: int, vendor_id: int, request_data: Dict[str, Any]):
+    """
+    Record a vendor's unit prices for a category's line items.
+    Expects {"unitPrices": [12.5, null, 8.75, ...]} in the same order as the line items;
+    null marks a line the vendor did not price.
+    """
+    try:
+        prices = request_data.get("unitPrices")
+        if not isinstance(prices, list):
+            raise HTTPException(status_code=400, detail="unitPrices must be a list")
+        
+        if not data_service.get_category_by_id(category_id):
+            raise HTTPException(status_code=404, detail="Category not found")
+        
+        category = data_service.set_vendor_unit_prices(category_id, vendor_id, prices)
+        
+        return {
+            "success": True,
+            "message": f"Unit prices saved for vendor {vendor_id}",
+            "unitPrices": category["unitPrices"][str(vendor_id)],
+            "quotedItems": category["quotedItems"],
+            "timestamp": datetime.now().isoformat()
+        }
+        
+    except HTTPException:
+        raise
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error saving unit prices: {str(e)}")
 
 @app.get("/api/categories/{category_id}/vendor-management", response_model=Dict[str, Any])
 async def get_vendor_management_data(category_id: int):
@@ -200,23 +537,25 @@ async def get_vendor_management_data(category_id: int):
 async def send_vendor_invite(category_id: int, vendor_id: int):
     """
     Send a quote invitation to a specific vendor for a category.
-    This supports the vendor management invitation functionality.
+    The vendor joins the category's bidders with status 'invited'.
     """
     try:
-        # In a real implementation, this would:
-        # 1. Update the vendor's bid status to 'invited'
-        # 2. Send an email invitation
-        # 3. Log the communication
+        if not data_service.get_category_by_id(category_id):
+            raise HTTPException(status_code=404, detail="Category not found")
         
-        # For now, we'll just return a success response
-        # You can implement the actual logic in your data_service
+        participation = data_service.invite_vendor(category_id, vendor_id)
         
         return {
             "success": True,
             "message": f"Invitation sent to vendor {vendor_id} for category {category_id}",
+            "participation": participation,
             "timestamp": datetime.now().isoformat()
         }
         
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error sending vendor invite: {str(e)}")
 
@@ -224,15 +563,19 @@ async def send_vendor_invite(category_id: int, vendor_id: int):
 async def send_bulk_vendor_invites(category_id: int, vendor_ids: List[int]):
     """
     Send quote invitations to multiple vendors at once.
-    This supports the bulk actions in vendor management.
+    All invitations are saved together; if one vendor is unknown, none are sent.
     """
     try:
+        if not data_service.get_category_by_id(category_id):
+            raise HTTPException(status_code=404, detail="Category not found")
+        
+        participations = data_service.invite_vendors(category_id, vendor_ids)
+        
         results = []
-        for vendor_id in vendor_ids:
-            # In a real implementation, send individual invites
+        for participation in participations:
             results.append({
-                "vendorId": vendor_id,
-                "status": "sent",
+                "vendorId": participation["vendorId"],
+                "status": "sent" if participation["bidStatus"] == "invited" else "already_participating",
                 "timestamp": datetime.now().isoformat()
             })
         
@@ -242,48 +585,144 @@ async def send_bulk_vendor_invites(category_id: int, vendor_ids: List[int]):
             "results": results
         }
         
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error sending bulk invites: {str(e)}")
 
 @app.put("/api/categories/{category_id}/vendors/{vendor_id}")
 async def update_vendor_details(category_id: int, vendor_id: int, vendor_data: Dict[str, Any]):
     """
-    Update vendor information for a specific category.
-    This supports the vendor profile editing functionality.
+    Update a vendor's bid for a specific category.
+    Accepts any of bidAmount, bidStatus, bidDate and notes. Every change to the
+    amount or status is kept in the category's bid history.
     """
     try:
-        # In a real implementation, this would update the vendor data
-        # in your data service and validate the input
+        if not data_service.get_category_by_id(category_id):
+            raise HTTPException(status_code=404, detail="Category not found")
+        
+        participation = data_service.update_vendor_bid(category_id, vendor_id, vendor_data)
         
         return {
             "success": True,
             "message": f"Vendor {vendor_id} updated successfully",
-            "updatedData": vendor_data,
+            "updatedData": participation,
             "timestamp": datetime.now().isoformat()
         }
         
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error updating vendor: {str(e)}")
 
+def _timestamp_ms(value: Optional[str], name: str) -> Optional[int]:
+    """Parse an ISO date or datetime query parameter (UTC unless it has an offset) to epoch milliseconds."""
+    if value is None:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{name} must be an ISO date or datetime")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp() * 1000)
+
+@app.get("/api/categories/{category_id}/vendors/{vendor_id}/bid-history", response_model=Dict[str, Any])
+async def get_vendor_bid_history(category_id: int, vendor_id: int, start: Optional[str] = None,
+                                 end: Optional[str] = None, limit: Optional[int] = None):
+    """
+    Get every revision of a vendor's bid in a category, oldest first.
+    Optional start/end (ISO dates or datetimes) narrow the range; limit keeps the most recent revisions.
+    """
+    try:
+        if not data_service.get_category_by_id(category_id):
+            raise HTTPException(status_code=404, detail="Category not found")
+        if limit is not None and limit < 1:
+            raise HTTPException(status_code=400, detail="limit must be positive")
+        
+        revisions = data_service.bid_history.revisions(
+            category_id, vendor_id, _timestamp_ms(start, "start"), _timestamp_ms(end, "end"), limit
+        )
+        
+        return {
+            "categoryId": category_id,
+            "vendorId": vendor_id,
+            "revisions": revisions
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving bid history: {str(e)}")
+
+@app.get("/api/categories/{category_id}/bid-history/series", response_model=Dict[str, Any])
+async def get_bid_price_series(category_id: int, start: Optional[str] = None, end: Optional[str] = None,
+                               buckets: int = 100, vendorIds: Optional[str] = None):
+    """
+    Get each vendor's bid price over time in a category, downsampled for charting.
+    The range (default: first revision until now) is split into at most `buckets` points
+    per vendor; vendorIds is an optional comma-separated filter.
+    """
+    try:
+        if not data_service.get_category_by_id(category_id):
+            raise HTTPException(status_code=404, detail="Category not found")
+        if not 1 <= buckets <= 1000:
+            raise HTTPException(status_code=400, detail="buckets must be between 1 and 1000")
+        try:
+            vendor_ids = [int(v) for v in vendorIds.split(",") if v.strip()] if vendorIds else None
+        except ValueError:
+            raise HTTPException(status_code=400, detail="vendorIds must be comma-separated integers")
+        
+        history = data_service.bid_history
+        span = history.time_span(category_id)
+        start_ms = _timestamp_ms(start, "start")
+        end_ms = _timestamp_ms(end, "end")
+        if start_ms is None:
+            start_ms = span[0] if span else int(time.time() * 1000)
+        if end_ms is None:
+            end_ms = max(int(time.time() * 1000), span[1] if span else 0)
+        if end_ms < start_ms:
+            raise HTTPException(status_code=400, detail="end must not be before start")
+        
+        return {
+            "categoryId": category_id,
+            "start": datetime.fromtimestamp(start_ms / 1000, tz=timezone.utc).isoformat(),
+            "end": datetime.fromtimestamp(end_ms / 1000, tz=timezone.utc).isoformat(),
+            "series": history.price_series(category_id, start_ms, end_ms, buckets, vendor_ids)
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving bid price series: {str(e)}")
+
 @app.post("/api/categories/{category_id}/vendors/{vendor_id}/select-quote")
 async def select_vendor_quote(category_id: int, vendor_id: int):
     """
     Select a vendor's quote as the winning bid.
-    This supports the quote selection functionality.
+    The vendor's bid becomes 'selected' and the other quotes in the category 'not_selected'.
     """
     try:
-        # In a real implementation, this would:
-        # 1. Update the vendor's status to 'selected'
-        # 2. Update other vendors' status to 'not_selected'
-        # 3. Log the selection decision
-        # 4. Possibly send notifications
+        if not data_service.get_category_by_id(category_id):
+            raise HTTPException(status_code=404, detail="Category not found")
+        
+        category = data_service.select_vendor_quotes({category_id: vendor_id})[0]
         
         return {
             "success": True,
             "message": f"Quote selected for vendor {vendor_id} in category {category_id}",
+            "vendorParticipation": category["vendorParticipation"],
             "timestamp": datetime.now().isoformat()
         }
         
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error selecting quote: {str(e)}")
 
@@ -329,7 +768,8 @@ async def create_project(project_data: Dict[str, Any]):
         "zipCode": "10001",
         "clientContactName": "John Doe",
         "clientContactEmail": "john@company.com",
-        "clientContactPhone": "(555) 123-4567"
+        "clientContactPhone": "(555) 123-4567",
+        "groupId": 2  // optional - files the project under a group
     }
     """
     try:
@@ -350,6 +790,10 @@ async def create_project(project_data: Dict[str, Any]):
         except (ValueError, TypeError):
             raise HTTPException(status_code=400, detail="estimatedValue must be a valid number")
         
+        # A project can only be filed under a group that exists
+        if project_data.get("groupId") is not None and not data_service.get_group_by_id(project_data["groupId"]):
+            raise HTTPException(status_code=400, detail=f"Group {project_data['groupId']} not found")
+        
         # Create the project
         new_project = data_service.create_new_project(project_data)
         
@@ -365,6 +809,44 @@ async def create_project(project_data: Dict[str, Any]):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error creating project: {str(e)}")
 
+@app.post("/api/projects/bulk-update", response_model=Dict[str, Any])
+async def bulk_update_projects(request_data: Dict[str, Any]):
+    """
+    Update several projects at once, e.g. moving projects between groups or changing statuses.
+    Expects {"updates": [{"id": 1, "status": "active"}, {"id": 2, "groupId": 3}]}.
+    All updates are saved together; if any fails, none are applied.
+    """
+    try:
+        updates = request_data.get("updates")
+        if not isinstance(updates, list) or not all(isinstance(u, dict) and "id" in u for u in updates):
+            raise HTTPException(status_code=400, detail="updates must be a list of objects with an id")
+        
+        for project_updates in updates:
+            if "estimatedValue" in project_updates:
+                try:
+                    value = project_updates["estimatedValue"]
+                    project_updates["estimatedValue"] = float(value) if value else 0
+                except (ValueError, TypeError):
+                    raise HTTPException(status_code=400, detail="estimatedValue must be a valid number")
+            if project_updates.get("groupId") is not None and not data_service.get_group_by_id(project_updates["groupId"]):
+                raise HTTPException(status_code=400, detail=f"Group {project_updates['groupId']} not found")
+        
+        try:
+            updated = data_service.update_projects(updates)
+        except ValueError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        
+        return {
+            "success": True,
+            "message": f"{updated} projects updated successfully",
+            "timestamp": datetime.now().isoformat()
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error updating projects: {str(e)}")
+
 @app.put("/api/projects/{project_id}", response_model=Dict[str, Any])
 async def update_project(project_id: int, updates: Dict[str, Any]):
     """
@@ -379,6 +861,10 @@ async def update_project(project_id: int, updates: Dict[str, Any]):
             except (ValueError, TypeError):
                 raise HTTPException(status_code=400, detail="estimatedValue must be a valid number")
         
+        # Moving a project to another group requires the group to exist
+        if updates.get("groupId") is not None and not data_service.get_group_by_id(updates["groupId"]):
+            raise HTTPException(status_code=400, detail=f"Group {updates['groupId']} not found")
+        
         success = data_service.update_project(project_id, updates)
         
         if not success:
@@ -413,9 +899,100 @@ async def delete_project(project_id: int):
             "timestamp": datetime.now().isoformat()
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error deleting project: {str(e)}")
 
+@app.get("/api/changes", response_model=Dict[str, Any])
+async def get_changes(since: int = 0, limit: int = 1000):
+    """
+    Records created, updated or deleted since sequence number `since`, for clients
+    that keep a local copy of the data. Start by calling this without `since` to
+    get the current seq, then fetch the collections; after that, pass the last seq
+    received. When the response has resync=true the client's copy is too old to
+    catch up change by change, and it should fetch everything again.
+    """
+    try:
+        if not 1 <= limit <= 10000:
+            raise HTTPException(status_code=400, detail="limit must be between 1 and 10000")
+        if since < 0:
+            raise HTTPException(status_code=400, detail="since must not be negative")
+
+        return await run_in_threadpool(data_service.get_changes, since, limit)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reading changes: {str(e)}")
+
+def _require_snapshots():
+    """Answer 503 when the data service was set up without a snapshot store."""
+    if data_service.snapshots is None:
+        raise HTTPException(status_code=503, detail="Snapshots are not configured on this server")
+
+@app.get("/api/snapshots", response_model=List[Dict[str, Any]])
+async def list_snapshots():
+    """
+    List point-in-time snapshots of the data, newest first.
+    One is taken automatically before every project deletion.
+    """
+    try:
+        _require_snapshots()
+        return await run_in_threadpool(data_service.snapshots.list_snapshots)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error listing snapshots: {str(e)}")
+
+@app.post("/api/snapshots", response_model=Dict[str, Any])
+async def create_snapshot(request_data: Optional[Dict[str, Any]] = None):
+    """
+    Take a snapshot of the current data. Expects an optional {"label": "..."}.
+    Only records that changed since earlier snapshots are stored again.
+    """
+    try:
+        _require_snapshots()
+        label = str((request_data or {}).get("label", ""))
+        manifest = await run_in_threadpool(data_service.create_snapshot, label)
+        return {key: value for key, value in manifest.items() if key != "collections"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error creating snapshot: {str(e)}")
+
+@app.get("/api/snapshots/diff", response_model=Dict[str, Any])
+async def diff_snapshots(from_id: str, to_id: str):
+    """
+    Ids of the records added, removed and changed between two snapshots, per collection.
+    Example: /api/snapshots/diff?from_id=20250101T090000000000Z&to_id=20250102T090000000000Z
+    """
+    try:
+        _require_snapshots()
+        return await run_in_threadpool(data_service.snapshots.diff, from_id, to_id)
+    except HTTPException:
+        raise
+    except SnapshotNotFoundError as e:
+        raise HTTPException(status_code=404, detail=f"Snapshot not found: {e}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error comparing snapshots: {str(e)}")
+
+@app.post("/api/snapshots/{snapshot_id}/restore", response_model=Dict[str, Any])
+async def restore_snapshot(snapshot_id: str):
+    """
+    Replace all data with a snapshot's version - for example to undo a project deletion.
+    The data as it was just before is snapshotted first, so the restore can be undone too.
+    """
+    try:
+        _require_snapshots()
+        result = await run_in_threadpool(data_service.restore_snapshot, snapshot_id)
+        return {**result, "success": True, "timestamp": datetime.now().isoformat()}
+    except HTTPException:
+        raise
+    except SnapshotNotFoundError as e:
+        raise HTTPException(status_code=404, detail=f"Snapshot not found: {e}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error restoring snapshot: {str(e)}")
+
 @app.post("/api/projects/{project_id}/categories", response_model=Dict[str, Any])
 async def add_category_to_project(project_id: int, category_data: Dict[str, Any]):
     """
@@ -515,18 +1092,15 @@ async def create_project_from_template(request_data: Dict[str, Any]):
         if not merged_data.get("name") or not merged_data.get("client"):
             raise HTTPException(status_code=400, detail="Project name and client are required")
         
-        # Create the project
-        new_project = data_service.create_new_project(merged_data)
-        
-        # Add template categories if requested
+        # Create the project and its categories in one write - all of it or none of it
         created_categories = []
-        if include_categories and template.get("commonCategories"):
-            for category_template in template["commonCategories"]:
-                try:
+        with data_service.transaction():
+            new_project = data_service.create_new_project(merged_data)
+            
+            if include_categories and template.get("commonCategories"):
+                for category_template in template["commonCategories"]:
                     category = data_service.add_category_to_project(new_project["id"], category_template)
                     created_categories.append(category)
-                except Exception as e:
-                    print(f"Warning: Failed to create category {category_template['name']}: {e}")
         
         return {
             "success": True,
@@ -583,11 +1157,31 @@ async def test_create_project():
             "timestamp": datetime.now().isoformat()
         }    
 
+@app.get("/api/vendors/duplicates", response_model=Dict[str, Any])
+async def get_vendor_duplicates(threshold: float = config.VENDOR_DUPLICATE_THRESHOLD):
+    """
+    Batch duplicate report over the whole vendor catalog: groups of vendors that
+    look like the same company, with the matching pairs and why they matched.
+    """
+    try:
+        if not 0 < threshold <= 1:
+            raise HTTPException(status_code=400, detail="threshold must be between 0 and 1")
+
+        return await run_in_threadpool(data_service.get_vendor_duplicate_report, threshold)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error building vendor duplicate report: {str(e)}")
+
 @app.post("/api/vendors", response_model=Dict[str, Any])
-async def create_vendor(vendor_data: Dict[str, Any]):
+async def create_vendor(vendor_data: Dict[str, Any], reject_duplicates: bool = False):
     """
     Create a new vendor and add it to the catalog.
     This is the main endpoint for adding new vendors.
+
+    The response lists existing vendors the new one may duplicate (same phone,
+    company email domain or zip, similar name). With reject_duplicates=true the
+    vendor is not created when there are any, and the request fails with 409.
     
     Expected data:
     {
@@ -650,12 +1244,21 @@ async def create_vendor(vendor_data: Dict[str, Any]):
             )
         
         # Create the vendor
-        new_vendor = data_service.add_vendor(vendor_data)
+        try:
+            new_vendor, possible_duplicates = data_service.add_vendor(
+                vendor_data, reject_duplicates=reject_duplicates,
+                duplicate_threshold=config.VENDOR_DUPLICATE_THRESHOLD)
+        except DuplicateVendorError as e:
+            raise HTTPException(status_code=409, detail={
+                "message": "Vendor looks like an existing vendor",
+                "possibleDuplicates": e.candidates,
+            })
         
         return {
             "success": True,
             "message": "Vendor created successfully",
             "vendor": new_vendor,
+            "possibleDuplicates": possible_duplicates,
             "timestamp": datetime.now().isoformat()
         }
         
@@ -690,30 +1293,11 @@ async def get_groups():
     Get all project groups with their metadata
     """
     try:
-        data = data_service._read_data()
-        groups = data.get("groups", [])
-        
-        # Enrich groups with calculated metrics from their projects
-        enriched_groups = []
-        projects = data.get("projects", [])
-        
-        for group in groups:
-            # Calculate actual metrics from projects in this group
-            group_projects = [p for p in projects if p.get("groupId") == group["id"]]
-            
-            # Update group with current project metrics
-            enriched_group = group.copy()
-            enriched_group["actualProjectCount"] = len(group_projects)
-            enriched_group["actualTotalValue"] = sum(p.get("estimatedValue", 0) for p in group_projects)
-            enriched_group["activeProjects"] = len([p for p in group_projects if p.get("status") in ["active", "early"]])
-            enriched_group["completedProjects"] = len([p for p in group_projects if p.get("status") == "complete"])
-            
-            enriched_groups.append(enriched_group)
-        
-        return enriched_groups
+        # Rollups (project counts, values, awarded amounts) are maintained on each write
+        return data_service.get_groups_with_rollups()
         
     except Exception as e:
-        print(f"Error fetching groups: {str(e)}")
+        logger.exception("error fetching groups")
         raise HTTPException(status_code=500, detail=f"Error fetching groups: {str(e)}")
 
 @app.get("/api/groups/{group_id}")
@@ -722,32 +1306,238 @@ async def get_group(group_id: int):
     Get a specific group by ID with its projects
     """
     try:
-        data = data_service._read_data()
-        groups = data.get("groups", [])
-        projects = data.get("projects", [])
-        
-        # Find the specific group
-        group = next((g for g in groups if g["id"] == group_id), None)
+        group = data_service.get_group_with_projects(group_id)
         if not group:
             raise HTTPException(status_code=404, detail=f"Group with id {group_id} not found")
         
-        # Get projects in this group
-        group_projects = [p for p in projects if p.get("groupId") == group_id]
+        return group
         
-        # Enrich group with current metrics
-        enriched_group = group.copy()
-        enriched_group["actualProjectCount"] = len(group_projects)
-        enriched_group["actualTotalValue"] = sum(p.get("estimatedValue", 0) for p in group_projects)
-        enriched_group["activeProjects"] = len([p for p in group_projects if p.get("status") in ["active", "early"]])
-        enriched_group["completedProjects"] = len([p for p in group_projects if p.get("status") == "complete"])
-        enriched_group["projects"] = group_projects
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("error fetching group", extra={"groupId": group_id})
+        raise HTTPException(status_code=500, detail=f"Error fetching group: {str(e)}")
+
+def _award_plan(project_ids: List[int], request_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Optimize awards across these projects' categories and apply the plan if asked to."""
+    try:
+        constraints = award_optimizer.parse_constraints(request_data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    time_limit_ms = request_data.get("timeLimitMs", 1000)
+    if not isinstance(time_limit_ms, (int, float)) or not 10 <= time_limit_ms <= 10000:
+        raise HTTPException(status_code=400, detail="timeLimitMs must be between 10 and 10000")
+    
+    plan = data_service.plan_awards(project_ids, constraints, time_limit_ms / 1000)
+    
+    plan["applied"] = False
+    if request_data.get("apply"):
+        if not plan["feasible"]:
+            raise HTTPException(status_code=409, detail="No award plan satisfies the constraints")
+        data_service.select_vendor_quotes({award["categoryId"]: award["vendorId"] for award in plan["awards"]})
+        plan["applied"] = True
+    
+    plan["timestamp"] = datetime.now().isoformat()
+    return plan
+
+@app.post("/api/projects/{project_id}/award-plan", response_model=Dict[str, Any])
+async def create_project_award_plan(project_id: int, request_data: Dict[str, Any]):
+    """
+    Choose the winning vendor for every category of a project at the lowest total cost.
+    Optional constraints: maxCategoriesPerVendor, requiredVendors, excludedVendors and
+    bundleDiscounts ([{"vendorId", "minCategories", "discountPercent"}]). Set "apply": true
+    to select the winning quotes as well.
+    """
+    try:
+        if not data_service.get_project_by_id(project_id):
+            raise HTTPException(status_code=404, detail="Project not found")
+        return await run_in_threadpool(_award_plan, [project_id], request_data)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error creating award plan: {str(e)}")
+
+@app.post("/api/groups/{group_id}/award-plan", response_model=Dict[str, Any])
+async def create_group_award_plan(group_id: int, request_data: Dict[str, Any]):
+    """
+    Choose winning vendors across every project in a group, so constraints such as
+    maxCategoriesPerVendor and bundle discounts apply to the whole portfolio.
+    Takes the same options as the project award plan.
+    """
+    try:
+        group = data_service.get_group_by_id(group_id)
+        if not group:
+            raise HTTPException(status_code=404, detail="Group not found")
+        project_ids = [p["id"] for p in data_service.get_all_projects() if p.get("groupId") == group_id]
+        return await run_in_threadpool(_award_plan, project_ids, request_data)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error creating award plan: {str(e)}")
+
+@app.post("/api/projects/{project_id}/documents", response_model=Dict[str, Any])
+async def upload_document(
+    project_id: int,
+    request: Request,
+    filename: str,
+    displayName: Optional[str] = None,
+    documentType: str = "",
+    description: str = "",
+    uploadedBy: str = "",
+    tags: str = ""
+):
+    """
+    Upload a document to a project by streaming the raw file as the request body.
+    The file is hashed while it is written to disk, so memory stays flat even for
+    500 MB drawing sets, and identical files are stored only once.
+    
+    Example:
+    curl -X POST "http://localhost:8000/api/projects/1/documents?filename=plans.pdf&documentType=plans" \\
+         -H "Content-Type: application/pdf" --data-binary @plans.pdf
+    """
+    try:
+        if not data_service.get_project_by_id(project_id):
+            raise HTTPException(status_code=404, detail="Project not found")
+        if not filename.strip():
+            raise HTTPException(status_code=400, detail="filename is required")
         
-        return enriched_group
+        try:
+            content_hash, size, deduplicated = await blob_store.write_stream(
+                request.stream(), max_bytes=config.DOCUMENT_MAX_UPLOAD_BYTES
+            )
+        except UploadTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        
+        document = data_service.add_document(project_id, {
+            "filename": os.path.basename(filename),
+            "displayName": displayName,
+            "fileType": request.headers.get("content-type", "application/octet-stream"),
+            "fileSize": size,
+            "uploadedBy": uploadedBy,
+            "documentType": documentType,
+            "description": description,
+            "filePath": os.path.relpath(blob_store.path_for(content_hash), blob_store.root),
+            "contentHash": content_hash,
+            "tags": [tag.strip() for tag in tags.split(",") if tag.strip()]
+        })
+        
+        return {
+            "success": True,
+            "message": "Document uploaded successfully",
+            "document": document,
+            "deduplicated": deduplicated,
+            "timestamp": datetime.now().isoformat()
+        }
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error fetching group {group_id}: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error fetching group: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error uploading document: {str(e)}")
+
+@app.get("/api/projects/{project_id}/documents", response_model=List[Dict[str, Any]])
+async def get_project_documents(project_id: int):
+    """
+    Get the document list for a project (metadata only).
+    """
+    try:
+        if not data_service.get_project_by_id(project_id):
+            raise HTTPException(status_code=404, detail="Project not found")
+        return data_service.get_documents_for_project(project_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving documents: {str(e)}")
+
+@app.get("/api/documents/{document_id}/download")
+async def download_document(document_id: int):
+    """
+    Download a document's file.
+    Supports HTTP Range requests, so large plan sets can be resumed or read
+    page by page, and streams from disk without loading the file into memory.
+    """
+    try:
+        document = data_service.get_document_by_id(document_id)
+        if not document:
+            raise HTTPException(status_code=404, detail="Document not found")
+        
+        content_hash = document.get("contentHash")
+        if not content_hash or not blob_store.exists(content_hash):
+            raise HTTPException(status_code=404, detail="Document file is not available")
+        
+        return FileResponse(
+            blob_store.path_for(content_hash),
+            media_type=document.get("fileType") or "application/octet-stream",
+            filename=document.get("filename") or f"document-{document_id}",
+            # Blobs never change once written, so the hash is a perfect validator
+            headers={"ETag": f'"{content_hash}"', "Cache-Control": "private, max-age=31536000, immutable"}
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error downloading document: {str(e)}")
+
+@app.get("/api/projects/{project_id}/bid-tab")
+async def download_bid_tab(project_id: int, format: str = "csv", category_id: Optional[int] = None):
+    """
+    Download a project's bid tabulation: every vendor's bid per category, its
+    deviation from the estimate, the low bid and the award, as csv, xlsx or html.
+    category_id= limits it to one category.
+
+    Reports are generated in separate worker processes and cached until the bids
+    they show change. If generation takes longer than REPORT_WAIT_SECONDS the
+    response is 202 with Retry-After; asking again returns the report once it's done.
+    """
+    try:
+        if format not in REPORT_FORMATS:
+            raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(REPORT_FORMATS)}")
+        report_input = data_service.get_bid_tab_input(project_id, category_id)
+        if report_input is None:
+            raise HTTPException(status_code=404, detail="Project not found" if category_id is None
+                                else "Category not found in this project")
+
+        name = f"project-{project_id}" if category_id is None else f"project-{project_id}-category-{category_id}"
+        try:
+            path = await bid_tab_reports.get(name, report_input, format, wait=config.REPORT_WAIT_SECONDS)
+        except ReportNotReadyError:
+            return JSONResponse(
+                status_code=202,
+                content={"status": "generating", "message": "The report is being generated, try again shortly"},
+                headers={"Retry-After": str(config.REPORT_RETRY_AFTER)}
+            )
+
+        media_type, extension = REPORT_FORMATS[format]
+        return FileResponse(
+            path,
+            media_type=media_type,
+            filename=f"bid-tab-{name}.{extension}",
+            # The file name carries the data digest, so it's a strong validator
+            headers={"ETag": f'"{os.path.basename(path)}"', "Cache-Control": "private, no-cache"}
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error generating bid tab: {str(e)}")
+
 # You can test your API by running: uvicorn app.main:app --reload
-# Then visit http://localhost:8000/docs to see the interactive API documentation
\ No newline at end of file
+# Then visit http://localhost:8000/docs to see the interactive API documentation
+
+def start_server(host: str = "127.0.0.1", port: int = 8000, workers: int = 1, reload: bool = False):
+    """
+    Run the API under uvicorn. Used by start.py.
+    With workers > 1 uvicorn starts that many processes sharing the port; reload
+    only works with a single worker, so it is ignored in multi-worker mode.
+    """
+    import uvicorn
+
+    uvicorn.run(
+        "app.main:app",
+        host=host,
+        port=port,
+        workers=workers if workers > 1 else None,
+        reload=reload and workers <= 1,
+        # Requests are already logged as structured JSON by RequestContextMiddleware
+        access_log=False,
+    )
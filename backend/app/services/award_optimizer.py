@@ -0,0 +1,357 @@
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# Portfolios with at most this many categories are solved exactly (branch and bound)
+EXACT_MAX_CATEGORIES = 16
+# Branch-and-bound nodes to explore before settling for the best plan found so far
+EXACT_MAX_NODES = 500_000
+DEFAULT_TIME_LIMIT_SECONDS = 1.0
+
+
+class AwardProblem:
+    """
+    Choosing one winning vendor per category to minimise total cost.
+
+    bids:              {categoryId: {vendorId: amount}}
+    max_per_vendor:    most categories any one vendor may win (None = unlimited)
+    required_vendors:  vendors that must win at least one category
+    excluded_vendors:  vendors that must not win anything
+    bundle_discounts:  {vendorId: [(minCategories, discount fraction), ...]} - a vendor
+                       winning at least minCategories takes the discount off everything it wins
+
+    Categories with no eligible bid are left unawarded.
+    """
+
+    def __init__(self, bids: Dict[int, Dict[int, float]], max_per_vendor: Optional[int] = None,
+                 required_vendors: Optional[Set[int]] = None, excluded_vendors: Optional[Set[int]] = None,
+                 bundle_discounts: Optional[Dict[int, List[Tuple[int, float]]]] = None):
+        self.max_per_vendor = max_per_vendor
+        self.required_vendors = set(required_vendors or ())
+        excluded = set(excluded_vendors or ())
+        self.bundle_discounts = {
+            vendor_id: sorted(tiers) for vendor_id, tiers in (bundle_discounts or {}).items() if tiers
+        }
+
+        # Each category's eligible options, cheapest first
+        self.options: Dict[int, List[Tuple[float, int]]] = {}
+        self.amounts: Dict[Tuple[int, int], float] = {}
+        self.unawardable: List[int] = []
+        for category_id, vendor_bids in bids.items():
+            options = sorted((amount, vendor_id) for vendor_id, amount in vendor_bids.items()
+                             if vendor_id not in excluded and amount > 0)
+            if options:
+                self.options[category_id] = options
+                for amount, vendor_id in options:
+                    self.amounts[(category_id, vendor_id)] = amount
+            else:
+                self.unawardable.append(category_id)
+
+    def discount(self, vendor_id: int, categories_won: int) -> float:
+        """The bundle discount a vendor gives when it wins this many categories."""
+        best = 0.0
+        for min_categories, discount in self.bundle_discounts.get(vendor_id, ()):
+            if categories_won >= min_categories:
+                best = max(best, discount)
+        return best
+
+    def max_discount(self, vendor_id: int) -> float:
+        return max((discount for _, discount in self.bundle_discounts.get(vendor_id, ())), default=0.0)
+
+    def cost(self, assignment: Dict[int, int]) -> float:
+        """Total cost of an assignment {categoryId: vendorId}, after bundle discounts."""
+        totals, counts = self._vendor_totals(assignment)
+        return sum(total * (1 - self.discount(vendor_id, counts[vendor_id])) for vendor_id, total in totals.items())
+
+    def _vendor_totals(self, assignment: Dict[int, int]) -> Tuple[Dict[int, float], Dict[int, int]]:
+        totals: Dict[int, float] = {}
+        counts: Dict[int, int] = {}
+        for category_id, vendor_id in assignment.items():
+            totals[vendor_id] = totals.get(vendor_id, 0.0) + self.amount(category_id, vendor_id)
+            counts[vendor_id] = counts.get(vendor_id, 0) + 1
+        return totals, counts
+
+    def amount(self, category_id: int, vendor_id: int) -> float:
+        return self.amounts[(category_id, vendor_id)]
+
+    def vendor_cost(self, vendor_id: int, total: float, categories_won: int) -> float:
+        return total * (1 - self.discount(vendor_id, categories_won))
+
+    def is_feasible(self, assignment: Dict[int, int]) -> bool:
+        """Whether an assignment awards every awardable category within the constraints."""
+        if len(assignment) != len(self.options):
+            return False
+        counts: Dict[int, int] = {}
+        for vendor_id in assignment.values():
+            counts[vendor_id] = counts.get(vendor_id, 0) + 1
+        if self.max_per_vendor is not None and any(count > self.max_per_vendor for count in counts.values()):
+            return False
+        return self.required_vendors <= set(counts)
+
+
+def solve(problem: AwardProblem, time_limit: float = DEFAULT_TIME_LIMIT_SECONDS) -> Dict[str, Any]:
+    """
+    Find the cheapest award plan. Small portfolios are solved exactly; larger ones,
+    or small ones the exact search can't finish within its node budget, get the best
+    plan the heuristic finds within time_limit seconds.
+    Returns {"assignment", "cost", "method", "feasible"}.
+    """
+    deadline = time.perf_counter() + time_limit
+    assignment = _heuristic(problem, deadline)
+    method = "heuristic"
+
+    if len(problem.options) <= EXACT_MAX_CATEGORIES:
+        exact, finished = _branch_and_bound(problem, assignment, deadline)
+        if exact is not None:
+            assignment = exact
+        if finished:
+            method = "exact"
+
+    feasible = assignment is not None and problem.is_feasible(assignment)
+    return {
+        "assignment": assignment or {},
+        "cost": problem.cost(assignment) if assignment else 0.0,
+        "method": method,
+        "feasible": feasible,
+    }
+
+
+def _branch_and_bound(problem: AwardProblem, incumbent: Optional[Dict[int, int]],
+                      deadline: float) -> Tuple[Optional[Dict[int, int]], bool]:
+    """
+    Depth-first search over categories, fewest options first. A branch is pruned when
+    even the cheapest completion - every remaining category at its lowest bid with the
+    largest discount its vendor offers - can't beat the best plan found so far.
+    Returns (best assignment, whether the search finished).
+    """
+    categories = sorted(problem.options, key=lambda category_id: len(problem.options[category_id]))
+    # Cheapest optimistic cost of each category, and of every suffix of the search order
+    optimistic = [
+        min(amount * (1 - problem.max_discount(vendor_id)) for amount, vendor_id in problem.options[category_id])
+        for category_id in categories
+    ]
+    remaining_bound = [0.0] * (len(categories) + 1)
+    for position in range(len(categories) - 1, -1, -1):
+        remaining_bound[position] = remaining_bound[position + 1] + optimistic[position]
+    # Which required vendors can still be placed from each position onwards
+    placeable: List[Set[int]] = [set() for _ in range(len(categories) + 1)]
+    for position in range(len(categories) - 1, -1, -1):
+        placeable[position] = placeable[position + 1] | {
+            vendor_id for _, vendor_id in problem.options[categories[position]]
+            if vendor_id in problem.required_vendors
+        }
+
+    best = dict(incumbent) if incumbent and problem.is_feasible(incumbent) else None
+    best_cost = problem.cost(best) if best else float("inf")
+    current: Dict[int, int] = {}
+    counts: Dict[int, int] = {}
+    nodes = 0
+    finished = True
+
+    def search(position: int, optimistic_so_far: float):
+        nonlocal best, best_cost, nodes, finished
+        nodes += 1
+        if nodes > EXACT_MAX_NODES or (nodes % 1024 == 0 and time.perf_counter() > deadline):
+            finished = False
+            return
+        if optimistic_so_far + remaining_bound[position] >= best_cost - 1e-9:
+            return
+        missing = problem.required_vendors - set(counts)
+        if len(missing) > len(categories) - position or not missing <= placeable[position]:
+            return
+        if position == len(categories):
+            total = problem.cost(current)
+            if total < best_cost - 1e-9:
+                best, best_cost = dict(current), total
+            return
+
+        category_id = categories[position]
+        for amount, vendor_id in problem.options[category_id]:
+            if problem.max_per_vendor is not None and counts.get(vendor_id, 0) >= problem.max_per_vendor:
+                continue
+            current[category_id] = vendor_id
+            counts[vendor_id] = counts.get(vendor_id, 0) + 1
+            search(position + 1, optimistic_so_far + amount * (1 - problem.max_discount(vendor_id)))
+            counts[vendor_id] -= 1
+            if not counts[vendor_id]:
+                del counts[vendor_id]
+            del current[category_id]
+            if not finished:
+                return
+
+    search(0, 0.0)
+    return best, finished
+
+
+def _heuristic(problem: AwardProblem, deadline: float) -> Optional[Dict[int, int]]:
+    """
+    Greedy construction followed by local search, stopping at the deadline.
+
+    Categories are awarded in order of regret (how much more the second-best bid
+    costs), so the ones where a wrong choice is most expensive are decided first;
+    missing required vendors are then placed where that costs least. Local search
+    moves single categories to other vendors, and tries handing a vendor just
+    enough extra categories to reach each of its bundle discount tiers.
+    """
+    def regret(category_id: int) -> float:
+        options = problem.options[category_id]
+        return options[1][0] - options[0][0] if len(options) > 1 else float("inf")
+
+    assignment: Dict[int, int] = {}
+    counts: Dict[int, int] = {}
+    for category_id in sorted(problem.options, key=regret, reverse=True):
+        for _, vendor_id in problem.options[category_id]:
+            if problem.max_per_vendor is None or counts.get(vendor_id, 0) < problem.max_per_vendor:
+                assignment[category_id] = vendor_id
+                counts[vendor_id] = counts.get(vendor_id, 0) + 1
+                break
+
+    # Place required vendors that didn't win anything, where that costs least. The
+    # cost of each candidate move comes from per-vendor totals, not a full recount
+    totals, _ = problem._vendor_totals(assignment)
+    for vendor_id in sorted(problem.required_vendors - set(counts)):
+        if time.perf_counter() >= deadline:
+            break
+        best: Optional[Tuple[float, int]] = None
+        for category_id in problem.options:
+            if (category_id, vendor_id) not in problem.amounts:
+                continue
+            previous = assignment.get(category_id)
+            # Don't take the only category of another required vendor
+            if previous is not None and previous in problem.required_vendors and counts.get(previous) == 1:
+                continue
+            candidate = (_move_delta(problem, assignment, totals, counts, category_id, vendor_id), category_id)
+            if best is None or candidate < best:
+                best = candidate
+        if best is not None:
+            _move(problem, assignment, totals, counts, best[1], vendor_id)
+
+    if not assignment:
+        return None
+    return _local_search(problem, assignment, deadline)
+
+
+def _move_delta(problem: AwardProblem, assignment: Dict[int, int], totals: Dict[int, float],
+                counts: Dict[int, int], category_id: int, vendor_id: int) -> float:
+    """Change in total cost from (re)assigning one category to vendor_id, given the per-vendor totals and counts."""
+    after = problem.amount(category_id, vendor_id)
+    delta = (problem.vendor_cost(vendor_id, totals.get(vendor_id, 0.0) + after, counts.get(vendor_id, 0) + 1)
+             - problem.vendor_cost(vendor_id, totals.get(vendor_id, 0.0), counts.get(vendor_id, 0)))
+    previous = assignment.get(category_id)
+    if previous is not None:
+        before = problem.amount(category_id, previous)
+        delta += (problem.vendor_cost(previous, totals[previous] - before, counts[previous] - 1)
+                  - problem.vendor_cost(previous, totals[previous], counts[previous]))
+    return delta
+
+
+def _move(problem: AwardProblem, assignment: Dict[int, int], totals: Dict[int, float],
+          counts: Dict[int, int], category_id: int, vendor_id: int):
+    """(Re)assign one category to vendor_id, keeping the per-vendor totals and counts up to date."""
+    previous = assignment.get(category_id)
+    if previous is not None:
+        totals[previous] -= problem.amount(category_id, previous)
+        counts[previous] -= 1
+        if not counts[previous]:
+            del counts[previous], totals[previous]
+    totals[vendor_id] = totals.get(vendor_id, 0.0) + problem.amount(category_id, vendor_id)
+    counts[vendor_id] = counts.get(vendor_id, 0) + 1
+    assignment[category_id] = vendor_id
+
+
+def _local_search(problem: AwardProblem, assignment: Dict[int, int], deadline: float) -> Dict[int, int]:
+    totals, counts = problem._vendor_totals(assignment)
+
+    def can_lose(vendor_id: int) -> bool:
+        return vendor_id not in problem.required_vendors or counts[vendor_id] > 1
+
+    def can_gain(vendor_id: int, extra: int = 1) -> bool:
+        return problem.max_per_vendor is None or counts.get(vendor_id, 0) + extra <= problem.max_per_vendor
+
+    def move_delta(category_id: int, vendor_id: int) -> float:
+        return _move_delta(problem, assignment, totals, counts, category_id, vendor_id)
+
+    def move(category_id: int, vendor_id: int):
+        _move(problem, assignment, totals, counts, category_id, vendor_id)
+
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+
+        # Move one category to another vendor
+        for category_id, options in problem.options.items():
+            if category_id not in assignment or not can_lose(assignment[category_id]):
+                continue
+            for _, vendor_id in options:
+                if vendor_id != assignment[category_id] and can_gain(vendor_id) \
+                        and move_delta(category_id, vendor_id) < -1e-9:
+                    move(category_id, vendor_id)
+                    improved = True
+                    if not can_lose(vendor_id):
+                        break
+            if time.perf_counter() >= deadline:
+                return assignment
+
+        # Reach a bundle discount tier by moving the cheapest extra categories to a vendor
+        for vendor_id, tiers in problem.bundle_discounts.items():
+            for min_categories, _ in tiers:
+                needed = min_categories - counts.get(vendor_id, 0)
+                if needed <= 0 or not can_gain(vendor_id, needed):
+                    continue
+                extra = sorted(
+                    (problem.amount(category_id, vendor_id) - problem.amount(category_id, winner), category_id)
+                    for category_id, winner in assignment.items()
+                    if winner != vendor_id and (category_id, vendor_id) in problem.amounts
+                )[:needed]
+                if len(extra) < needed:
+                    continue
+                trial = dict(assignment)
+                for _, category_id in extra:
+                    trial[category_id] = vendor_id
+                if problem.is_feasible(trial) and problem.cost(trial) < problem.cost(assignment) - 1e-9:
+                    for _, category_id in extra:
+                        move(category_id, vendor_id)
+                    improved = True
+            if time.perf_counter() >= deadline:
+                return assignment
+
+    return assignment
+
+
+def parse_constraints(request: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Turn an award plan request body into AwardProblem keyword arguments.
+    Raises ValueError for malformed constraints.
+    """
+    def vendor_ids(field: str) -> Set[int]:
+        values = request.get(field) or []
+        if not isinstance(values, list) or not all(isinstance(v, int) and not isinstance(v, bool) for v in values):
+            raise ValueError(f"{field} must be a list of vendor ids")
+        return set(values)
+
+    max_per_vendor = request.get("maxCategoriesPerVendor")
+    if max_per_vendor is not None and (not isinstance(max_per_vendor, int) or max_per_vendor < 1):
+        raise ValueError("maxCategoriesPerVendor must be a positive integer")
+
+    required = vendor_ids("requiredVendors")
+    excluded = vendor_ids("excludedVendors")
+    if required & excluded:
+        raise ValueError("A vendor cannot be both required and excluded")
+
+    bundle_discounts: Dict[int, List[Tuple[int, float]]] = {}
+    for tier in request.get("bundleDiscounts") or []:
+        try:
+            vendor_id = int(tier["vendorId"])
+            min_categories = int(tier["minCategories"])
+            percent = float(tier["discountPercent"])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("Each bundle discount needs vendorId, minCategories and discountPercent")
+        if min_categories < 1 or not 0 < percent < 100:
+            raise ValueError("Bundle discounts need minCategories >= 1 and a discountPercent between 0 and 100")
+        bundle_discounts.setdefault(vendor_id, []).append((min_categories, percent / 100))
+
+    return {
+        "max_per_vendor": max_per_vendor,
+        "required_vendors": required,
+        "excluded_vendors": excluded,
+        "bundle_discounts": bundle_discounts,
+    }
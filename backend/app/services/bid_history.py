@@ -0,0 +1,208 @@
+import bisect
+import math
+import os
+import struct
+import threading
+import time
+from array import array
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.metrics import REGISTRY
+
+# One fixed-size little-endian record per bid revision:
+# timestamp (ms since epoch), vendor id, bid amount (NaN = none), status code
+RECORD = struct.Struct("<qIdB")
+
+# Statuses are stored as a one-byte code; the position in this tuple is the code.
+# Only append to it - existing files depend on the numbering.
+BID_STATUSES = ("", "invited", "pending", "submitted", "declined", "selected", "not_selected")
+_STATUS_CODES = {status: code for code, status in enumerate(BID_STATUSES)}
+
+BID_HISTORY_APPENDS = REGISTRY.counter(
+    "bid_history_appends_total",
+    "Bid revisions appended to the bid history store.",
+)
+
+
+def status_code(status: Optional[str]) -> int:
+    return _STATUS_CODES.get(status or "", 0)
+
+
+class _VendorSeries:
+    """One vendor's revisions in a category, as parallel columns in time order."""
+
+    __slots__ = ("times", "amounts", "statuses")
+
+    def __init__(self):
+        self.times = array("q")
+        self.amounts = array("d")
+        self.statuses = array("B")
+
+
+class _CategoryIndex:
+    __slots__ = ("offset", "vendors")
+
+    def __init__(self):
+        # Bytes of the category's file already indexed
+        self.offset = 0
+        self.vendors: Dict[int, _VendorSeries] = {}
+
+
+class BidHistoryStore:
+    """
+    Append-only history of every bid revision, one file per category.
+
+    Each revision is a 21-byte binary record appended with a single O_APPEND write,
+    so recording a change never rewrites the main data file or earlier history, and
+    appends from several worker processes don't interleave. Readers keep an index of
+    each category per vendor, in time order, and on every query read only the bytes
+    appended since they last looked - so the index is correct across workers without
+    any coordination beyond the file itself.
+    """
+
+    def __init__(self, directory: str = "data/bid_history"):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._indexes: Dict[int, _CategoryIndex] = {}
+
+    def _path(self, category_id: int) -> str:
+        return os.path.join(self.directory, f"category_{category_id}.bids")
+
+    def append(self, category_id: int, vendor_id: int, bid_amount: Optional[float],
+               bid_status: Optional[str], timestamp_ms: Optional[int] = None):
+        """Record one revision of a vendor's bid in a category."""
+        if timestamp_ms is None:
+            timestamp_ms = time.time_ns() // 1_000_000
+        amount = float(bid_amount) if bid_amount is not None else math.nan
+        record = RECORD.pack(timestamp_ms, vendor_id, amount, status_code(bid_status))
+
+        fd = os.open(self._path(category_id), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, record)
+        finally:
+            os.close(fd)
+        BID_HISTORY_APPENDS.inc()
+
+    def _index(self, category_id: int) -> _CategoryIndex:
+        """The category's index, caught up with anything appended since the last call."""
+        with self._lock:
+            index = self._indexes.setdefault(category_id, _CategoryIndex())
+            try:
+                with open(self._path(category_id), "rb") as file:
+                    file.seek(index.offset)
+                    new_bytes = file.read()
+            except FileNotFoundError:
+                return index
+
+            # Ignore a partially written record at the end; it is picked up next time
+            usable = len(new_bytes) - len(new_bytes) % RECORD.size
+            for timestamp, vendor_id, amount, code in RECORD.iter_unpack(new_bytes[:usable]):
+                series = index.vendors.get(vendor_id)
+                if series is None:
+                    series = index.vendors[vendor_id] = _VendorSeries()
+                if series.times and timestamp < series.times[-1]:
+                    # A clock step backwards; keep the series ordered for bisect
+                    timestamp = series.times[-1]
+                series.times.append(timestamp)
+                series.amounts.append(amount)
+                series.statuses.append(code)
+            index.offset += usable
+            return index
+
+    def has_history(self, category_id: int, vendor_id: int) -> bool:
+        return vendor_id in self._index(category_id).vendors
+
+    def time_span(self, category_id: int) -> Optional[Tuple[int, int]]:
+        """(first, last) revision time in the category, or None if it has no history."""
+        vendors = self._index(category_id).vendors.values()
+        if not vendors:
+            return None
+        return min(series.times[0] for series in vendors), max(series.times[-1] for series in vendors)
+
+    def revisions(self, category_id: int, vendor_id: int, start_ms: Optional[int] = None,
+                  end_ms: Optional[int] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """A vendor's revision trail in a category, oldest first, within [start_ms, end_ms]."""
+        series = self._index(category_id).vendors.get(vendor_id)
+        if series is None:
+            return []
+
+        first = bisect.bisect_left(series.times, start_ms) if start_ms is not None else 0
+        last = bisect.bisect_right(series.times, end_ms) if end_ms is not None else len(series.times)
+        if limit is not None:
+            # Keep the most recent revisions
+            first = max(first, last - limit)
+
+        trail = []
+        previous = series.amounts[first - 1] if first > 0 else math.nan
+        for position in range(first, last):
+            amount = series.amounts[position]
+            trail.append({
+                "timestamp": _iso(series.times[position]),
+                "bidAmount": None if math.isnan(amount) else amount,
+                "bidStatus": _status_name(series.statuses[position]),
+                "change": None if math.isnan(amount) or math.isnan(previous) else amount - previous,
+            })
+            previous = amount
+        return trail
+
+    def price_series(self, category_id: int, start_ms: int, end_ms: int, buckets: int,
+                     vendor_ids: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+        """
+        Bid price over time for charts, downsampled to at most `buckets` points per vendor.
+
+        The range is split into equal buckets. Each point is the price in effect at the
+        end of its bucket, with the lowest and highest price seen during it and the
+        number of revisions, so a chart stays faithful however many revisions there were.
+        Revisions without a positive amount (an invitation, a decline) don't move the price.
+        """
+        index = self._index(category_id)
+        width = max(1, math.ceil((end_ms - start_ms + 1) / max(1, buckets)))
+        result = []
+
+        for vendor_id in sorted(index.vendors):
+            if vendor_ids is not None and vendor_id not in vendor_ids:
+                continue
+            series = index.vendors[vendor_id]
+
+            # The price carried into the range from before it started
+            position = bisect.bisect_left(series.times, start_ms)
+            price = _last_price(series.amounts, position)
+
+            points = []
+            bucket_start = start_ms
+            while bucket_start <= end_ms:
+                bucket_end = min(bucket_start + width - 1, end_ms)
+                stop = bisect.bisect_right(series.times, bucket_end, lo=position)
+                prices = [amount for amount in series.amounts[position:stop] if amount > 0]
+                if prices:
+                    low, high = min(prices), max(prices)
+                    if price is not None:
+                        low, high = min(low, price), max(high, price)
+                    price = prices[-1]
+                    points.append({"timestamp": _iso(bucket_start), "price": price, "min": low,
+                                   "max": high, "revisions": stop - position})
+                elif price is not None:
+                    points.append({"timestamp": _iso(bucket_start), "price": price, "min": price,
+                                   "max": price, "revisions": stop - position})
+                position = stop
+                bucket_start += width
+
+            result.append({"vendorId": vendor_id, "points": points})
+        return result
+
+
+def _iso(timestamp_ms: int) -> str:
+    return datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc).isoformat(timespec="milliseconds")
+
+
+def _status_name(code: int) -> Optional[str]:
+    return BID_STATUSES[code] or None if code < len(BID_STATUSES) else None
+
+
+def _last_price(amounts: array, before: int) -> Optional[float]:
+    for position in range(before - 1, -1, -1):
+        if amounts[position] > 0:
+            return amounts[position]
+    return None
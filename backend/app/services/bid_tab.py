@@ -0,0 +1,395 @@
+import asyncio
+import concurrent.futures
+import csv
+import hashlib
+import html
+import io
+import json
+import multiprocessing
+import os
+import threading
+import zipfile
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape as xml_escape
+
+from app.core.metrics import REGISTRY
+
+REPORT_REQUESTS = REGISTRY.counter(
+    "bid_tab_reports_total",
+    "Bid tabulation report requests by format and result: cached (served from disk), "
+    "joined (waited for a generation already running) or generated.",
+    ["format", "result"],
+)
+
+FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+    "html": ("text/html; charset=utf-8", "html"),
+}
+
+# Bids that carry a price the vendor stands behind (as in DataService)
+PRICED_BID_STATUSES = ("submitted", "selected", "not_selected")
+AWARDED_BID_STATUS = "selected"
+
+
+class ReportNotReadyError(Exception):
+    """The report is still being generated."""
+
+
+# Report input - assembled from a snapshot in the API process, small and picklable
+
+def report_input(project: Dict[str, Any], categories: List[Dict[str, Any]],
+                 vendor_names: Dict[int, str]) -> Dict[str, Any]:
+    """
+    Everything a bid tab shows, taken from the data: the project, its categories'
+    estimates and priced bids, and the awards. Its digest is the report's version.
+    """
+    rows = []
+    vendor_ids = set()
+    for category in categories:
+        bids = {}
+        award = None
+        for participation in category.get("vendorParticipation", []):
+            amount = participation.get("bidAmount") or 0
+            if participation.get("bidStatus") not in PRICED_BID_STATUSES or amount <= 0:
+                continue
+            bids[participation["vendorId"]] = amount
+            if participation.get("bidStatus") == AWARDED_BID_STATUS:
+                award = {"vendorId": participation["vendorId"], "amount": amount}
+        vendor_ids.update(bids)
+        rows.append({
+            "categoryId": category["id"],
+            "category": category.get("name", ""),
+            "estimate": category.get("estimatedValue"),
+            # JSON object keys are strings; keep the pairs as a list so the digest is stable
+            "bids": sorted(bids.items()),
+            "award": award,
+        })
+    return {
+        "project": {key: project.get(key) for key in ("id", "name", "client", "bidDeadline")},
+        "vendors": [{"id": vendor_id, "name": vendor_names.get(vendor_id, f"Vendor {vendor_id}")}
+                    for vendor_id in sorted(vendor_ids)],
+        "rows": rows,
+    }
+
+
+def input_digest(data: Dict[str, Any]) -> str:
+    content = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+    return hashlib.sha256(content).hexdigest()
+
+
+# Tabulation and rendering - run in the report worker processes
+
+def _deviation(amount: Optional[float], estimate: Optional[float]) -> Optional[float]:
+    if amount is None or not estimate:
+        return None
+    return round((amount - estimate) / estimate * 100, 1)
+
+
+def tabulate(data: Dict[str, Any]) -> Tuple[List[str], List[List[Any]]]:
+    """
+    The bid tab as a header and rows of cells. One row per category: the estimate,
+    each vendor's bid and its deviation from the estimate, the low bid, and the
+    award; then a totals row. Missing bids are None.
+    """
+    vendors = data["vendors"]
+    header = ["Category", "Estimate"]
+    for vendor in vendors:
+        header += [vendor["name"], f"{vendor['name']} vs estimate %"]
+    header += ["Low bid", "Low bidder", "Low bid vs estimate %", "Awarded to", "Award amount",
+               "Award vs estimate %"]
+    names = {vendor["id"]: vendor["name"] for vendor in vendors}
+
+    rows = []
+    totals = {"estimate": 0, "low": 0, "award": 0, "vendors": {vendor["id"]: 0 for vendor in vendors}}
+    for row in data["rows"]:
+        bids = dict(row["bids"])
+        estimate = row["estimate"]
+        cells: List[Any] = [row["category"], estimate]
+        for vendor in vendors:
+            amount = bids.get(vendor["id"])
+            cells += [amount, _deviation(amount, estimate)]
+            totals["vendors"][vendor["id"]] += amount or 0
+        low_vendor = min(bids, key=lambda vendor_id: (bids[vendor_id], vendor_id)) if bids else None
+        low = bids[low_vendor] if low_vendor is not None else None
+        award = row["award"]
+        cells += [low, names.get(low_vendor) if low_vendor is not None else None, _deviation(low, estimate),
+                  names.get(award["vendorId"]) if award else None, award["amount"] if award else None,
+                  _deviation(award["amount"], estimate) if award else None]
+        rows.append(cells)
+        totals["estimate"] += estimate or 0
+        totals["low"] += low or 0
+        totals["award"] += award["amount"] if award else 0
+
+    total_cells: List[Any] = ["Total", totals["estimate"]]
+    for vendor in vendors:
+        total_cells += [totals["vendors"][vendor["id"]], None]
+    total_cells += [totals["low"], None, _deviation(totals["low"], totals["estimate"]), None,
+                    totals["award"], None]
+    rows.append(total_cells)
+    return header, rows
+
+
+def _title(data: Dict[str, Any]) -> str:
+    project = data["project"]
+    return f"Bid tabulation - {project.get('name') or 'Project ' + str(project.get('id'))}"
+
+
+def render_csv(data: Dict[str, Any], generated_at: str) -> bytes:
+    header, rows = tabulate(data)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([_title(data)])
+    writer.writerow([f"Client: {data['project'].get('client') or ''}", f"Generated: {generated_at}"])
+    writer.writerow([])
+    writer.writerow(header)
+    writer.writerows(["" if cell is None else cell for cell in row] for row in rows)
+    # Excel detects UTF-8 CSV by the byte order mark
+    return buffer.getvalue().encode("utf-8-sig")
+
+
+def render_html(data: Dict[str, Any], generated_at: str) -> bytes:
+    header, rows = tabulate(data)
+
+    def cell(value: Any, tag: str = "td") -> str:
+        if value is None:
+            return f"<{tag}></{tag}>"
+        if isinstance(value, (int, float)):
+            return f'<{tag} class="num">{value:,.2f}</{tag}>' if tag == "td" else f"<{tag}>{value}</{tag}>"
+        return f"<{tag}>{html.escape(str(value))}</{tag}>"
+
+    title = html.escape(_title(data))
+    body_rows = "\n".join(
+        f"<tr{' class=total' if index == len(rows) - 1 else ''}>{''.join(cell(value) for value in row)}</tr>"
+        for index, row in enumerate(rows)
+    )
+    document = f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: system-ui, sans-serif; margin: 2rem; color: #1f2937; }}
+table {{ border-collapse: collapse; font-size: 0.85rem; }}
+th, td {{ border: 1px solid #d1d5db; padding: 0.35rem 0.6rem; }}
+th {{ background: #f3f4f6; text-align: left; }}
+td.num {{ text-align: right; font-variant-numeric: tabular-nums; }}
+tr.total td {{ font-weight: 600; background: #f9fafb; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+<p>Client: {html.escape(str(data['project'].get('client') or ''))} &middot; Generated {html.escape(generated_at)}</p>
+<table>
+<thead><tr>{''.join(cell(name, 'th') for name in header)}</tr></thead>
+<tbody>
+{body_rows}
+</tbody>
+</table>
+</body>
+</html>
+"""
+    return document.encode("utf-8")
+
+
+def _column_name(index: int) -> str:
+    name = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        name = chr(65 + remainder) + name
+    return name
+
+
+def render_xlsx(data: Dict[str, Any], generated_at: str) -> bytes:
+    """A single-sheet workbook, written as SpreadsheetML directly - no spreadsheet library needed."""
+    header, rows = tabulate(data)
+    sheet_rows = [[_title(data)], [f"Client: {data['project'].get('client') or ''}", f"Generated: {generated_at}"],
+                  [], header, *rows]
+    bold_rows = {4, len(sheet_rows)}  # header and totals, 1-based
+
+    xml_rows = []
+    for row_number, row in enumerate(sheet_rows, start=1):
+        style = ' s="1"' if row_number in bold_rows or row_number == 1 else ""
+        cells = []
+        for column, value in enumerate(row):
+            if value is None:
+                continue
+            reference = f"{_column_name(column)}{row_number}"
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                number_style = ' s="3"' if row_number in bold_rows else ' s="2"'
+                cells.append(f'<c r="{reference}"{number_style}><v>{value}</v></c>')
+            else:
+                cells.append(f'<c r="{reference}" t="inlineStr"{style}><is><t>{xml_escape(str(value))}</t></is></c>')
+        xml_rows.append(f'<row r="{row_number}">{"".join(cells)}</row>')
+
+    sheet = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+             '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+             '<sheetViews><sheetView workbookViewId="0"><pane ySplit="4" topLeftCell="A5" state="frozen"/>'
+             '</sheetView></sheetViews>'
+             '<cols><col min="1" max="1" width="32" customWidth="1"/>'
+             f'<col min="2" max="{max(2, len(header))}" width="16" customWidth="1"/></cols>'
+             f'<sheetData>{"".join(xml_rows)}</sheetData></worksheet>')
+    styles = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+              '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+              '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+              '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+              '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+              '<fill><patternFill patternType="gray125"/></fill></fills>'
+              '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+              '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+              '<cellXfs count="4"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+              '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/>'
+              '<xf numFmtId="4" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+              '<xf numFmtId="4" fontId="1" fillId="0" borderId="0" xfId="0" applyNumberFormat="1" applyFont="1"/>'
+              '</cellXfs></styleSheet>')
+    parts = {
+        "[Content_Types].xml": (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/worksheets/sheet1.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            '<Override PartName="/xl/styles.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+            '</Types>'),
+        "_rels/.rels": (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+            'Target="xl/workbook.xml"/></Relationships>'),
+        "xl/workbook.xml": (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            '<sheets><sheet name="Bid tab" sheetId="1" r:id="rId1"/></sheets></workbook>'),
+        "xl/_rels/workbook.xml.rels": (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+            'Target="worksheets/sheet1.xml"/>'
+            '<Relationship Id="rId2" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+            'Target="styles.xml"/></Relationships>'),
+        "xl/styles.xml": styles,
+        "xl/worksheets/sheet1.xml": sheet,
+    }
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in parts.items():
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+_RENDERERS = {"csv": render_csv, "xlsx": render_xlsx, "html": render_html}
+
+
+def generate_report(data: Dict[str, Any], report_format: str, path: str) -> str:
+    """Render a report and write it to `path` atomically. Runs in a report worker process."""
+    content = _RENDERERS[report_format](data, datetime.now().isoformat(timespec="seconds"))
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as file:
+        file.write(content)
+    os.replace(temp_path, path)
+    return path
+
+
+def _lower_priority():
+    """Report workers yield the CPU to the API processes."""
+    try:
+        os.nice(10)
+    except (AttributeError, OSError):
+        pass
+
+
+# Report generation and caching - in the API process
+
+class BidTabReports:
+    """
+    Bid tabulation reports, generated in a pool of worker processes and kept on disk.
+
+    A report is named by its project, scope, format and the digest of the data it
+    shows, so a report is generated once per version of that data and served from
+    disk after that; a request for a report that is already being generated waits
+    for it instead of starting another. Generation runs in separate, lower-priority
+    processes, so rendering a large report never holds the GIL or a CPU that API
+    requests need. Older versions of a report are deleted when a new one is written.
+    """
+
+    def __init__(self, directory: str = "data/reports", workers: int = 1):
+        self.directory = directory
+        self.workers = max(1, workers)
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        self._running: Dict[str, "concurrent.futures.Future[str]"] = {}
+
+    def _executor(self) -> concurrent.futures.ProcessPoolExecutor:
+        """The worker pool, started on first use (call with _lock held)."""
+        if self._pool is None:
+            # spawn, not fork: the API process has threads that must not be copied mid-flight
+            self._pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                initializer=_lower_priority,
+            )
+        return self._pool
+
+    def report_path(self, name: str, digest: str, report_format: str) -> str:
+        return os.path.join(self.directory, f"{name}-{digest[:20]}.{FORMATS[report_format][1]}")
+
+    async def get(self, name: str, data: Dict[str, Any], report_format: str, wait: float) -> str:
+        """
+        The path of the report for this data, generating it if needed. Waits up to
+        `wait` seconds for a generation, then raises ReportNotReadyError; the
+        generation carries on, and asking again later returns the finished report.
+        """
+        path = self.report_path(name, input_digest(data), report_format)
+        if os.path.exists(path):
+            REPORT_REQUESTS.inc(report_format, "cached")
+            return path
+
+        with self._lock:
+            future = self._running.get(path)
+            started = future is None
+            if started:
+                REPORT_REQUESTS.inc(report_format, "generated")
+                future = self._running[path] = self._executor().submit(generate_report, data, report_format, path)
+            else:
+                REPORT_REQUESTS.inc(report_format, "joined")
+        if started:
+            # Outside the lock: a future that is already done runs the callback right here
+            future.add_done_callback(lambda done: self._finished(name, path, done))
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), wait)
+        except asyncio.TimeoutError:
+            raise ReportNotReadyError(path) from None
+
+    def _finished(self, name: str, path: str, future: "concurrent.futures.Future[str]"):
+        with self._lock:
+            if self._running.get(path) is future:
+                del self._running[path]
+        if future.cancelled() or future.exception() is not None:
+            return
+        # Older versions of the same report are superseded
+        prefix, extension = f"{name}-", os.path.splitext(path)[1]
+        for filename in os.listdir(self.directory):
+            candidate = os.path.join(self.directory, filename)
+            if (filename.startswith(prefix) and filename.endswith(extension) and candidate != path
+                    and filename[len(prefix):-len(extension)].count("-") == 0):
+                try:
+                    os.remove(candidate)
+                except FileNotFoundError:
+                    pass
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
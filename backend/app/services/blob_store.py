@@ -0,0 +1,71 @@
+import hashlib
+import os
+import uuid
+from typing import AsyncIterator, Optional, Tuple
+
+from anyio import to_thread
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload stream exceeds the configured size limit."""
+
+
+class BlobStore:
+    """
+    Content-addressed file storage for uploaded documents.
+
+    Each file is stored once under the SHA-256 of its contents, so the same
+    drawing set uploaded to ten projects takes the disk space of one. Uploads
+    are streamed to a temporary file while being hashed, so memory use stays
+    flat regardless of file size.
+    """
+
+    def __init__(self, root: str = "data/blobs"):
+        self.root = root
+        self.temp_dir = os.path.join(root, "tmp")
+        os.makedirs(self.temp_dir, exist_ok=True)
+
+    def path_for(self, content_hash: str) -> str:
+        """Where the blob with this hash lives: two levels of fan-out keep directories small."""
+        return os.path.join(self.root, content_hash[:2], content_hash[2:4], content_hash)
+
+    def exists(self, content_hash: str) -> bool:
+        return os.path.isfile(self.path_for(content_hash))
+
+    async def write_stream(self, chunks: AsyncIterator[bytes],
+                           max_bytes: Optional[int] = None) -> Tuple[str, int, bool]:
+        """
+        Store a stream of bytes and return (sha256 hex digest, size, deduplicated).
+        deduplicated is True when identical content was already stored.
+        Disk writes run in a worker thread so the event loop keeps serving requests.
+        """
+        digest = hashlib.sha256()
+        size = 0
+        temp_path = os.path.join(self.temp_dir, uuid.uuid4().hex)
+
+        try:
+            with open(temp_path, "wb") as file:
+                async for chunk in chunks:
+                    if not chunk:
+                        continue
+                    size += len(chunk)
+                    if max_bytes is not None and size > max_bytes:
+                        raise UploadTooLargeError(f"Upload exceeds the {max_bytes} byte limit")
+                    digest.update(chunk)
+                    await to_thread.run_sync(file.write, chunk)
+
+            content_hash = digest.hexdigest()
+            final_path = self.path_for(content_hash)
+            if os.path.isfile(final_path):
+                os.remove(temp_path)
+                return content_hash, size, True
+
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            os.replace(temp_path, final_path)
+            return content_hash, size, False
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
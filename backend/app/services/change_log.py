@@ -0,0 +1,204 @@
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.core.metrics import REGISTRY
+
+try:
+    import fcntl
+except ImportError:  # Windows - only the in-process lock applies there
+    fcntl = None
+
+CHANGES_LOGGED = REGISTRY.counter(
+    "change_log_entries_total",
+    "Record changes appended to the change log, by operation (created, updated or deleted).",
+    ["op"],
+)
+
+CREATED = "created"
+UPDATED = "updated"
+DELETED = "deleted"
+
+# Top-level collections whose records are tracked, by their "id"
+RECORD_COLLECTIONS = ("vendors", "groups", "projects", "categories", "documents")
+
+# (seq, collection, record id, op, unix time in ms)
+Entry = Tuple[int, str, Any, str, int]
+
+
+def diff_records(old: Iterable[Dict[str, Any]], new: Iterable[Dict[str, Any]]) -> List[Tuple[str, Any, str]]:
+    """
+    The records created, updated and deleted between two versions of some data, as
+    (collection, id, op). Each side is a list of dicts holding record collections -
+    the partitions a write replaced, and what replaced them - so a record that moved
+    from one partition to another counts as updated, not deleted and created.
+    """
+    before: Dict[Tuple[str, Any], Any] = {}
+    after: Dict[Tuple[str, Any], Any] = {}
+    for side, parts in ((before, old), (after, new)):
+        for part in parts:
+            for name in RECORD_COLLECTIONS:
+                for record in part.get(name) or ():
+                    side[(name, record["id"])] = record
+
+    changes = []
+    for key, record in after.items():
+        previous = before.get(key)
+        if previous is None:
+            changes.append((key[0], key[1], CREATED))
+        elif previous is not record and previous != record:
+            changes.append((key[0], key[1], UPDATED))
+    changes.extend((key[0], key[1], DELETED) for key in before if key not in after)
+    return changes
+
+
+class ChangeLog:
+    """
+    Append-only log of every record change, numbered by a sequence that only grows.
+
+    Each line of changes.log is one change: {"seq", "collection", "id", "op", "at"}.
+    Sequence numbers are handed out under a lock file, so they are unique and in
+    commit order across worker processes. Every process keeps the log in memory and
+    reads only the lines appended since it last looked, so `since` queries are a
+    binary search rather than a file scan.
+
+    Once the log holds more than max_entries changes, the older half is dropped and
+    changes.meta.json records the last sequence number dropped: a client that last
+    synced before it can no longer be brought up to date change by change and has
+    to fetch everything again.
+    """
+
+    def __init__(self, directory: str = "data/changes", max_entries: int = 100_000):
+        self.directory = directory
+        self.max_entries = max(2, max_entries)
+        os.makedirs(directory, exist_ok=True)
+        self._path = os.path.join(directory, "changes.log")
+        self._meta_path = os.path.join(directory, "changes.meta.json")
+        self._lock = threading.Lock()
+        self._exclusive_lock = threading.Lock()
+        # In-memory copy of the log, refreshed from the file (guarded by _lock)
+        self._entries: List[Entry] = []
+        self._seqs: List[int] = []
+        self._compacted_through = 0
+        self._file_id: Optional[Tuple[int, int]] = None
+        self._offset = 0
+
+    @contextmanager
+    def _exclusive(self):
+        """Serialize appends and compaction, across threads and worker processes."""
+        with self._exclusive_lock:
+            if fcntl is None:
+                yield
+                return
+            with open(os.path.join(self.directory, ".lock"), "a") as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _refresh(self):
+        """Bring the in-memory log up to date with the file (call with _lock held)."""
+        try:
+            stat = os.stat(self._path)
+        except FileNotFoundError:
+            return
+        file_id = (stat.st_dev, stat.st_ino)
+        if file_id != self._file_id:
+            # New or compacted file - read it from the start
+            self._entries, self._seqs, self._offset = [], [], 0
+            self._file_id = file_id
+            self._compacted_through = self._read_compacted_through()
+        if stat.st_size <= self._offset:
+            return
+
+        with open(self._path, "rb") as file:
+            file.seek(self._offset)
+            chunk = file.read(stat.st_size - self._offset)
+        # A line still being appended by another process is picked up next time
+        complete = chunk.rfind(b"\n") + 1
+        for line in chunk[:complete].splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            self._entries.append((entry["seq"], entry["collection"], entry["id"], entry["op"], entry["at"]))
+            self._seqs.append(entry["seq"])
+        self._offset += complete
+
+    def _read_compacted_through(self) -> int:
+        try:
+            with open(self._meta_path, encoding="utf-8") as file:
+                return int(json.load(file).get("compactedThrough", 0))
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def latest_seq(self) -> int:
+        with self._lock:
+            self._refresh()
+            return self._seqs[-1] if self._seqs else self._compacted_through
+
+    def append(self, changes: List[Tuple[str, Any, str]]) -> int:
+        """Log these (collection, id, op) changes in order. Returns the last sequence number used."""
+        if not changes:
+            return self.latest_seq()
+        with self._exclusive():
+            with self._lock:
+                self._refresh()
+                seq = self._seqs[-1] if self._seqs else self._compacted_through
+            now = int(time.time() * 1000)
+            lines = []
+            for collection, record_id, op in changes:
+                seq += 1
+                lines.append(json.dumps({"seq": seq, "collection": collection, "id": record_id,
+                                         "op": op, "at": now}, separators=(",", ":")))
+                CHANGES_LOGGED.inc(op)
+            with open(self._path, "a", encoding="utf-8") as file:
+                file.write("\n".join(lines) + "\n")
+                file.flush()
+                os.fsync(file.fileno())
+
+            with self._lock:
+                self._refresh()
+                if len(self._entries) > self.max_entries:
+                    self._compact()
+        return seq
+
+    def _compact(self):
+        """Drop the older half of the log (call with both locks held)."""
+        keep = self._entries[-(self.max_entries // 2):]
+        dropped_through = self._entries[-len(keep) - 1][0]
+        # The marker goes first: if we stop halfway, clients resync more than needed, never less
+        temp_meta = self._meta_path + ".tmp"
+        with open(temp_meta, "w", encoding="utf-8") as file:
+            json.dump({"compactedThrough": dropped_through}, file)
+        os.replace(temp_meta, self._meta_path)
+
+        temp_path = self._path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            for seq, collection, record_id, op, at in keep:
+                file.write(json.dumps({"seq": seq, "collection": collection, "id": record_id,
+                                       "op": op, "at": at}, separators=(",", ":")) + "\n")
+        os.replace(temp_path, self._path)
+        self._file_id = None
+        self._refresh()
+
+    def since(self, seq: int, limit: int = 1000) -> Dict[str, Any]:
+        """
+        Changes after sequence number `seq`, oldest first, at most `limit` of them:
+        {"entries": [...], "latestSeq", "resync", "hasMore"}. resync is true when
+        changes after `seq` have been compacted away (or `seq` is from a log that no
+        longer exists), and the caller has to start over from a full fetch.
+        """
+        with self._lock:
+            self._refresh()
+            latest = self._seqs[-1] if self._seqs else self._compacted_through
+            if seq < self._compacted_through or seq > latest:
+                return {"entries": [], "latestSeq": latest, "resync": True, "hasMore": False}
+            start = bisect.bisect_right(self._seqs, seq)
+            entries = self._entries[start:start + limit]
+            has_more = start + limit < len(self._entries)
+        return {"entries": entries, "latestSeq": latest, "resync": False, "hasMore": has_more}
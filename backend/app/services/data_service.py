@@ -1,70 +1,777 @@
+import contextvars
+import copy
 import json
+import logging
 import os
-from typing import List, Dict, Optional, Any
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterable, List, Dict, Optional, Any, Set, Tuple
 from datetime import datetime
 
+from app.core.log import add_request_timing
+from app.core.metrics import REGISTRY
+from app.services import award_optimizer, bid_tab, line_items
+from app.services.bid_history import BidHistoryStore
+from app.services.change_log import CREATED, DELETED, RECORD_COLLECTIONS, UPDATED, ChangeLog, diff_records
+from app.services.line_items import LineItemTable
+from app.services.participation import ParticipationTable, status_code, status_name
+from app.services.price_index import KLLSketch, price_summary, trade_key
+from app.services.partitioned_store import (
+    PARTITION_SUFFIX, SEQUENCES_PARTITION, SHARED_PARTITION, UNGROUPED_PARTITION, FileVersion, PartitionLocks,
+    group_partition, merge_partitions, partition_versions, project_partitions, same_records, split_partitions,
+)
+from app.services.shared_snapshot import SharedSnapshot
+from app.services.snapshot_store import SnapshotStore
+from app.services.vendor_service import DEFAULT_THRESHOLD, DuplicateVendorError, VendorDuplicateIndex
+
+try:
+    import fcntl
+except ImportError:  # Windows - only the in-process lock applies there
+    fcntl = None
+
+logger = logging.getLogger("app.storage")
+
+# Storage instrumentation - exposed at /metrics
+STORAGE_SECONDS = REGISTRY.histogram(
+    "data_service_operation_seconds",
+    "Time spent in DataService file operations (read, parse, serialize, write).",
+    ["operation"],
+)
+STORAGE_FAILURES = REGISTRY.counter(
+    "data_service_failures_total",
+    "DataService file operations that failed.",
+    ["operation"],
+)
+LOCK_WAIT_SECONDS = REGISTRY.histogram(
+    "data_service_lock_wait_seconds",
+    "Time mutations spent waiting for the data file write lock.",
+)
+DATA_FILE_BYTES = REGISTRY.gauge(
+    "data_service_file_bytes",
+    "Size of the JSON data file as of the last read or write.",
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "data_service_cache_requests_total",
+    "Reads served from the parsed-data cache (hit) or by re-reading the file (miss).",
+    ["result"],
+)
+
+TRANSACTIONS = REGISTRY.counter(
+    "data_service_transactions_total",
+    "DataService transactions by outcome (committed or rolled_back).",
+    ["outcome"],
+)
+
+
+class _Transaction:
+    """Staged changes of an open DataService.transaction() block."""
+
+    __slots__ = ("service", "data", "after_commit")
+
+    def __init__(self, service: "DataService", data: Dict[str, Any]):
+        self.service = service
+        self.data = data
+        self.after_commit: List[Callable[[], None]] = []
+
+
+# The transaction open in the current request, if any. A context variable follows the
+# request into run_in_threadpool calls but is never visible to other requests.
+_current_transaction: contextvars.ContextVar[Optional[_Transaction]] = contextvars.ContextVar(
+    "data_service_transaction", default=None
+)
+
+# Held by a write that locked every partition
+_ALL_PARTITIONS = object()
+
+# The snapshot pinned by DataService.consistent_reads() in the current request, if any
+_pinned_snapshot: contextvars.ContextVar[Optional[Tuple["DataService", Dict[str, Any]]]] = contextvars.ContextVar(
+    "data_service_pinned_snapshot", default=None
+)
+
+@contextmanager
+def _timed(operation: str):
+    """Time a storage phase for both /metrics and the current request's log entry."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STORAGE_SECONDS.observe(elapsed, operation)
+        add_request_timing("storage" + operation.capitalize(), elapsed)
+
+
+@contextmanager
+def _file_lock(lock_path: str):
+    """Exclusive advisory lock on a file, shared by every process using the same data file."""
+    if fcntl is None:
+        yield
+        return
+    with open(lock_path, "a") as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+# Statuses that feed the group rollups
+ACTIVE_PROJECT_STATUSES = ("active", "early")
+COMPLETED_PROJECT_STATUS = "complete"
+BID_STATUSES = ("invited", "pending", "submitted", "declined", "selected", "not_selected")
+AWARDED_BID_STATUSES = ("selected",)
+# Bids that carry a price the vendor stands behind
+PRICED_BID_STATUSES = ("submitted", "selected", "not_selected")
+OUTSTANDING_BID_STATUSES = ("invited", "pending")
+
+# Interned codes of the statuses above, for scans over a ParticipationTable
+_PRICED_CODES = tuple(status_code(status) for status in PRICED_BID_STATUSES)
+_SUBMITTED_CODE = status_code("submitted")
+
+# What a dashboard project card shows
+DASHBOARD_PROJECT_FIELDS = ("id", "name", "client", "status", "estimatedValue", "bidDeadline",
+                            "startDate", "groupId", "location", "lastUpdated")
+
+
+def _empty_rollup() -> Dict[str, float]:
+    return {
+        "projectCount": 0,
+        "totalValue": 0,
+        "activeProjects": 0,
+        "completedProjects": 0,
+        "awardedAmount": 0,
+        "outstandingQuotes": 0,
+    }
+
+
+def _project_contribution(project: Dict[str, Any], categories: List[Dict[str, Any]]) -> Dict[str, float]:
+    """
+    What a single project adds to its group's rollup.
+    Group rollups are the sum of these, so a change to one project is applied
+    by subtracting its old contribution and adding its new one.
+    """
+    awarded_amount = 0
+    outstanding_quotes = 0
+    for category in categories:
+        for participation in category.get("vendorParticipation", []):
+            status = participation.get("bidStatus")
+            if status in AWARDED_BID_STATUSES:
+                awarded_amount += participation.get("bidAmount") or 0
+            elif status in OUTSTANDING_BID_STATUSES:
+                outstanding_quotes += 1
+
+    status = project.get("status")
+    return {
+        "projectCount": 1,
+        "totalValue": project.get("estimatedValue", 0) or 0,
+        "activeProjects": 1 if status in ACTIVE_PROJECT_STATUSES else 0,
+        "completedProjects": 1 if status == COMPLETED_PROJECT_STATUS else 0,
+        "awardedAmount": awarded_amount,
+        "outstandingQuotes": outstanding_quotes,
+    }
+
+
+def _date_to_ms(value: Optional[str]) -> Optional[int]:
+    """Milliseconds since the epoch for a YYYY-MM-DD date, or None if it isn't one."""
+    try:
+        return int(datetime.strptime(value, "%Y-%m-%d").timestamp() * 1000)
+    except (TypeError, ValueError):
+        return None
+
+
 class DataService:
     """
     A simple file-based data service that mimics database operations.
     This teaches the same patterns as database access but uses JSON file storage.
     """
     
-    def __init__(self, data_file_path: str = "data/application_data.json"):
+    def __init__(self, data_file_path: str = "data/application_data.json",
+                 shared_snapshot_dir: Optional[str] = None, bid_history_dir: Optional[str] = None,
+                 snapshots: Optional[SnapshotStore] = None, change_log: Optional[ChangeLog] = None):
         """
         Initialize the data service with the path to your JSON data file.
         This is like establishing a database connection, but for file access.
+
+        The data is stored partitioned by project group, one file per partition in
+        a directory next to the data file (see partitioned_store). A data file from
+        before partitioning is split into partitions the first time it is opened
+        and is not written to after that.
+
+        With shared_snapshot_dir set, worker processes share one parse of each
+        partition version through a memory-mapped snapshot (see SharedSnapshot).
+        With bid_history_dir set, every bid change is also appended to the
+        bid history store (see BidHistoryStore).
+        With a SnapshotStore, point-in-time snapshots can be taken and restored,
+        and one is taken automatically before destructive operations.
+        With a ChangeLog, every record created, updated or deleted is logged with a
+        sequence number, for clients that sync incrementally (see get_changes).
         """
         self.data_file_path = data_file_path
+        self.partition_dir = os.path.splitext(data_file_path)[0] + "_partitions"
+        self._shared_dir = shared_snapshot_dir
+        self._shared: Dict[str, SharedSnapshot] = {}
+        self.bid_history = BidHistoryStore(bid_history_dir) if bid_history_dir else None
+        self.snapshots = snapshots
+        self.change_log = change_log
+        # Serializes read-modify-write cycles per partition, so concurrent mutations
+        # can't lose each other's changes while writes to different groups run in parallel
+        self._partition_locks = PartitionLocks(self.partition_dir)
+        # The partitions this thread's current write holds, and what it read them as
+        self._write_state = threading.local()
+        # partition -> (file version, parsed partition) of the last read or write
+        self._partitions: Dict[str, Tuple[Optional[FileVersion], Dict[str, Any]]] = {}
+        # (versions of all partitions, merged data) of the last read or write
+        self._cache: Optional[Tuple[Tuple[Tuple[str, FileVersion], ...], Dict[str, Any]]] = None
+        # category id -> (lineItems, unitPrices, table); reused while the snapshot's columns are unchanged
+        self._line_item_tables: Dict[int, Tuple[Any, Any, LineItemTable]] = {}
+        # (categories, table) - the bids of the latest snapshot in columnar form
+        self._participation_cache: Optional[Tuple[List[Dict[str, Any]], ParticipationTable]] = None
+        # collection name -> (record list, id -> record) of the latest snapshot, for batch lookups
+        self._id_indexes: Dict[str, Tuple[List[Dict[str, Any]], Dict[Any, Dict[str, Any]]]] = {}
+        # (snapshot, price index) merged from the partitions' indexes, or built for data without one
+        self._price_index_cache: Optional[Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]] = None
+        # (vendor list, vendors indexed, last vendor indexed, index) for duplicate detection;
+        # kept up to date incrementally as vendors are appended
+        self._vendor_index: Optional[Tuple[List[Dict[str, Any]], int, Dict[str, Any], VendorDuplicateIndex]] = None
+        self._vendor_index_lock = threading.Lock()
         self._ensure_data_file_exists()
     
     def _ensure_data_file_exists(self):
         """
-        Create the data file if it doesn't exist, with empty collections.
+        Create the partitions if they don't exist: from the single data file when there
+        is one, otherwise with empty collections.
         This is like initializing a database with empty tables.
         """
-        if not os.path.exists(self.data_file_path):
-            # Create the directory if it doesn't exist
-            os.makedirs(os.path.dirname(self.data_file_path), exist_ok=True)
-            
-            # Initialize with empty collections
-            empty_data = {
-                "vendors": [],
-                "projects": [],
-                "categories": [],
-                "documents": []
-            }
-            self._write_data(empty_data)
-    
-    def _read_data(self) -> Dict[str, Any]:
+        if os.path.exists(os.path.join(self.partition_dir, SHARED_PARTITION + PARTITION_SUFFIX)):
+            return
+        os.makedirs(self.partition_dir, exist_ok=True)
+
+        # Several workers may start at once; only the first one splits the file
+        with _file_lock(os.path.join(self.partition_dir, "migrate.lock")):
+            if os.path.exists(os.path.join(self.partition_dir, SHARED_PARTITION + PARTITION_SUFFIX)):
+                return
+            data = self._load_from_disk(self.data_file_path) if os.path.exists(self.data_file_path) else None
+            if data is None:
+                data = {"vendors": [], "projects": [], "categories": [], "documents": []}
+            self._upgrade(data)
+            for key, partition in split_partitions(data).items():
+                self._write_partition(key, partition)
+            logger.info("data file split into partitions", extra={
+                "path": self.data_file_path,
+                "partitionDir": self.partition_dir,
+                "partitions": len(os.listdir(self.partition_dir)),
+            })
+
+    def _upgrade(self, data: Dict[str, Any]):
         """
-        Read the entire data file into memory.
-        This is like executing a SELECT * query to get all data.
+        Bring data from the single-file layout up to what partitioned writes rely on:
+        every group has its stored rollup and project list, the price index is kept
+        per partition, and id sequences exist.
+        """
+        self._ensure_group_rollups(data)
+        for group in data.get("groups", []):
+            group.setdefault("projectIds", [p["id"] for p in data.get("projects", [])
+                                            if p.get("groupId") == group["id"]])
+        data.pop("priceIndex", None)
+        if "priceIndexes" not in data:
+            data["priceIndexes"] = self._compute_partition_price_indexes(data)
+        data.setdefault("sequences", {})
+
+    def data_version(self) -> Tuple[Tuple[str, FileVersion], ...]:
+        """
+        An opaque token that changes whenever the data changes - for keying work
+        derived from the data, such as coalesced reads.
         """
+        return tuple(sorted(partition_versions(self.partition_dir).items()))
+
+    def _partition_path(self, key: str) -> str:
+        return os.path.join(self.partition_dir, key + PARTITION_SUFFIX)
+
+    def _load_from_disk(self, path: str) -> Optional[Dict[str, Any]]:
+        """
+        Read and parse one JSON file. Returns None if it is missing or corrupt.
+        """
+        start = time.perf_counter()
         try:
-            with open(self.data_file_path, 'r', encoding='utf-8') as file:
-                return json.load(file)
+            with _timed("read"):
+                with open(path, 'r', encoding='utf-8') as file:
+                    raw = file.read()
+
+            with _timed("parse"):
+                data = json.loads(raw)
+            logger.debug("data file read", extra={
+                "path": path,
+                "bytes": len(raw),
+                "durationMs": round((time.perf_counter() - start) * 1000, 3),
+            })
+            return data
         except (FileNotFoundError, json.JSONDecodeError) as e:
-            print(f"Error reading data file: {e}")
-            # Return empty structure if file is corrupted or missing
-            return {
-                "vendors": [],
-                "projects": [],
-                "categories": [],
-                "documents": []
-            }
+            STORAGE_FAILURES.inc("read")
+            logger.error("data file unreadable, falling back to an empty dataset", extra={
+                "path": path,
+                "error": f"{type(e).__name__}: {e}",
+                "durationMs": round((time.perf_counter() - start) * 1000, 3),
+            })
+            return None
+
+    def _shared_snapshot(self, key: str) -> Optional[SharedSnapshot]:
+        if self._shared_dir is None:
+            return None
+        shared = self._shared.get(key)
+        if shared is None:
+            shared = self._shared[key] = SharedSnapshot(os.path.join(self._shared_dir, key))
+        return shared
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Return all the data, merged from the partitions, re-reading only the
+        partitions that have changed on disk.
+        This is like a database buffer cache: repeated reads are served from memory.
+
+        The returned data is shared between all readers - treat it as read-only.
+        Code that modifies data should use _read_data() to get a private copy.
+        Inside a transaction, reads see the transaction's own uncommitted changes;
+        inside a consistent_reads() block, they all see the same version.
+        """
+        transaction = self._transaction()
+        if transaction is not None:
+            return transaction.data
+        pinned = _pinned_snapshot.get()
+        if pinned is not None and pinned[0] is self:
+            return pinned[1]
+        return self._latest_snapshot()
+
+    def _latest_snapshot(self) -> Dict[str, Any]:
+        """The newest version of the data, from the cache while no partition has changed."""
+        return self._latest_partitions()[1]
+
+    def _latest_partitions(self) -> Tuple[Dict[str, Tuple[Optional[FileVersion], Dict[str, Any]]], Dict[str, Any]]:
+        """The newest version of every partition, and the data merged from them."""
+        versions = partition_versions(self.partition_dir)
+        version_key = tuple(sorted(versions.items()))
+        cached = self._cache
+        partitions = self._partitions
+        if cached is not None and cached[0] == version_key:
+            CACHE_REQUESTS.inc("hit")
+            return partitions, cached[1]
+
+        CACHE_REQUESTS.inc("miss")
+        refreshed = {}
+        complete = True
+        for key, version in versions.items():
+            current = partitions.get(key)
+            if current is not None and current[0] == version:
+                refreshed[key] = current
+                continue
+            shared = self._shared_snapshot(key)
+            path = self._partition_path(key)
+            if shared is not None:
+                partition = shared.load_or_publish(version, lambda: self._load_from_disk(path))
+            else:
+                partition = self._load_from_disk(path)
+            if partition is None:
+                # A missing or corrupt partition reads as empty (not cached, so a fixed file is picked up)
+                complete = False
+                partition = {}
+            refreshed[key] = (version, partition)
+
+        data = merge_partitions({key: partition for key, (_, partition) in refreshed.items()})
+        DATA_FILE_BYTES.set(sum(version[1] for version in versions.values()))
+        if complete:
+            self._partitions = refreshed
+            self._cache = (version_key, data)
+        return refreshed, data
+
+    def warm_cache(self) -> float:
+        """
+        Load the data into the cache ahead of the first request.
+        Returns the number of seconds it took.
+        """
+        start = time.perf_counter()
+        self.snapshot()
+        return time.perf_counter() - start
+
+    def _read_data(self) -> Dict[str, Any]:
+        """
+        Read all the data into memory as a modifiable copy.
+        This is like executing a SELECT * query to get all data.
+        Inside a transaction this is the transaction's staged data, so every
+        mutation in the transaction builds on the ones before it.
+
+        Inside a write that locked only some partitions, only those partitions'
+        records are copied; everything else is the shared read-only snapshot,
+        which the write must not modify (see _write_lock).
+        """
+        transaction = self._transaction()
+        if transaction is not None:
+            return transaction.data
+        # Always the newest version, even inside consistent_reads(), so writes never build on stale data
+        partitions, data = self._latest_partitions()
+        held = getattr(self._write_state, "held", None)
+        self._write_state.base = partitions
+        if held is None or held is _ALL_PARTITIONS:
+            return copy.deepcopy(data)
+        return merge_partitions({
+            key: copy.deepcopy(partition) if key in held else partition
+            for key, (_, partition) in partitions.items()
+        })
     
     def _write_data(self, data: Dict[str, Any]) -> bool:
         """
-        Write the complete data structure back to the file.
+        Write the data back - only the partitions it changed.
         This is like committing a database transaction.
+
+        Each partition's new contents go to a temporary file that then replaces it,
+        so readers in other worker processes never see a half-written file.
+        Inside a transaction nothing is written until the transaction commits.
         """
-        try:
-            with open(self.data_file_path, 'w', encoding='utf-8') as file:
-                json.dump(data, file, indent=2, ensure_ascii=False)
+        transaction = self._transaction()
+        if transaction is not None and data is transaction.data:
             return True
-        except Exception as e:
-            print(f"Error writing data file: {e}")
+
+        held = getattr(self._write_state, "held", None)
+        base = getattr(self._write_state, "base", None) or {}
+        partitions = split_partitions(data)
+        changed = []
+        for key, partition in partitions.items():
+            if held is not None and held is not _ALL_PARTITIONS and key not in held:
+                # Not locked, so it must be exactly what was read (checked by identity, not content)
+                if key in base and same_records(partition, base[key][1]):
+                    continue
+                raise RuntimeError(f"Write changed partition '{key}' without locking it")
+            if key in base and base[key][1] == partition:
+                continue
+            changed.append(key)
+        removed = [key for key in base if key not in partitions
+                   and (held is _ALL_PARTITIONS or (held is not None and key in held))]
+
+        start = time.perf_counter()
+        try:
+            for key in changed:
+                self._write_partition(key, partitions[key])
+            for key in removed:
+                os.remove(self._partition_path(key))
+        except Exception:
+            STORAGE_FAILURES.inc("write")
+            logger.exception("data file write failed", extra={
+                "path": self.partition_dir,
+                "partitions": changed,
+                "durationMs": round((time.perf_counter() - start) * 1000, 3),
+            })
             return False
+
+        if self.change_log is not None and (changed or removed):
+            # Still under the partition locks, so changes to a record are logged in commit order
+            try:
+                self.change_log.append(diff_records(
+                    [base[key][1] for key in changed + removed if key in base],
+                    [partitions[key] for key in changed],
+                ))
+            except Exception:
+                STORAGE_FAILURES.inc("change_log")
+                logger.exception("change log append failed", extra={"partitions": changed + removed})
+
+        # If nothing else changed meanwhile, what we just wrote is the newest merged
+        # data - no need to merge the partitions again on the next read
+        versions = partition_versions(self.partition_dir)
+        untouched = [key for key in base if key not in changed and key not in removed]
+        if set(versions) == set(untouched) | set(changed) and all(versions[key] == base[key][0] for key in untouched):
+            self._cache = (tuple(sorted(versions.items())), data)
+        logger.info("data file written", extra={
+            "path": self.partition_dir,
+            "partitions": changed,
+            "durationMs": round((time.perf_counter() - start) * 1000, 3),
+        })
+        return True
+
+    def _write_partition(self, key: str, partition: Dict[str, Any]):
+        path = self._partition_path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with _timed("serialize"):
+                serialized = json.dumps(partition, indent=2, ensure_ascii=False)
+
+            with _timed("write"):
+                with open(temp_path, 'w', encoding='utf-8') as file:
+                    file.write(serialized)
+                    file.flush()
+                    os.fsync(file.fileno())
+                os.replace(temp_path, path)
+        except Exception:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        self._partitions = {**self._partitions, key: (version, partition)}
+        shared = self._shared_snapshot(key)
+        if shared is not None:
+            # Let the other workers swap to the new version without parsing JSON
+            shared.publish(version, partition)
+
+    @contextmanager
+    def _write_lock(self, scope: Optional[Callable[[Dict[str, Any]], Set[str]]] = None):
+        """
+        Hold the write lock for a whole read-modify-write cycle.
+        This is like a database row lock: the second writer waits for the first.
+
+        `scope` maps the data to the partitions the write will change (see
+        _partitions_of), and only those are locked - writes to different groups
+        then run in parallel. Without a scope every partition is locked. The scope is
+        resolved again once the locks are held, in case a record moved meanwhile.
+
+        Thread locks cover this process; lock files cover the other uvicorn
+        worker processes when running with several workers.
+        """
+        held = getattr(self._write_state, "held", None)
+        if held is not None:
+            # Already held further up this call stack, e.g. inside a transaction
+            if held is not _ALL_PARTITIONS and (scope is None or not scope(self.snapshot()) <= held):
+                raise RuntimeError("A nested write needs partitions its caller didn't lock")
+            yield
+            return
+
+        if scope is None:
+            keys = self._all_partition_keys(self._latest_snapshot())
+        else:
+            keys = set(scope(self._latest_snapshot()))
+        waited = 0.0
+        while True:
+            locks, wait = self._partition_locks.acquire(keys)
+            waited += wait
+            needed = self._all_partition_keys(self._latest_snapshot()) if scope is None \
+                else set(scope(self._latest_snapshot()))
+            if needed <= keys:
+                break
+            self._partition_locks.release(locks)
+            keys |= needed
+
+        LOCK_WAIT_SECONDS.observe(waited)
+        add_request_timing("storageLockWait", waited)
+        self._write_state.held = _ALL_PARTITIONS if scope is None else frozenset(keys)
+        try:
+            yield
+        finally:
+            self._write_state.held = None
+            self._write_state.base = None
+            self._partition_locks.release(locks)
+
+    @staticmethod
+    def _all_partition_keys(data: Dict[str, Any]) -> Set[str]:
+        return {SHARED_PARTITION, SEQUENCES_PARTITION, UNGROUPED_PARTITION} | {
+            group_partition(group["id"]) for group in data.get("groups", [])
+        }
+
+    def _partitions_of(self, data: Dict[str, Any], project_ids: Iterable[int] = (),
+                       category_ids: Iterable[int] = (), document_ids: Iterable[int] = (),
+                       group_ids: Iterable[Optional[int]] = ()) -> Set[str]:
+        """
+        The partitions holding these records, for a write's lock scope.
+        Group ids may include None, or a group that doesn't exist, for the ungrouped partition.
+        """
+        projects = project_partitions(data)
+        keys = {projects.get(project_id, UNGROUPED_PARTITION) for project_id in project_ids}
+        for name, ids in (("categories", category_ids), ("documents", document_ids)):
+            ids = set(ids)
+            if ids:
+                keys.update(projects.get(record["projectId"], UNGROUPED_PARTITION)
+                            for record in data.get(name, []) if record["id"] in ids)
+        existing_groups = {group["id"] for group in data.get("groups", [])}
+        keys.update(group_partition(group_id) if group_id in existing_groups else UNGROUPED_PARTITION
+                    for group_id in group_ids)
+        return keys
+
+    def _next_id(self, data: Dict[str, Any], collection: str, start: int) -> int:
+        """
+        Hand out the next id for a collection. Ids come from a sequence in their own
+        partition, so creates in different groups never pick the same one; the
+        write's scope must include SEQUENCES_PARTITION.
+        """
+        sequences = data.setdefault("sequences", {})
+        existing_ids = [record["id"] for record in data.get(collection, [])]
+        new_id = max(sequences.get(collection, start), max(existing_ids, default=start)) + 1
+        sequences[collection] = new_id
+        return new_id
+    
+    def _transaction(self) -> Optional[_Transaction]:
+        transaction = _current_transaction.get()
+        return transaction if transaction is not None and transaction.service is self else None
+
+    @contextmanager
+    def transaction(self, scope: Optional[Callable[[Dict[str, Any]], Set[str]]] = None):
+        """
+        Group several mutations into one unit of work, like a database transaction.
+
+            with data_service.transaction():
+                project = data_service.create_new_project(...)
+                data_service.add_category_to_project(project["id"], ...)
+
+        Every DataService call inside the block works on one private copy of the data,
+        and the changed partitions are written once when the block ends. If the block
+        raises, nothing is written and the changes are discarded. The write lock is held
+        throughout - on the partitions in `scope`, or on all of them - so no other writer
+        can interleave. Nested transaction() blocks join the outer one.
+        """
+        if self._transaction() is not None:
+            yield
+            return
+
+        with self._write_lock(scope):
+            transaction = _Transaction(self, self._read_data())
+            token = _current_transaction.set(transaction)
+            try:
+                yield
+            except BaseException:
+                TRANSACTIONS.inc("rolled_back")
+                raise
+            finally:
+                _current_transaction.reset(token)
+
+            if not self._write_data(transaction.data):
+                TRANSACTIONS.inc("rolled_back")
+                raise Exception("Failed to save changes")
+            TRANSACTIONS.inc("committed")
+
+            for callback in transaction.after_commit:
+                callback()
+
+    @contextmanager
+    def consistent_reads(self):
+        """
+        Make every read in this block see the same version of the data, even if a
+        write lands halfway through - for responses assembled from several reads.
+        Covers work started from the block, including run_in_threadpool calls and
+        tasks created by asyncio.gather. Writes are unaffected and always build on
+        the newest data.
+        """
+        pinned = _pinned_snapshot.get()
+        if self._transaction() is not None or (pinned is not None and pinned[0] is self):
+            yield
+            return
+        token = _pinned_snapshot.set((self, self._latest_snapshot()))
+        try:
+            yield
+        finally:
+            _pinned_snapshot.reset(token)
+
+    # Point-in-time snapshots
+
+    def create_snapshot(self, label: str = "") -> Optional[Dict[str, Any]]:
+        """
+        Capture the current data as a point-in-time snapshot (see SnapshotStore).
+        Returns the snapshot's manifest, or None if snapshots are not configured.
+        """
+        if self.snapshots is None:
+            return None
+        with _timed("snapshot"):
+            return self.snapshots.create(self.snapshot(), label)
+
+    def restore_snapshot(self, snapshot_id: str) -> Dict[str, Any]:
+        """
+        Replace the data with a snapshot's version, in a single write.
+        The current data is snapshotted first, so a restore can itself be undone.
+        Raises SnapshotNotFoundError for an unknown snapshot id.
+        """
+        if self.snapshots is None:
+            raise ValueError("Snapshots are not configured")
+        restored = self.snapshots.load(snapshot_id)
+        with self.transaction():
+            data = self._read_data()
+            previous = self.snapshots.create(data, f"before restore of {snapshot_id}")
+            # Ids handed out since the snapshot stay used: records created after it may
+            # live on in the change log, bid history and clients, so they're never reused
+            handed_out = dict(data.get("sequences", {}))
+            for collection in RECORD_COLLECTIONS:
+                for record in data.get(collection, []):
+                    handed_out[collection] = max(handed_out.get(collection, record["id"]), record["id"])
+            data.clear()
+            data.update(restored)
+            # Snapshots taken before partitioning have the single-file layout
+            self._upgrade(data)
+            sequences = data["sequences"]
+            for collection, last_id in handed_out.items():
+                sequences[collection] = max(sequences.get(collection, last_id), last_id)
+            self._write_data(data)
+        return {"restored": snapshot_id, "previousSnapshot": previous["id"]}
+
+    # Change tracking - what changed since a client last synced
+
+    def get_changes(self, since: int, limit: int = 1000) -> Dict[str, Any]:
+        """
+        The records created, updated or deleted after sequence number `since`, each
+        once with its current version (null when deleted), oldest change first:
+
+            {"since", "seq", "resync", "hasMore", "changes": [{"seq", "collection", "id", "op", "record"}]}
+
+        Pass the returned seq as `since` next time. With resync true the log no longer
+        reaches back to `since`, so the client has to fetch everything again; hasMore
+        means there are further changes after seq. Raises ValueError if changes
+        aren't tracked.
+        """
+        if self.change_log is None:
+            raise ValueError("Change tracking is not configured")
+        log = self.change_log.since(since, limit)
+        # Read after the log, so the data includes every change listed
+        data = self.snapshot()
+        seq = log["entries"][-1][0] if log["hasMore"] else log["latestSeq"]
+        if log["resync"]:
+            return {"since": since, "seq": seq, "resync": True, "hasMore": False, "changes": []}
+
+        # Several changes to one record come back as its latest version, once
+        latest: Dict[Tuple[str, Any], Tuple[int, bool]] = {}
+        for entry_seq, collection, record_id, op, _ in log["entries"]:
+            key = (collection, record_id)
+            created = latest.pop(key)[1] if key in latest else op == CREATED
+            latest[key] = (entry_seq, created)
+
+        records: Dict[str, Dict[Any, Dict[str, Any]]] = {}
+        changes = []
+        for (collection, record_id), (entry_seq, created) in latest.items():
+            if collection not in records:
+                records[collection] = {record["id"]: record for record in data.get(collection, [])}
+            record = records[collection].get(record_id)
+            if record is None:
+                if created:
+                    # Created and deleted again since `since` - the client never saw it
+                    continue
+                op = DELETED
+            else:
+                op = CREATED if created else UPDATED
+            changes.append({"seq": entry_seq, "collection": collection, "id": record_id, "op": op,
+                            "record": record})
+        return {"since": since, "seq": seq, "resync": False, "hasMore": log["hasMore"], "changes": changes}
+
+    # Reports
+
+    def get_bid_tab_input(self, project_id: int, category_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        What a project's bid tabulation shows - its categories' estimates, priced bids
+        and awards, with vendor names - read from one snapshot (see bid_tab.report_input).
+        None if the project, or the category within it, doesn't exist.
+        """
+        data = self.snapshot()
+        project = next((p for p in data.get("projects", []) if p["id"] == project_id), None)
+        if project is None:
+            return None
+        categories = [c for c in data.get("categories", []) if c["projectId"] == project_id
+                      and (category_id is None or c["id"] == category_id)]
+        if category_id is not None and not categories:
+            return None
+        vendor_ids = {participation["vendorId"] for category in categories
+                      for participation in category.get("vendorParticipation", [])}
+        vendor_names = {vendor["id"]: vendor.get("companyName", "") for vendor in data.get("vendors", [])
+                        if vendor["id"] in vendor_ids}
+        return bid_tab.report_input(project, categories, vendor_names)
+
+    def _after_commit(self, callback: Callable[[], None]):
+        """Run callback once the current change is saved - at transaction commit, or now outside one."""
+        transaction = self._transaction()
+        if transaction is not None:
+            transaction.after_commit.append(callback)
+        else:
+            callback()
     
     # Project operations - these mimic database CRUD operations
     
@@ -73,7 +780,7 @@ class DataService:
         Retrieve all projects from storage.
         This is like SELECT * FROM projects;
         """
-        data = self._read_data()
+        data = self.snapshot()
         return data.get("projects", [])
     
     def get_project_by_id(self, project_id: int) -> Optional[Dict[str, Any]]:
@@ -89,25 +796,33 @@ class DataService:
         Add a new project to storage.
         This is like INSERT INTO projects VALUES (...);
         """
-        data = self._read_data()
+        with self._write_lock(lambda data: self._partitions_of(
+                data, group_ids=[project_data.get("groupId")]) | {SEQUENCES_PARTITION}):
+            data = self._read_data()
         
-        # Generate a new ID (in a database, this would be auto-generated)
-        existing_ids = [project["id"] for project in data["projects"]]
-        new_id = max(existing_ids, default=0) + 1
+            self._ensure_group_rollups(data)
+
+            # Generate a new ID (in a database, this would be auto-generated)
+            new_id = self._next_id(data, "projects", 0)
         
-        # Add metadata fields
-        project_data["id"] = new_id
-        project_data["createdDate"] = datetime.now().isoformat()
-        project_data["lastUpdated"] = datetime.now().isoformat()
+            # Add metadata fields
+            project_data["id"] = new_id
+            project_data["createdDate"] = datetime.now().isoformat()
+            project_data["lastUpdated"] = datetime.now().isoformat()
         
-        # Add to the projects collection
-        data["projects"].append(project_data)
+            # Add to the projects collection
+            data["projects"].append(project_data)
+
+            group_id = project_data.get("groupId")
+            self._update_group_membership(data, new_id, None, group_id)
+            self._apply_group_rollup_change(data, None, None, group_id,
+                                            self._project_contribution_in(data, project_data))
         
-        # Save back to file
-        if self._write_data(data):
-            return project_data
-        else:
-            raise Exception("Failed to save project data")
+            # Save back to file
+            if self._write_data(data):
+                return project_data
+            else:
+                raise Exception("Failed to save project data")
     
     # Vendor operations - these teach the same patterns as project operations
     
@@ -116,7 +831,7 @@ class DataService:
         Retrieve all vendors from the vendor catalog.
         This supports the owner rep vendor management functionality.
         """
-        data = self._read_data()
+        data = self.snapshot()
         return data.get("vendors", [])
     
     def get_vendor_by_id(self, vendor_id: int) -> Optional[Dict[str, Any]]:
@@ -127,29 +842,232 @@ class DataService:
         vendors = self.get_all_vendors()
         return next((vendor for vendor in vendors if vendor["id"] == vendor_id), None)
     
-    def add_vendor(self, vendor_data: Dict[str, Any]) -> Dict[str, Any]:
+    def add_vendor(self, vendor_data: Dict[str, Any], reject_duplicates: bool = False,
+                   duplicate_threshold: float = DEFAULT_THRESHOLD) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
         """
         Add a new vendor to the catalog.
         This allows owner reps to expand their vendor relationships.
+
+        Returns the new vendor and the catalog vendors it may duplicate, as
+        find_duplicate_vendors lists them - searched once, under the write lock and
+        before the vendor is added. With reject_duplicates, raises DuplicateVendorError
+        instead when there are any, so two concurrent creates of the same vendor
+        can't both get through.
         """
-        data = self._read_data()
+        with self._write_lock(lambda data: {SHARED_PARTITION, SEQUENCES_PARTITION}):
+            data = self._read_data()
+
+            candidates = self._find_duplicate_vendors(data["vendors"], vendor_data, duplicate_threshold)
+            if reject_duplicates and candidates:
+                raise DuplicateVendorError(candidates)
         
-        # Generate new ID
-        existing_ids = [vendor["id"] for vendor in data["vendors"]]
-        new_id = max(existing_ids, default=100) + 1  # Start vendor IDs at 101
+            # Generate new ID
+            new_id = self._next_id(data, "vendors", 100)  # Start vendor IDs at 101
         
-        # Add metadata
-        vendor_data["id"] = new_id
-        vendor_data["dateAdded"] = datetime.now().isoformat()
-        vendor_data["lastUpdated"] = datetime.now().isoformat()
+            # Add metadata
+            vendor_data["id"] = new_id
+            vendor_data["dateAdded"] = datetime.now().isoformat()
+            vendor_data["lastUpdated"] = datetime.now().isoformat()
         
-        # Add to vendors collection
-        data["vendors"].append(vendor_data)
+            # Add to vendors collection
+            data["vendors"].append(vendor_data)
         
-        if self._write_data(data):
-            return vendor_data
-        else:
-            raise Exception("Failed to save vendor data")
+            if self._write_data(data):
+                return vendor_data, candidates
+            else:
+                raise Exception("Failed to save vendor data")
+    
+    def _vendor_duplicate_index(self, vendors: List[Dict[str, Any]]) -> VendorDuplicateIndex:
+        """
+        The duplicate index over this vendor list. Vendors are only ever appended, so
+        when the list still starts with what was indexed only the new vendors are
+        added; anything else (a restore, say) rebuilds the index. A returned index
+        is never changed afterwards - the next version is a new object - so callers
+        can search it without holding the lock.
+        """
+        with self._vendor_index_lock:
+            cached = self._vendor_index
+            if cached is not None and cached[0] is vendors:
+                return cached[3]
+            if cached is not None and 0 < cached[1] <= len(vendors) and vendors[cached[1] - 1] == cached[2]:
+                index = cached[3].extended(vendors[cached[1]:])
+            else:
+                with _timed("dedupe"):
+                    index = VendorDuplicateIndex(vendors)
+            if vendors:
+                self._vendor_index = (vendors, len(vendors), copy.deepcopy(vendors[-1]), index)
+            return index
+
+    def _find_duplicate_vendors(self, vendors: List[Dict[str, Any]], vendor_data: Dict[str, Any],
+                                threshold: float, limit: int = 10) -> List[Dict[str, Any]]:
+        by_id = {vendor["id"]: vendor for vendor in vendors}
+        return [
+            {**match, "companyName": by_id[match["vendorId"]].get("companyName")}
+            for match in self._vendor_duplicate_index(vendors).find(vendor_data, threshold, limit)
+        ]
+
+    def find_duplicate_vendors(self, vendor_data: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD,
+                               limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Catalog vendors that look like duplicates of vendor_data, best first:
+        [{"vendorId", "companyName", "score", "reasons"}]. A vendor already in the
+        catalog is not reported as a duplicate of itself.
+        """
+        return self._find_duplicate_vendors(self.snapshot().get("vendors", []), vendor_data, threshold, limit)
+
+    def get_vendor_duplicate_report(self, threshold: float = DEFAULT_THRESHOLD) -> Dict[str, Any]:
+        """
+        Every group of likely duplicate vendors in the catalog, for review and merging.
+        """
+        vendors = self.snapshot().get("vendors", [])
+        names = {vendor["id"]: vendor.get("companyName") for vendor in vendors}
+        groups = [
+            {"vendors": [{"id": vendor_id, "companyName": names.get(vendor_id)} for vendor_id in group["vendorIds"]],
+             "pairs": group["pairs"]}
+            for group in self._vendor_duplicate_index(vendors).report(threshold)
+        ]
+        return {
+            "vendorCount": len(vendors),
+            "threshold": threshold,
+            "duplicateGroups": groups,
+            "generatedAt": datetime.now().isoformat(),
+        }
+    
+    # Group operations - groups carry rollups that are kept up to date on every project write
+
+    def get_all_groups(self) -> List[Dict[str, Any]]:
+        """
+        Retrieve all project groups.
+        This is like SELECT * FROM groups;
+        """
+        data = self.snapshot()
+        return data.get("groups", [])
+
+    def get_group_by_id(self, group_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Find a specific group by ID.
+        This is like SELECT * FROM groups WHERE id = group_id;
+        """
+        return next((group for group in self.get_all_groups() if group["id"] == group_id), None)
+
+    def get_groups_with_rollups(self) -> List[Dict[str, Any]]:
+        """
+        Get every group with its project and bid rollups.
+        Rollups are stored on the group and maintained as projects change,
+        so this is O(groups) instead of rescanning every project per group.
+        """
+        data = self.snapshot()
+        rollups = self._group_rollups(data)
+        return [self._enrich_group(group, rollups.get(group["id"])) for group in data.get("groups", [])]
+
+    def get_group_with_projects(self, group_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Get one group with its rollups and the projects that belong to it.
+        Projects are looked up through the group's projectIds.
+        """
+        data = self.snapshot()
+        group = next((g for g in data.get("groups", []) if g["id"] == group_id), None)
+        if not group:
+            return None
+
+        rollups = self._group_rollups(data)
+        enriched_group = self._enrich_group(group, rollups.get(group_id))
+        enriched_group["projects"] = self._group_projects(data, group_id)
+        return enriched_group
+
+    @staticmethod
+    def _group_projects(data: Dict[str, Any], group_id: int) -> List[Dict[str, Any]]:
+        """The projects of a group, found through its projectIds (none if the group doesn't exist)."""
+        group = next((g for g in data.get("groups", []) if g["id"] == group_id), None)
+        project_ids = set(group.get("projectIds", [])) if group else set()
+        return [p for p in data.get("projects", []) if p["id"] in project_ids and p.get("groupId") == group_id]
+
+    @staticmethod
+    def _enrich_group(group: Dict[str, Any], rollup: Optional[Dict[str, float]]) -> Dict[str, Any]:
+        rollup = rollup or _empty_rollup()
+        enriched_group = {key: value for key, value in group.items() if key != "rollup"}
+        enriched_group["actualProjectCount"] = rollup["projectCount"]
+        enriched_group["actualTotalValue"] = rollup["totalValue"]
+        enriched_group["activeProjects"] = rollup["activeProjects"]
+        enriched_group["completedProjects"] = rollup["completedProjects"]
+        enriched_group["awardedAmount"] = rollup["awardedAmount"]
+        enriched_group["outstandingQuotes"] = rollup["outstandingQuotes"]
+        return enriched_group
+
+    def _group_rollups(self, data: Dict[str, Any]) -> Dict[int, Dict[str, float]]:
+        """
+        Return the stored rollup of every group. A data file written before rollups
+        existed has none yet; those are computed in one pass here and persisted on
+        the next write.
+        """
+        groups = data.get("groups", [])
+        if all("rollup" in group for group in groups):
+            return {group["id"]: group["rollup"] for group in groups}
+        return self._compute_group_rollups(data)
+
+    @staticmethod
+    def _compute_group_rollups(data: Dict[str, Any]) -> Dict[int, Dict[str, float]]:
+        """Compute all group rollups from scratch in a single pass over projects and categories."""
+        categories_by_project: Dict[int, List[Dict[str, Any]]] = {}
+        for category in data.get("categories", []):
+            categories_by_project.setdefault(category["projectId"], []).append(category)
+
+        rollups = {group["id"]: _empty_rollup() for group in data.get("groups", [])}
+        for project in data.get("projects", []):
+            rollup = rollups.get(project.get("groupId"))
+            if rollup is not None:
+                contribution = _project_contribution(project, categories_by_project.get(project["id"], []))
+                for key, value in contribution.items():
+                    rollup[key] += value
+        return rollups
+
+    def _ensure_group_rollups(self, data: Dict[str, Any]):
+        """Backfill stored rollups on groups that don't have one yet (inside a write)."""
+        groups = data.get("groups", [])
+        if any("rollup" not in group for group in groups):
+            rollups = self._compute_group_rollups(data)
+            for group in groups:
+                group.setdefault("rollup", rollups[group["id"]])
+
+    def _project_contribution_in(self, data: Dict[str, Any], project: Dict[str, Any]) -> Dict[str, float]:
+        """What one project currently adds to its group's rollup."""
+        categories = [c for c in data.get("categories", []) if c["projectId"] == project["id"]]
+        return _project_contribution(project, categories)
+
+    def _apply_group_rollup_change(self, data: Dict[str, Any], old_group_id: Optional[int],
+                                   before: Optional[Dict[str, float]], new_group_id: Optional[int],
+                                   after: Optional[Dict[str, float]]):
+        """
+        Move a project's contribution from its old state to its new one.
+        Pass before=None for a new project and after=None for a deleted one;
+        different group ids mean the project moved between groups.
+        Call _ensure_group_rollups() before modifying the data, so backfilled
+        rollups don't already include the change.
+        """
+        groups = {group["id"]: group for group in data.get("groups", [])}
+
+        if before is not None and old_group_id in groups and "rollup" in groups[old_group_id]:
+            rollup = groups[old_group_id]["rollup"]
+            for key, value in before.items():
+                rollup[key] -= value
+        if after is not None and new_group_id in groups and "rollup" in groups[new_group_id]:
+            rollup = groups[new_group_id]["rollup"]
+            for key, value in after.items():
+                rollup[key] += value
+
+    def _update_group_membership(self, data: Dict[str, Any], project_id: int,
+                                 old_group_id: Optional[int], new_group_id: Optional[int]):
+        """Keep each group's projectIds list in step with projects' groupId."""
+        if old_group_id == new_group_id:
+            return
+        for group in data.get("groups", []):
+            project_ids = group.setdefault("projectIds", [])
+            if group["id"] == old_group_id and project_id in project_ids:
+                project_ids.remove(project_id)
+            if group["id"] == new_group_id and project_id not in project_ids:
+                project_ids.append(project_id)
+            if group["id"] in (old_group_id, new_group_id):
+                group["lastUpdated"] = datetime.now().strftime("%Y-%m-%d")
     
     # Category operations - these handle the bidding and comparison functionality
     
@@ -158,7 +1076,7 @@ class DataService:
         Get all categories that belong to a specific project.
         This supports the project dashboard category display.
         """
-        data = self._read_data()
+        data = self.snapshot()
         categories = data.get("categories", [])
         return [category for category in categories if category["projectId"] == project_id]
     
@@ -167,10 +1085,548 @@ class DataService:
         Find a specific category by ID.
         This supports the detailed category comparison view.
         """
-        data = self._read_data()
+        data = self.snapshot()
         categories = data.get("categories", [])
         return next((category for category in categories if category["id"] == category_id), None)
     
+    # Bid operations - a vendor's participation in one category
+
+    def update_vendor_bid(self, category_id: int, vendor_id: int, updates: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Update a vendor's bid in a category (amount, status, date, notes).
+        Changes to the amount or status are appended to the bid history, so earlier
+        revisions are kept even though the participation only holds the latest bid.
+        """
+        if "bidStatus" in updates and updates["bidStatus"] not in BID_STATUSES:
+            raise ValueError(f"bidStatus must be one of: {', '.join(BID_STATUSES)}")
+        if "bidAmount" in updates:
+            amount = updates["bidAmount"]
+            if isinstance(amount, bool) or not isinstance(amount, (int, float)) or amount < 0:
+                raise ValueError("bidAmount must be a non-negative number")
+
+        with self._write_lock(lambda data: self._partitions_of(data, category_ids=[category_id])):
+            data = self._read_data()
+
+            category = next((c for c in data.get("categories", []) if c["id"] == category_id), None)
+            if not category:
+                raise Exception("Category not found")
+            participation = next(
+                (p for p in category.get("vendorParticipation", []) if p["vendorId"] == vendor_id), None
+            )
+            if not participation:
+                raise ValueError("Vendor is not participating in this category")
+
+            project = next((p for p in data.get("projects", []) if p["id"] == category["projectId"]), None)
+            if project:
+                self._ensure_group_rollups(data)
+                before = self._project_contribution_in(data, project)
+            previous = dict(participation)
+
+            for field in ("bidAmount", "bidStatus", "bidDate", "notes"):
+                if field in updates:
+                    participation[field] = updates[field]
+            if "bidAmount" in updates and "bidDate" not in updates:
+                participation["bidDate"] = datetime.now().strftime("%Y-%m-%d")
+
+            if any(participation.get(field) != previous.get(field) for field in ("bidAmount", "bidStatus")):
+                # The bid as it is now replaces the old one in the trade's distribution
+                self._reindex_trades(data, self._category_partition(data, category),
+                                     [trade_key(category.get("name"))])
+
+            if project:
+                # Awarded amounts and outstanding quotes follow the bid
+                group_id = project.get("groupId")
+                self._apply_group_rollup_change(data, group_id, before, group_id,
+                                                self._project_contribution_in(data, project))
+
+            if not self._write_data(data):
+                raise Exception("Failed to save bid")
+
+            self._after_commit(lambda: self._record_bid_revision(category_id, previous, participation))
+            return participation
+
+    def invite_vendor(self, category_id: int, vendor_id: int) -> Dict[str, Any]:
+        """
+        Invite a vendor to quote on a category.
+        Adds the vendor to the category's participation as 'invited'; a vendor that
+        already participates is left as it is. Returns the participation.
+        """
+        with self._write_lock(lambda data: self._partitions_of(data, category_ids=[category_id])):
+            data = self._read_data()
+
+            category = next((c for c in data.get("categories", []) if c["id"] == category_id), None)
+            if not category:
+                raise ValueError(f"Category {category_id} not found")
+            if not any(v["id"] == vendor_id for v in data.get("vendors", [])):
+                raise ValueError(f"Vendor {vendor_id} not found")
+
+            participations = category.setdefault("vendorParticipation", [])
+            existing = next((p for p in participations if p["vendorId"] == vendor_id), None)
+            if existing:
+                return existing
+
+            project = next((p for p in data.get("projects", []) if p["id"] == category["projectId"]), None)
+            if project:
+                self._ensure_group_rollups(data)
+                before = self._project_contribution_in(data, project)
+
+            today = datetime.now().strftime("%Y-%m-%d")
+            participation = {
+                "vendorId": vendor_id,
+                "bidAmount": 0,
+                "bidStatus": "invited",
+                "bidDate": today,
+                "inviteDate": today,
+                "notes": ""
+            }
+            participations.append(participation)
+
+            if project:
+                # An invitation is an outstanding quote
+                group_id = project.get("groupId")
+                self._apply_group_rollup_change(data, group_id, before, group_id,
+                                                self._project_contribution_in(data, project))
+
+            if not self._write_data(data):
+                raise Exception("Failed to save invitation")
+
+            self._after_commit(lambda: self._record_bid_revision(category_id, {}, participation))
+            return participation
+
+    def invite_vendors(self, category_id: int, vendor_ids: List[int]) -> List[Dict[str, Any]]:
+        """Invite several vendors in one write; if any invitation fails, none are saved."""
+        with self.transaction(lambda data: self._partitions_of(data, category_ids=[category_id])):
+            return [self.invite_vendor(category_id, vendor_id) for vendor_id in vendor_ids]
+
+    def select_vendor_quotes(self, selections: Dict[int, int]) -> List[Dict[str, Any]]:
+        """
+        Award categories: {categoryId: vendorId}. The chosen vendor's bid becomes
+        "selected" and every other priced bid in the category "not_selected".
+        All selections are saved in one write. Returns the updated categories.
+        """
+        with self._write_lock(lambda data: self._partitions_of(data, category_ids=selections)):
+            data = self._read_data()
+            categories = {c["id"]: c for c in data.get("categories", [])}
+            projects = {p["id"]: p for p in data.get("projects", [])}
+
+            for category_id, vendor_id in selections.items():
+                category = categories.get(category_id)
+                if not category:
+                    raise ValueError(f"Category {category_id} not found")
+                if not any(p["vendorId"] == vendor_id and p.get("bidStatus") in PRICED_BID_STATUSES
+                           for p in category.get("vendorParticipation", [])):
+                    raise ValueError(f"Vendor {vendor_id} has no quote to select in category {category_id}")
+
+            self._ensure_group_rollups(data)
+            affected_projects = {categories[category_id]["projectId"] for category_id in selections}
+            before = {
+                project_id: self._project_contribution_in(data, projects[project_id])
+                for project_id in affected_projects if project_id in projects
+            }
+
+            revisions = []
+            for category_id, vendor_id in selections.items():
+                for participation in categories[category_id].get("vendorParticipation", []):
+                    if participation.get("bidStatus") not in PRICED_BID_STATUSES:
+                        continue
+                    status = "selected" if participation["vendorId"] == vendor_id else "not_selected"
+                    if participation["bidStatus"] != status:
+                        revisions.append((category_id, dict(participation), participation))
+                        participation["bidStatus"] = status
+
+            for project_id, contribution in before.items():
+                group_id = projects[project_id].get("groupId")
+                self._apply_group_rollup_change(data, group_id, contribution, group_id,
+                                                self._project_contribution_in(data, projects[project_id]))
+
+            if not self._write_data(data):
+                raise Exception("Failed to save selections")
+
+            def record_revisions():
+                for category_id, previous, participation in revisions:
+                    self._record_bid_revision(category_id, previous, participation)
+            self._after_commit(record_revisions)
+            return [categories[category_id] for category_id in selections]
+
+    def plan_awards(self, project_ids: List[int], constraints: Dict[str, Any],
+                    time_limit: float = award_optimizer.DEFAULT_TIME_LIMIT_SECONDS) -> Dict[str, Any]:
+        """
+        Choose a winning vendor for every category of these projects at the lowest
+        total cost the constraints allow (see award_optimizer). Savings are measured
+        against awarding each category to its lowest bid on its own, without discounts.
+        """
+        data = self.snapshot()
+        table = self._participation_table(data)
+        positions = sorted(position for project_id in set(project_ids)
+                           for position in table.project_positions(project_id))
+        categories = [table.categories[position] for position in positions]
+        vendor_names = {v["id"]: v.get("companyName", "") for v in data.get("vendors", [])}
+
+        bids = {
+            table.categories[position]["id"]: table.priced_bids(position, _PRICED_CODES)
+            for position in positions
+        }
+        problem = award_optimizer.AwardProblem(bids, **constraints)
+        result = award_optimizer.solve(problem, time_limit)
+        assignment = result["assignment"]
+
+        awards = []
+        baseline_cost = 0.0
+        vendor_counts: Dict[int, int] = {}
+        vendor_totals: Dict[int, float] = {}
+        for category in categories:
+            vendor_id = assignment.get(category["id"])
+            if vendor_id is None:
+                continue
+            amount = bids[category["id"]][vendor_id]
+            lowest_vendor_id, lowest_amount = min(bids[category["id"]].items(), key=lambda item: item[1])
+            baseline_cost += lowest_amount
+            vendor_counts[vendor_id] = vendor_counts.get(vendor_id, 0) + 1
+            vendor_totals[vendor_id] = vendor_totals.get(vendor_id, 0.0) + amount
+            awards.append({
+                "categoryId": category["id"],
+                "categoryName": category.get("name", ""),
+                "projectId": category["projectId"],
+                "vendorId": vendor_id,
+                "vendorName": vendor_names.get(vendor_id, ""),
+                "bidAmount": amount,
+                "lowestBid": lowest_amount,
+                "lowestBidVendorId": lowest_vendor_id
+            })
+
+        discounts = []
+        for vendor_id, total in vendor_totals.items():
+            discount = problem.discount(vendor_id, vendor_counts[vendor_id])
+            if discount > 0:
+                discounts.append({
+                    "vendorId": vendor_id,
+                    "vendorName": vendor_names.get(vendor_id, ""),
+                    "categoriesWon": vendor_counts[vendor_id],
+                    "discountPercent": round(discount * 100, 4),
+                    "discountAmount": round(total * discount, 2)
+                })
+
+        total_cost = round(result["cost"], 2)
+        savings = round(baseline_cost - total_cost, 2)
+        return {
+            "method": result["method"],
+            "feasible": result["feasible"],
+            "totalCost": total_cost,
+            "baselineCost": round(baseline_cost, 2),
+            "savings": savings,
+            "savingsPercent": round(savings / baseline_cost * 100, 2) if baseline_cost else 0,
+            "awards": awards,
+            "discounts": discounts,
+            "unawardedCategoryIds": sorted(set(bids) - set(assignment))
+        }
+
+    def _record_bid_revision(self, category_id: int, previous: Dict[str, Any], current: Dict[str, Any]):
+        """Append a bid change to the history, if it changed anything the history tracks."""
+        if self.bid_history is None:
+            return
+        if (previous.get("bidAmount"), previous.get("bidStatus")) == (current.get("bidAmount"), current.get("bidStatus")):
+            return
+
+        vendor_id = current["vendorId"]
+        if previous and not self.bid_history.has_history(category_id, vendor_id):
+            # First recorded change: keep the bid it replaces as the start of the trail
+            self.bid_history.append(category_id, vendor_id, previous.get("bidAmount"),
+                                    previous.get("bidStatus"), _date_to_ms(previous.get("bidDate")))
+        self.bid_history.append(category_id, vendor_id, current.get("bidAmount"), current.get("bidStatus"))
+    
+    # Price index - the distribution of bid amounts in each trade, across all projects
+
+    def get_price_index_summary(self, category_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Where a category's bids sit among every bid in the same trade: the trade's
+        p10/p50/p90 and each submitted bid's percentile rank. The trade is the
+        category name, so "Structural Steel" bids are compared across all projects.
+        The trade's distribution holds every priced bid (submitted, selected or not
+        selected) as it is now, once: a revised bid replaces its earlier amount, and
+        a deleted category's bids leave it.
+        Returns None if the category doesn't exist or its trade has no bids yet.
+        """
+        data = self.snapshot()
+        category = next((c for c in data.get("categories", []) if c["id"] == category_id), None)
+        if not category:
+            return None
+
+        bids = [
+            (participation["vendorId"], participation["bidAmount"])
+            for participation in category.get("vendorParticipation", [])
+            if participation.get("bidStatus") in PRICED_BID_STATUSES and (participation.get("bidAmount") or 0) > 0
+        ]
+        summary = price_summary(self._price_index(data).get(trade_key(category.get("name"))), bids)
+        if summary is not None:
+            summary["trade"] = category.get("name")
+        return summary
+
+    def _price_index(self, data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        Return every trade's sketch. Each partition stores the sketches of its own bids,
+        so they are merged here (KLL sketches merge with the same accuracy guarantee),
+        once per snapshot. Data without a stored index, such as an old snapshot, is
+        indexed from the current bids instead; the index is stored on the next bid write.
+        """
+        cached = self._price_index_cache
+        if cached is not None and cached[0] is data:
+            return cached[1]
+
+        indexes = data.get("priceIndexes")
+        if indexes is None:
+            index = self._compute_price_index(data.get("categories", []))
+        else:
+            sketches: Dict[str, KLLSketch] = {}
+            for partition_index in indexes.values():
+                for trade, stored in partition_index.items():
+                    sketch = KLLSketch.from_dict(stored)
+                    if trade in sketches:
+                        sketches[trade].merge(sketch)
+                    else:
+                        sketches[trade] = sketch
+            index = {trade: sketch.to_dict() for trade, sketch in sketches.items()}
+        # Build once per snapshot rather than on every request
+        self._price_index_cache = (data, index)
+        return index
+
+    @staticmethod
+    def _compute_price_index(categories: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Build every trade's sketch from the priced bids currently in these categories -
+        the same bids get_price_index_summary ranks.
+        """
+        sketches: Dict[str, KLLSketch] = {}
+        for category in categories:
+            for participation in category.get("vendorParticipation", []):
+                amount = participation.get("bidAmount") or 0
+                if amount > 0 and participation.get("bidStatus") in PRICED_BID_STATUSES:
+                    sketches.setdefault(trade_key(category.get("name")), KLLSketch()).add(amount)
+        return {trade: sketch.to_dict() for trade, sketch in sketches.items()}
+
+    def _compute_partition_price_indexes(self, data: Dict[str, Any]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Build the price index of every partition from its bids."""
+        projects = project_partitions(data)
+        categories_by_partition: Dict[str, List[Dict[str, Any]]] = {}
+        for category in data.get("categories", []):
+            key = projects.get(category["projectId"], UNGROUPED_PARTITION)
+            categories_by_partition.setdefault(key, []).append(category)
+        return {key: self._compute_price_index(categories) for key, categories in categories_by_partition.items()}
+
+    @staticmethod
+    def _category_partition(data: Dict[str, Any], category: Dict[str, Any]) -> str:
+        return project_partitions(data).get(category["projectId"], UNGROUPED_PARTITION)
+
+    def _reindex_trades(self, data: Dict[str, Any], key: str, trades: Iterable[str]):
+        """
+        Rebuild these trades' sketches in one partition's price index (inside a write).
+        A sketch can't forget a value, so whenever a partition's bids in a trade change
+        or go away, the trade's sketch is rebuilt from the bids the partition holds now
+        instead of being added to. Finding the trade's categories is one pass over the
+        category list - the same order of work as splitting the data into partitions,
+        which every write does - and only that trade's bids are sketched. A partition
+        with no index yet is indexed in full.
+        """
+        projects = project_partitions(data)
+        categories = [c for c in data.get("categories", [])
+                      if projects.get(c["projectId"], UNGROUPED_PARTITION) == key]
+        indexes = data.setdefault("priceIndexes", {})
+        if key not in indexes:
+            indexes[key] = self._compute_price_index(categories)
+            return
+
+        trades = set(trades)
+        rebuilt = self._compute_price_index(c for c in categories if trade_key(c.get("name")) in trades)
+        index = indexes[key]
+        for trade in trades:
+            if trade in rebuilt:
+                index[trade] = rebuilt[trade]
+            else:
+                index.pop(trade, None)
+    
+    # Participation - every category's bids in columnar form, for scans
+
+    def _participation_table(self, data: Dict[str, Any]) -> ParticipationTable:
+        """
+        The participation table of this data, built once per snapshot. Inside a
+        transaction the data is being modified in place, so the table is built fresh.
+        """
+        categories = data.get("categories", [])
+        cached = self._participation_cache
+        if self._transaction() is not None:
+            return ParticipationTable(categories)
+        if cached is not None and cached[0] is categories:
+            return cached[1]
+        with _timed("participation"):
+            # Categories the last snapshot already had keep their columns
+            table = ParticipationTable(categories, previous=cached[1] if cached is not None else None)
+        self._participation_cache = (categories, table)
+        return table
+
+    # Line item operations - per-line quantities and vendor unit prices, stored by column
+
+    def get_line_item_table(self, category_id: int) -> Optional[LineItemTable]:
+        """
+        Get the line item table for a category, or None if the category has no line items.
+        Tables are cached until the category's line items or unit prices change.
+        """
+        category = self.get_category_by_id(category_id)
+        if not category:
+            return None
+
+        columns = category.get("lineItems")
+        unit_prices = category.get("unitPrices")
+        cached = self._line_item_tables.get(category_id)
+        if cached and cached[0] is columns and cached[1] is unit_prices:
+            return cached[2]
+
+        table = LineItemTable.from_category(category)
+        if table is not None:
+            self._line_item_tables[category_id] = (columns, unit_prices, table)
+        return table
+
+    def set_category_line_items(self, category_id: int, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Replace a category's line items.
+        Vendor unit prices stay with their line (matched by description and unit);
+        totalItems and quotedItems are recalculated from the lines.
+        """
+        new_columns = line_items.line_item_columns(items)
+
+        with self._write_lock(lambda data: self._partitions_of(data, category_ids=[category_id])):
+            data = self._read_data()
+
+            category = next((c for c in data.get("categories", []) if c["id"] == category_id), None)
+            if not category:
+                raise Exception("Category not found")
+
+            unit_prices = line_items.realign_unit_prices(
+                category.get("lineItems") or {}, new_columns, category.get("unitPrices") or {}
+            )
+            line_count = len(new_columns["description"])
+            category["lineItems"] = new_columns
+            category["unitPrices"] = unit_prices
+            category["totalItems"] = line_count
+            category["quotedItems"] = line_items.quoted_line_count(unit_prices, line_count)
+
+            if self._write_data(data):
+                return category
+            else:
+                raise Exception("Failed to save line items")
+
+    def set_vendor_unit_prices(self, category_id: int, vendor_id: int,
+                               prices: List[Optional[float]]) -> Dict[str, Any]:
+        """
+        Record one vendor's unit prices for a category's line items.
+        prices is aligned with the category's lines; null means the vendor didn't price that line.
+        """
+        with self._write_lock(lambda data: self._partitions_of(data, category_ids=[category_id])):
+            data = self._read_data()
+
+            category = next((c for c in data.get("categories", []) if c["id"] == category_id), None)
+            if not category:
+                raise Exception("Category not found")
+            if not any(p["vendorId"] == vendor_id for p in category.get("vendorParticipation", [])):
+                raise ValueError("Vendor is not participating in this category")
+
+            line_count = len((category.get("lineItems") or {}).get("description") or [])
+            if line_count == 0:
+                raise ValueError("Category has no line items")
+
+            unit_prices = category.setdefault("unitPrices", {})
+            unit_prices[str(vendor_id)] = line_items.unit_price_column(prices, line_count)
+            category["quotedItems"] = line_items.quoted_line_count(unit_prices, line_count)
+
+            if self._write_data(data):
+                return category
+            else:
+                raise Exception("Failed to save unit prices")
+    
+    # Document operations - metadata lives here, file contents live in the BlobStore
+
+    def get_documents_for_project(self, project_id: int) -> List[Dict[str, Any]]:
+        """
+        Get all documents that belong to a specific project.
+        This is like SELECT * FROM documents WHERE projectId = project_id;
+        """
+        data = self.snapshot()
+        return [document for document in data.get("documents", []) if document["projectId"] == project_id]
+
+    def get_document_by_id(self, document_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Find a specific document by ID.
+        This supports document downloads.
+        """
+        data = self.snapshot()
+        return next((document for document in data.get("documents", []) if document["id"] == document_id), None)
+
+    def add_document(self, project_id: int, document_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Record an uploaded document against a project.
+        Uploading a file with the same filename again creates the next version.
+        """
+        with self._write_lock(lambda data: self._partitions_of(
+                data, project_ids=[project_id]) | {SEQUENCES_PARTITION}):
+            data = self._read_data()
+
+            project = next((p for p in data.get("projects", []) if p["id"] == project_id), None)
+            if not project:
+                raise Exception("Project not found")
+
+            documents = data.setdefault("documents", [])
+            new_id = self._next_id(data, "documents", 200)
+
+            filename = document_data.get("filename", "")
+            previous_versions = [
+                document.get("version", 1) for document in documents
+                if document["projectId"] == project_id and document.get("filename") == filename
+            ]
+
+            new_document = {
+                "id": new_id,
+                "projectId": project_id,
+                "filename": filename,
+                "displayName": document_data.get("displayName") or filename,
+                "fileType": document_data.get("fileType", "application/octet-stream"),
+                "fileSize": document_data.get("fileSize", 0),
+                "uploadDate": datetime.now().strftime("%Y-%m-%d"),
+                "uploadedBy": document_data.get("uploadedBy", ""),
+                "documentType": document_data.get("documentType", ""),
+                "description": document_data.get("description", ""),
+                "filePath": document_data.get("filePath", ""),
+                "contentHash": document_data.get("contentHash", ""),
+                "version": max(previous_versions, default=0) + 1,
+                "tags": document_data.get("tags", [])
+            }
+            documents.append(new_document)
+
+            project.setdefault("documentIds", []).append(new_id)
+            project["lastUpdated"] = datetime.now().strftime("%Y-%m-%d")
+
+            if self._write_data(data):
+                return new_document
+            else:
+                raise Exception("Failed to save document data")
+
+    def delete_document(self, document_id: int) -> bool:
+        """
+        Delete a document's record. The file stays in the blob store, where other
+        documents with the same content may still be using it.
+        """
+        with self._write_lock(lambda data: self._partitions_of(data, document_ids=[document_id])):
+            data = self._read_data()
+
+            documents = data.get("documents", [])
+            document = next((d for d in documents if d["id"] == document_id), None)
+            if not document:
+                return False
+
+            data["documents"] = [d for d in documents if d["id"] != document_id]
+            project = next((p for p in data.get("projects", []) if p["id"] == document["projectId"]), None)
+            if project and document_id in project.get("documentIds", []):
+                project["documentIds"].remove(document_id)
+
+            return self._write_data(data)
+    
     # Relationship helper methods - these combine data from multiple collections
     # backend/app/services/data_service.py
     # Add this method or update your existing get_enriched_vendors_for_category method
@@ -180,15 +1636,15 @@ class DataService:
         Get vendor information enriched with bid details for a specific category.
         Maps your JSON structure to what the frontend expects.
         """
-        data = self._read_data()
+        data = self.snapshot()
         
         # Find the category
         category = next((cat for cat in data.get("categories", []) if cat["id"] == category_id), None)
         if not category:
             return []
         
-        # Get all vendors
-        all_vendors = data.get("vendors", [])
+        # Get all vendors, by id
+        vendors_by_id = {v["id"]: v for v in data.get("vendors", [])}
         
         # Build enriched vendor list
         enriched_vendors = []
@@ -197,59 +1653,142 @@ class DataService:
             vendor_id = participation["vendorId"]
             
             # Find the vendor details
-            vendor = next((v for v in all_vendors if v["id"] == vendor_id), None)
+            vendor = vendors_by_id.get(vendor_id)
             if not vendor:
                 continue
                 
-            # Map your JSON structure to frontend expectations
-            enriched_vendor = {
-                # Basic vendor info - map companyName to name
-                "id": vendor["id"],
-                "name": vendor["companyName"],  # ← Map companyName to name
-                
-                # Flatten contact info
-                "email": vendor["contactInfo"]["email"],
-                "phone": vendor["contactInfo"]["phone"],
-                "website": vendor["contactInfo"].get("website", ""),
-                
-                # Address - flatten or combine
-                "address": f"{vendor['address']['street']}, {vendor['address']['city']}, {vendor['address']['state']} {vendor['address']['zipCode']}",
-                
-                # Bid information from vendorParticipation
-                "bidAmount": participation["bidAmount"],
-                "bidStatus": participation["bidStatus"],
-                "bidDate": participation["bidDate"],
-                "notes": participation.get("notes", ""),
-                
-                # Vendor details
-                "specialties": vendor.get("specialties", []),
-                "dateAdded": vendor.get("dateAdded"),
-                "lastUpdated": vendor.get("lastUpdated"),
-                
-                # Add defaults for fields not in your JSON but expected by frontend
-                "rating": 4.5,  # Default rating
-                "completedProjects": 25,  # Default project count
-                "deliveryTime": "4-6 weeks",  # Default delivery
-                "warranty": "2 years",  # Default warranty
-                "certifications": ["ISO 9001"],  # Default certifications
-                
-                # Timeline fields
-                "inviteDate": participation.get("inviteDate", participation["bidDate"]),
-                "lastContact": vendor.get("lastUpdated")
-            }
-            
-            enriched_vendors.append(enriched_vendor)
+            enriched_vendors.append(self._enriched_vendor(vendor, participation))
         
         return enriched_vendors
     
+    @staticmethod
+    def _enriched_vendor(vendor: Dict[str, Any], participation: Dict[str, Any]) -> Dict[str, Any]:
+        """A vendor's profile combined with its bid in one category, as the frontend expects it."""
+        # Map your JSON structure to frontend expectations
+        return {
+            # Basic vendor info - map companyName to name
+            "id": vendor["id"],
+            "name": vendor["companyName"],  # ← Map companyName to name
+            
+            # Flatten contact info
+            "email": vendor["contactInfo"]["email"],
+            "phone": vendor["contactInfo"]["phone"],
+            "website": vendor["contactInfo"].get("website", ""),
+            
+            # Address - flatten or combine
+            "address": f"{vendor['address']['street']}, {vendor['address']['city']}, {vendor['address']['state']} {vendor['address']['zipCode']}",
+            
+            # Bid information from vendorParticipation
+            "bidAmount": participation["bidAmount"],
+            "bidStatus": participation["bidStatus"],
+            "bidDate": participation["bidDate"],
+            "notes": participation.get("notes", ""),
+            
+            # Vendor details
+            "specialties": vendor.get("specialties", []),
+            "dateAdded": vendor.get("dateAdded"),
+            "lastUpdated": vendor.get("lastUpdated"),
+            
+            # Add defaults for fields not in your JSON but expected by frontend
+            "rating": 4.5,  # Default rating
+            "completedProjects": 25,  # Default project count
+            "deliveryTime": "4-6 weeks",  # Default delivery
+            "warranty": "2 years",  # Default warranty
+            "certifications": ["ISO 9001"],  # Default certifications
+            
+            # Timeline fields
+            "inviteDate": participation.get("inviteDate", participation["bidDate"]),
+            "lastContact": vendor.get("lastUpdated")
+        }
+
+    # Batch reads - several records by id, from one snapshot
+
+    def _id_index(self, data: Dict[str, Any], collection: str) -> Dict[Any, Dict[str, Any]]:
+        """
+        id -> record for a collection of this data, built once per version of the
+        collection. Inside a transaction the data is being modified in place, so the
+        index is built fresh.
+        """
+        records = data.get(collection, [])
+        if self._transaction() is not None:
+            return {record["id"]: record for record in records}
+        cached = self._id_indexes.get(collection)
+        if cached is not None and cached[0] is records:
+            return cached[1]
+        index = {record["id"]: record for record in records}
+        self._id_indexes[collection] = (records, index)
+        return index
+
+    def get_vendors_by_ids(self, vendor_ids: List[int], include_stats: bool = False) -> List[Dict[str, Any]]:
+        """
+        The vendors with these ids, in the order asked for; unknown ids are left out.
+        With include_stats, each vendor also gets "stats": how many categories it
+        takes part in and its bids by status.
+        """
+        data = self.snapshot()
+        index = self._id_index(data, "vendors")
+        vendors = [index[vendor_id] for vendor_id in dict.fromkeys(vendor_ids) if vendor_id in index]
+        if not include_stats:
+            return vendors
+
+        stats = {vendor["id"]: {"categories": 0, "byStatus": {}} for vendor in vendors}
+        table = self._participation_table(data)
+        for bids in table.bids:
+            # Most categories have none of the vendors; the set test runs in C
+            if stats.keys().isdisjoint(bids.vendor_ids):
+                continue
+            for vendor_id, code in zip(bids.vendor_ids, bids.statuses):
+                vendor_stats = stats.get(vendor_id)
+                if vendor_stats is not None:
+                    vendor_stats["categories"] += 1
+                    status = status_name(code) or "none"
+                    vendor_stats["byStatus"][status] = vendor_stats["byStatus"].get(status, 0) + 1
+        return [{**vendor, "stats": stats[vendor["id"]]} for vendor in vendors]
+
+    def get_categories_by_ids(self, category_ids: List[int], include_vendors: bool = False,
+                              include_project: bool = False) -> List[Dict[str, Any]]:
+        """
+        The categories with these ids, in the order asked for; unknown ids are left
+        out. include_vendors adds "vendors", the enriched vendor list of
+        get_enriched_vendors_for_category; include_project adds "project", the id,
+        name, status and groupId of the category's project.
+        """
+        data = self.snapshot()
+        index = self._id_index(data, "categories")
+        categories = [index[category_id] for category_id in dict.fromkeys(category_ids) if category_id in index]
+        if not (include_vendors or include_project):
+            return categories
+
+        vendors = self._id_index(data, "vendors") if include_vendors else {}
+        projects = self._id_index(data, "projects") if include_project else {}
+        results = []
+        for category in categories:
+            result = dict(category)
+            if include_vendors:
+                result["vendors"] = [
+                    self._enriched_vendor(vendors[participation["vendorId"]], participation)
+                    for participation in category.get("vendorParticipation", [])
+                    if participation["vendorId"] in vendors
+                ]
+            if include_project:
+                project = projects.get(category["projectId"])
+                result["project"] = {key: project.get(key) for key in ("id", "name", "status", "groupId")} \
+                    if project is not None else None
+            results.append(result)
+        return results
+
     def calculate_project_metrics(self, project_id: int) -> Dict[str, Any]:
         """
         Calculate real-time project metrics from category data.
         This replaces manual percentage calculations with derived data.
         """
-        categories = self.get_categories_for_project(project_id)
-        
-        if not categories:
+        return self._project_metrics(self._participation_table(self.snapshot()), project_id)
+
+    @staticmethod
+    def _project_metrics(table: ParticipationTable, project_id: int) -> Dict[str, Any]:
+        """The metrics of a project, from the participation table of its snapshot."""
+        positions = table.project_positions(project_id)
+        if not positions:
             return {
                 "totalMaterials": 0,
                 "quotedMaterials": 0,
@@ -259,188 +1798,329 @@ class DataService:
             }
         
         # Calculate totals from category data
-        total_materials = sum(cat["totalItems"] for cat in categories)
-        quoted_materials = sum(cat["quotedItems"] for cat in categories)
+        total_materials = sum(table.categories[position]["totalItems"] for position in positions)
+        quoted_materials = sum(table.categories[position]["quotedItems"] for position in positions)
         
         # Count unique vendors across all categories
-        all_vendor_ids = set()
-        active_vendors = 0
-        
-        for category in categories:
-            for participation in category.get("vendorParticipation", []):
-                all_vendor_ids.add(participation["vendorId"])
-                if participation["bidStatus"] == "submitted":
-                    active_vendors += 1
+        total_vendors, active_vendors = table.project_vendor_activity(project_id, _SUBMITTED_CODE)
         
         completion_percentage = round((quoted_materials / total_materials) * 100) if total_materials > 0 else 0
         
         return {
             "totalMaterials": total_materials,
             "quotedMaterials": quoted_materials,
-            "totalVendors": len(all_vendor_ids),
+            "totalVendors": total_vendors,
             "activeVendors": active_vendors,
             "completionPercentage": completion_percentage
         }
 
+    # Dashboard read models - summaries assembled from one pass over the data
+
+    def get_project_summaries(self, group_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Project cards for the dashboard: the fields a card shows plus metrics, for
+        one group's projects or all of them.
+        Categories are found through the participation table's project index
+        instead of one scan per project.
+        """
+        data = self.snapshot()
+        projects = data.get("projects", []) if group_id is None else self._group_projects(data, group_id)
+        table = self._participation_table(data)
+
+        summaries = []
+        for project in projects:
+            summary = {field: project[field] for field in DASHBOARD_PROJECT_FIELDS if field in project}
+            summary["metrics"] = self._project_metrics(table, project["id"])
+            summaries.append(summary)
+        return summaries
+
+    def get_recent_bid_activity(self, group_id: Optional[int] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """The most recent bids across one group's projects (or all of them), newest first."""
+        data = self.snapshot()
+        table = self._participation_table(data)
+        if group_id is None:
+            positions: Iterable[int] = range(len(table.categories))
+        else:
+            positions = sorted(position for project in self._group_projects(data, group_id)
+                               for position in table.project_positions(project["id"]))
+
+        # Only the bids that make the cut are turned into response dicts
+        latest = table.latest(positions, limit)
+        projects = {p["id"]: p for p in data.get("projects", [])}
+        vendor_names = {v["id"]: v.get("companyName", "") for v in data.get("vendors", [])}
+        activity = []
+        for position, row in latest:
+            category = table.categories[position]
+            participation = table.row(position, row)
+            activity.append({
+                "date": participation.get("bidDate", ""),
+                "projectId": category["projectId"],
+                "projectName": projects.get(category["projectId"], {}).get("name", ""),
+                "categoryId": category["id"],
+                "categoryName": category.get("name", ""),
+                "vendorId": participation["vendorId"],
+                "vendorName": vendor_names.get(participation["vendorId"], ""),
+                "bidAmount": participation.get("bidAmount"),
+                "bidStatus": participation.get("bidStatus")
+            })
+        return activity
+
     def create_new_project(self, project_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Create a new project and add it to the JSON file.
         This is the core method for adding new projects to your system.
         """
-        data = self._read_data()
-        
-        # Generate new project ID
-        existing_ids = [project["id"] for project in data.get("projects", [])]
-        new_id = max(existing_ids, default=0) + 1
-        
-        # Create the new project with all required fields
-        new_project = {
-            "id": new_id,
-            "name": project_data.get("name", ""),
-            "client": project_data.get("client", ""),
-            "startDate": project_data.get("startDate", ""),
-            "bidDeadline": project_data.get("bidDeadline", ""),
-            "estimatedValue": project_data.get("estimatedValue", 0),
-            "status": project_data.get("status", "early"),
-            "description": project_data.get("description", ""),
-            "location": {
-                "address": project_data.get("address", ""),
-                "city": project_data.get("city", ""),
-                "state": project_data.get("state", ""),
-                "zipCode": project_data.get("zipCode", "")
-            },
-            "clientContact": {
-                "name": project_data.get("clientContactName", ""),
-                "email": project_data.get("clientContactEmail", ""),
-                "phone": project_data.get("clientContactPhone", "")
-            },
-            "documentIds": [],  # Start with empty documents
-            "categoryIds": [],  # Start with empty categories
-            "createdDate": datetime.now().strftime("%Y-%m-%d"),
-            "lastUpdated": datetime.now().strftime("%Y-%m-%d")
-        }
+        with self._write_lock(lambda data: self._partitions_of(
+                data, group_ids=[project_data.get("groupId")]) | {SEQUENCES_PARTITION}):
+            data = self._read_data()
         
-        # Add to projects array
-        data.setdefault("projects", []).append(new_project)
+            self._ensure_group_rollups(data)
+
+            # Generate new project ID
+            new_id = self._next_id(data, "projects", 0)
         
-        # Save to file
-        if self._write_data(data):
-            return new_project
-        else:
-            raise Exception("Failed to save new project")
+            # Create the new project with all required fields
+            new_project = {
+                "id": new_id,
+                "name": project_data.get("name", ""),
+                "client": project_data.get("client", ""),
+                "startDate": project_data.get("startDate", ""),
+                "bidDeadline": project_data.get("bidDeadline", ""),
+                "estimatedValue": project_data.get("estimatedValue", 0),
+                "status": project_data.get("status", "early"),
+                "description": project_data.get("description", ""),
+                "location": {
+                    "address": project_data.get("address", ""),
+                    "city": project_data.get("city", ""),
+                    "state": project_data.get("state", ""),
+                    "zipCode": project_data.get("zipCode", "")
+                },
+                "clientContact": {
+                    "name": project_data.get("clientContactName", ""),
+                    "email": project_data.get("clientContactEmail", ""),
+                    "phone": project_data.get("clientContactPhone", "")
+                },
+                "documentIds": [],  # Start with empty documents
+                "categoryIds": [],  # Start with empty categories
+                "createdDate": datetime.now().strftime("%Y-%m-%d"),
+                "lastUpdated": datetime.now().strftime("%Y-%m-%d")
+            }
+            if project_data.get("groupId") is not None:
+                new_project["groupId"] = project_data["groupId"]
+        
+            # Add to projects array
+            data.setdefault("projects", []).append(new_project)
+
+            # Count the project in its group's rollup
+            group_id = new_project.get("groupId")
+            self._update_group_membership(data, new_id, None, group_id)
+            self._apply_group_rollup_change(data, None, None, group_id,
+                                            self._project_contribution_in(data, new_project))
+        
+            # Save to file
+            if self._write_data(data):
+                return new_project
+            else:
+                raise Exception("Failed to save new project")
 
     def update_project(self, project_id: int, updates: Dict[str, Any]) -> bool:
         """
         Update an existing project's information.
         This allows editing project details after creation.
         """
-        data = self._read_data()
+        # A project moving to another group changes that group's partition too
+        new_group_ids = [updates["groupId"]] if "groupId" in updates else []
+        with self._write_lock(lambda data: self._partitions_of(data, project_ids=[project_id],
+                                                               group_ids=new_group_ids)):
+            data = self._read_data()
         
-        projects = data.get("projects", [])
-        project = next((p for p in projects if p["id"] == project_id), None)
+            projects = data.get("projects", [])
+            project = next((p for p in projects if p["id"] == project_id), None)
         
-        if not project:
-            return False
+            if not project:
+                return False
+
+            # Remember what the project contributed to its group before the change
+            self._ensure_group_rollups(data)
+            old_group_id = project.get("groupId")
+            old_partition = project_partitions(data).get(project_id)
+            before = self._project_contribution_in(data, project)
         
-        # Update basic fields
-        updatable_fields = [
-            "name", "client", "startDate", "bidDeadline", 
-            "estimatedValue", "status", "description"
-        ]
+            # Update basic fields
+            updatable_fields = [
+                "name", "client", "startDate", "bidDeadline", 
+                "estimatedValue", "status", "description", "groupId"
+            ]
         
-        for field in updatable_fields:
-            if field in updates:
-                project[field] = updates[field]
-        
-        # Update location if provided
-        if any(field in updates for field in ["address", "city", "state", "zipCode"]):
-            if "address" in updates:
-                project["location"]["address"] = updates["address"]
-            if "city" in updates:
-                project["location"]["city"] = updates["city"]
-            if "state" in updates:
-                project["location"]["state"] = updates["state"]
-            if "zipCode" in updates:
-                project["location"]["zipCode"] = updates["zipCode"]
-        
-        # Update client contact if provided
-        if any(field in updates for field in ["clientContactName", "clientContactEmail", "clientContactPhone"]):
-            if "clientContactName" in updates:
-                project["clientContact"]["name"] = updates["clientContactName"]
-            if "clientContactEmail" in updates:
-                project["clientContact"]["email"] = updates["clientContactEmail"]
-            if "clientContactPhone" in updates:
-                project["clientContact"]["phone"] = updates["clientContactPhone"]
-        
-        # Update timestamp
-        project["lastUpdated"] = datetime.now().strftime("%Y-%m-%d")
-        
-        return self._write_data(data)
-
-    def delete_project(self, project_id: int) -> bool:
-        """
-        Delete a project and all its associated categories.
-        This removes the project entirely from the system.
-        """
-        data = self._read_data()
+            for field in updatable_fields:
+                if field in updates:
+                    project[field] = updates[field]
         
-        # Remove project
-        projects = data.get("projects", [])
-        data["projects"] = [p for p in projects if p["id"] != project_id]
+            # Update location if provided
+            if any(field in updates for field in ["address", "city", "state", "zipCode"]):
+                if "address" in updates:
+                    project["location"]["address"] = updates["address"]
+                if "city" in updates:
+                    project["location"]["city"] = updates["city"]
+                if "state" in updates:
+                    project["location"]["state"] = updates["state"]
+                if "zipCode" in updates:
+                    project["location"]["zipCode"] = updates["zipCode"]
         
-        # Remove associated categories
-        categories = data.get("categories", [])
-        data["categories"] = [c for c in categories if c["projectId"] != project_id]
+            # Update client contact if provided
+            if any(field in updates for field in ["clientContactName", "clientContactEmail", "clientContactPhone"]):
+                if "clientContactName" in updates:
+                    project["clientContact"]["name"] = updates["clientContactName"]
+                if "clientContactEmail" in updates:
+                    project["clientContact"]["email"] = updates["clientContactEmail"]
+                if "clientContactPhone" in updates:
+                    project["clientContact"]["phone"] = updates["clientContactPhone"]
         
-        # Remove associated documents (optional - you might want to keep them)
-        documents = data.get("documents", [])
-        data["documents"] = [d for d in documents if d["projectId"] != project_id]
+            # Update timestamp
+            project["lastUpdated"] = datetime.now().strftime("%Y-%m-%d")
+
+            # Re-apply the project to its (possibly new) group's rollup
+            new_group_id = project.get("groupId")
+            self._update_group_membership(data, project_id, old_group_id, new_group_id)
+            self._apply_group_rollup_change(data, old_group_id, before, new_group_id,
+                                            self._project_contribution_in(data, project))
+
+            # The project's bids move to the new group's partition, price index and all
+            new_partition = project_partitions(data).get(project_id)
+            if new_partition != old_partition:
+                trades = {trade_key(c.get("name")) for c in data.get("categories", []) if c["projectId"] == project_id}
+                if trades:
+                    self._reindex_trades(data, old_partition, trades)
+                    self._reindex_trades(data, new_partition, trades)
         
-        return self._write_data(data)
+            return self._write_data(data)
+
+    def update_projects(self, updates: List[Dict[str, Any]]) -> int:
+        """
+        Apply several project updates in one write. Each entry is an update_project
+        payload plus the project "id". If any project is missing, none are updated.
+        Returns the number of projects updated.
+        """
+        with self.transaction(lambda data: self._partitions_of(
+                data, project_ids=[u.get("id") for u in updates],
+                group_ids=[u["groupId"] for u in updates if "groupId" in u])):
+            for project_updates in updates:
+                fields = {key: value for key, value in project_updates.items() if key != "id"}
+                if not self.update_project(project_updates.get("id"), fields):
+                    raise ValueError(f"Project {project_updates.get('id')} not found")
+        return len(updates)
+
+    def delete_project(self, project_id: int) -> bool:
+        """
+        Delete a project and all its associated categories and documents.
+        This removes the project entirely from the system, in a single write.
+        """
+        with self.transaction(lambda data: self._partitions_of(data, project_ids=[project_id])):
+            data = self._read_data()
+
+            projects = data.get("projects", [])
+            project = next((p for p in projects if p["id"] == project_id), None)
+            if not project:
+                return False
+
+            # The cascade below has no undo other than restoring this snapshot
+            if self.snapshots is not None:
+                with _timed("snapshot"):
+                    self.snapshots.create(data, f"before delete_project {project_id}")
+
+            # Categories first, so the group rollup loses their bids along with them
+            for category in [c for c in data.get("categories", []) if c["projectId"] == project_id]:
+                self.delete_category(category["id"])
+
+            for document in [d for d in data.get("documents", []) if d["projectId"] == project_id]:
+                self.delete_document(document["id"])
+
+            self._ensure_group_rollups(data)
+            group_id = project.get("groupId")
+            self._apply_group_rollup_change(data, group_id, self._project_contribution_in(data, project),
+                                            None, None)
+            self._update_group_membership(data, project_id, group_id, None)
+            data["projects"] = [p for p in projects if p["id"] != project_id]
+
+            return self._write_data(data)
+
+    def delete_category(self, category_id: int) -> bool:
+        """
+        Delete a category with its vendor bids and line items.
+        The project's group rollup and its trade's price index lose the bids that go with it.
+        """
+        with self._write_lock(lambda data: self._partitions_of(data, category_ids=[category_id])):
+            data = self._read_data()
+
+            categories = data.get("categories", [])
+            category = next((c for c in categories if c["id"] == category_id), None)
+            if not category:
+                return False
+
+            project = next((p for p in data.get("projects", []) if p["id"] == category["projectId"]), None)
+            if project:
+                self._ensure_group_rollups(data)
+                before = self._project_contribution_in(data, project)
+
+            data["categories"] = [c for c in categories if c["id"] != category_id]
+            # The category's bids leave its trade's price distribution
+            self._reindex_trades(data, self._category_partition(data, category),
+                                 [trade_key(category.get("name"))])
+
+            if project:
+                if category_id in project.get("categoryIds", []):
+                    project["categoryIds"].remove(category_id)
+                project["lastUpdated"] = datetime.now().strftime("%Y-%m-%d")
+                group_id = project.get("groupId")
+                self._apply_group_rollup_change(data, group_id, before, group_id,
+                                                self._project_contribution_in(data, project))
+
+            return self._write_data(data)
 
     def add_category_to_project(self, project_id: int, category_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Add a new category to an existing project.
         This allows building out project structure after creation.
         """
-        data = self._read_data()
+        with self._write_lock(lambda data: self._partitions_of(
+                data, project_ids=[project_id]) | {SEQUENCES_PARTITION}):
+            data = self._read_data()
         
-        # Verify project exists
-        project = next((p for p in data.get("projects", []) if p["id"] == project_id), None)
-        if not project:
-            raise Exception("Project not found")
-        
-        # Generate new category ID
-        existing_ids = [category["id"] for category in data.get("categories", [])]
-        new_id = max(existing_ids, default=300) + 1
-        
-        # Create new category
-        new_category = {
-            "id": new_id,
-            "projectId": project_id,
-            "name": category_data.get("name", ""),
-            "description": category_data.get("description", ""),
-            "totalItems": category_data.get("totalItems", 0),
-            "quotedItems": 0,  # Start with 0 quoted items
-            "status": "pending",  # Start as pending
-            "vendorParticipation": [],  # Start with no vendors
-            "specifications": category_data.get("specifications", ""),
-            "estimatedValue": category_data.get("estimatedValue", 0),
-            "deadlineDate": category_data.get("deadlineDate", "")
-        }
+            # Verify project exists
+            project = next((p for p in data.get("projects", []) if p["id"] == project_id), None)
+            if not project:
+                raise Exception("Project not found")
+        
+            # Generate new category ID
+            new_id = self._next_id(data, "categories", 300)
         
-        # Add to categories array
-        data.setdefault("categories", []).append(new_category)
+            # Create new category
+            new_category = {
+                "id": new_id,
+                "projectId": project_id,
+                "name": category_data.get("name", ""),
+                "description": category_data.get("description", ""),
+                "totalItems": category_data.get("totalItems", 0),
+                "quotedItems": 0,  # Start with 0 quoted items
+                "status": "pending",  # Start as pending
+                "vendorParticipation": [],  # Start with no vendors
+                "specifications": category_data.get("specifications", ""),
+                "estimatedValue": category_data.get("estimatedValue", 0),
+                "deadlineDate": category_data.get("deadlineDate", "")
+            }
         
-        # Update project's category IDs
-        project.setdefault("categoryIds", []).append(new_id)
-        project["lastUpdated"] = datetime.now().strftime("%Y-%m-%d")
+            # Add to categories array
+            data.setdefault("categories", []).append(new_category)
         
-        # Save to file
-        if self._write_data(data):
-            return new_category
-        else:
-            raise Exception("Failed to save new category")
+            # Update project's category IDs
+            project.setdefault("categoryIds", []).append(new_id)
+            project["lastUpdated"] = datetime.now().strftime("%Y-%m-%d")
+        
+            # Save to file
+            if self._write_data(data):
+                return new_category
+            else:
+                raise Exception("Failed to save new category")
 
     def get_project_templates(self) -> List[Dict[str, Any]]:
         """
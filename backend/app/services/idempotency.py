@@ -0,0 +1,177 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows - only the in-process lock applies there
+    fcntl = None
+
+PENDING = "pending"
+DONE = "done"
+RELEASED = "released"
+
+# What begin() found for a key
+PROCEED = "proceed"      # new key, now reserved for this request
+REPLAY = "replay"        # finished before - send the stored response
+IN_PROGRESS = "in_progress"  # another request with the key is still running
+MISMATCH = "mismatch"    # the key was used for a different request
+
+
+class IdempotencyStore:
+    """
+    Responses to requests sent with an Idempotency-Key, so a retried request gets
+    the original response instead of running again.
+
+    A key goes through two states: pending while its first request runs, then done
+    with the stored response. Each is a line appended to keys.log; a key whose
+    request failed is released, so it can be retried for real. The file is shared
+    by the worker processes: appends happen under a lock file, and every process
+    keeps the live keys in memory and reads only the lines appended since it last
+    looked.
+
+    Keys expire `ttl` seconds after they were first used, and at most `max_entries`
+    are kept (oldest dropped first). A pending key is given up after
+    `pending_timeout` seconds, in case its worker died mid-request. The log is
+    rewritten with just the live keys once it has grown to twice max_entries lines.
+    """
+
+    def __init__(self, directory: str = "data/idempotency", max_entries: int = 10_000, ttl: float = 24 * 3600,
+                 pending_timeout: float = 60.0):
+        self.directory = directory
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.pending_timeout = pending_timeout
+        os.makedirs(directory, exist_ok=True)
+        self._path = os.path.join(directory, "keys.log")
+        self._lock = threading.Lock()
+        self._exclusive_lock = threading.Lock()
+        # key -> record, oldest first (guarded by _lock)
+        self._records: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._file_id: Optional[Tuple[int, int]] = None
+        self._offset = 0
+        self._lines = 0
+
+    @contextmanager
+    def _exclusive(self):
+        """Serialize appends and compaction, across threads and worker processes."""
+        with self._exclusive_lock:
+            if fcntl is None:
+                yield
+                return
+            with open(os.path.join(self.directory, ".lock"), "a") as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _refresh(self):
+        """Bring the in-memory keys up to date with the file (call with _lock held)."""
+        try:
+            stat = os.stat(self._path)
+        except FileNotFoundError:
+            return
+        file_id = (stat.st_dev, stat.st_ino)
+        if file_id != self._file_id:
+            # New or compacted file - read it from the start
+            self._records, self._offset, self._lines = OrderedDict(), 0, 0
+            self._file_id = file_id
+        if stat.st_size <= self._offset:
+            return
+
+        with open(self._path, "rb") as file:
+            file.seek(self._offset)
+            chunk = file.read(stat.st_size - self._offset)
+        # A line still being appended by another process is picked up next time
+        complete = chunk.rfind(b"\n") + 1
+        for line in chunk[:complete].splitlines():
+            if not line.strip():
+                continue
+            self._apply(json.loads(line))
+        self._offset += complete
+        self._evict()
+
+    def _apply(self, record: Dict[str, Any]):
+        self._lines += 1
+        key = record["key"]
+        if record["state"] == RELEASED:
+            self._records.pop(key, None)
+            return
+        previous = self._records.pop(key, None)
+        if previous is not None:
+            # The key keeps its place and expiry from its first use
+            record["at"] = previous["at"]
+        self._records[key] = record
+
+    def _evict(self):
+        """Drop expired keys and the oldest beyond max_entries (call with _lock held)."""
+        cutoff = time.time() - self.ttl
+        while self._records:
+            oldest = next(iter(self._records.values()))
+            if oldest["at"] >= cutoff and len(self._records) <= self.max_entries:
+                break
+            self._records.popitem(last=False)
+
+    def _append(self, record: Dict[str, Any]):
+        """Append a record to the log (call with the exclusive lock held)."""
+        with open(self._path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(record, separators=(",", ":")) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        with self._lock:
+            self._refresh()
+            if self._lines > 2 * self.max_entries:
+                self._compact()
+
+    def _compact(self):
+        """Rewrite the log with only the live keys (call with both locks held)."""
+        temp_path = self._path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            for record in self._records.values():
+                file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        os.replace(temp_path, self._path)
+        self._file_id = None
+        self._refresh()
+
+    def begin(self, key: str, fingerprint: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Claim a key for a request. Returns (PROCEED, None) if the request should run
+        - the key is now pending - or (REPLAY, record), (IN_PROGRESS, None) or
+        (MISMATCH, None) if it was used before.
+        """
+        with self._exclusive():
+            with self._lock:
+                self._refresh()
+                record = self._records.get(key)
+            if record is not None and time.time() - record["at"] < self.ttl:
+                if record["fingerprint"] != fingerprint:
+                    return MISMATCH, None
+                if record["state"] == DONE:
+                    return REPLAY, record
+                if time.time() - record.get("startedAt", record["at"]) < self.pending_timeout:
+                    return IN_PROGRESS, None
+                # The request holding the key never finished; this one takes over
+            now = time.time()
+            self._append({"key": key, "state": PENDING, "fingerprint": fingerprint, "at": now, "startedAt": now})
+        return PROCEED, None
+
+    def complete(self, key: str, fingerprint: str, status: int, headers: List[Tuple[str, str]], body: str):
+        """Store the response to a key's request, for replay to its retries."""
+        with self._exclusive():
+            self._append({"key": key, "state": DONE, "fingerprint": fingerprint, "at": time.time(),
+                          "response": {"status": status, "headers": headers, "body": body}})
+
+    def release(self, key: str):
+        """Forget a pending key whose request failed, so a retry runs it again."""
+        with self._exclusive():
+            self._append({"key": key, "state": RELEASED, "at": time.time()})
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._records)
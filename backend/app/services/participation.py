@@ -0,0 +1,203 @@
+import heapq
+import math
+import operator
+import threading
+from array import array
+from datetime import date
+from functools import lru_cache
+from itertools import compress, repeat
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+# Bid statuses are stored as one byte each. The known ones have fixed codes; any other
+# status seen in the data gets the next free code, so the table never loses information
+KNOWN_STATUSES = ("invited", "pending", "submitted", "selected", "not_selected", "declined")
+NO_STATUS = 0
+_status_names: List[Optional[str]] = [None, *KNOWN_STATUSES]
+_status_codes: Dict[str, int] = {name: code for code, name in enumerate(_status_names) if name is not None}
+_status_lock = threading.Lock()
+
+# Dates are stored as days since 1970-01-01; a missing or malformed date as NO_DATE
+NO_DATE = -(2 ** 31)
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# A missing bid amount is stored as NaN, which never counts towards a sum or a comparison
+NO_AMOUNT = math.nan
+
+
+def status_code(status: Optional[str]) -> int:
+    """The interned code of a bid status."""
+    if status is None:
+        return NO_STATUS
+    code = _status_codes.get(status)
+    if code is None:
+        with _status_lock:
+            code = _status_codes.get(status)
+            if code is None:
+                if len(_status_names) > 255:
+                    raise ValueError("Too many distinct bid statuses")
+                code = _status_codes[status] = len(_status_names)
+                _status_names.append(status)
+    return code
+
+
+def status_name(code: int) -> Optional[str]:
+    return _status_names[code]
+
+
+@lru_cache(maxsize=4096)
+def date_to_days(value: Optional[str]) -> int:
+    """Days since the epoch for a YYYY-MM-DD date (bid dates repeat a lot, hence the cache)."""
+    try:
+        return date.fromisoformat(value[:10]).toordinal() - _EPOCH_ORDINAL
+    except (TypeError, ValueError):
+        return NO_DATE
+
+
+def _amount(value: Any) -> float:
+    try:
+        return NO_AMOUNT if value is None else float(value)
+    except (TypeError, ValueError):
+        return NO_AMOUNT
+
+
+class CategoryBids:
+    """One category's bids as columns: one array per field, one entry per vendor."""
+
+    __slots__ = ("category", "vendor_ids", "amounts", "statuses", "dates", "latest_date")
+
+    def __init__(self, category: Dict[str, Any]):
+        participations = category.get("vendorParticipation") or []
+        # The dict this was built from, to tell whether a newer snapshot changed it
+        self.category = category
+        self.vendor_ids = array("q", map(dict.__getitem__, participations, repeat("vendorId")))
+
+        raw_amounts = list(map(dict.get, participations, repeat("bidAmount")))
+        try:
+            self.amounts = array("d", raw_amounts)
+        except TypeError:
+            self.amounts = array("d", map(_amount, raw_amounts))
+
+        raw_statuses = list(map(dict.get, participations, repeat("bidStatus")))
+        codes = list(map(_status_codes.get, raw_statuses))
+        if None in codes:
+            codes = list(map(status_code, raw_statuses))
+        self.statuses = array("B", codes)
+
+        self.dates = array("i", map(date_to_days, map(dict.get, participations, repeat("bidDate"))))
+        self.latest_date = max(self.dates, default=NO_DATE)
+
+    def __len__(self) -> int:
+        return len(self.vendor_ids)
+
+
+class ParticipationTable:
+    """
+    Every vendor's participation in every category, column by column.
+
+    The stored data keeps vendorParticipation as a list of dicts per category. Scans
+    over all bids - project metrics, dashboard activity, award inputs - read this
+    table instead: per category, one array per field (CategoryBids), with bid
+    statuses as interned one-byte codes and dates as day numbers. Counting,
+    collecting and filtering a category's bids runs in C (array.count, set(), map)
+    rather than in a Python loop over dicts.
+
+    The table is an index kept next to the parsed dicts, not a replacement for them:
+    the snapshot and row() still need the dicts, so each data version costs about 33
+    bytes per bid on top of them (bench_participation.py measures it).
+
+    A table is built from a read-only snapshot and never mutated. Building the next
+    snapshot's table reuses the columns of every category whose dict is unchanged,
+    so a write only costs the categories of the partitions it rewrote.
+
+    Rows are materialized only at the API edge: `row()` hands back the stored dict a
+    row was built from, without copying it, and responses are built from just the
+    rows they return.
+    """
+
+    __slots__ = ("categories", "bids", "_positions", "_by_project", "_project_metrics")
+
+    def __init__(self, categories: Sequence[Dict[str, Any]], previous: Optional["ParticipationTable"] = None):
+        self.categories = categories
+        reusable: Dict[int, CategoryBids] = {}
+        if previous is not None:
+            reusable = {id(bids.category): bids for bids in previous.bids}
+        self.bids: List[CategoryBids] = []
+        for category in categories:
+            bids = reusable.get(id(category))
+            # id() alone could match a new dict at a freed address; the reference settles it
+            if bids is None or bids.category is not category:
+                bids = CategoryBids(category)
+            self.bids.append(bids)
+
+        # category id -> position, and project id -> positions of its categories
+        self._positions = {category["id"]: position for position, category in enumerate(categories)}
+        self._by_project: Dict[int, List[int]] = {}
+        for position, category in enumerate(categories):
+            self._by_project.setdefault(category["projectId"], []).append(position)
+        # (project id, status) -> (distinct vendors, bids with the status); filled in as projects are asked for
+        self._project_metrics: Dict[Tuple[int, int], Tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        return sum(map(len, self.bids))
+
+    def position(self, category_id: int) -> Optional[int]:
+        return self._positions.get(category_id)
+
+    def project_positions(self, project_id: int) -> List[int]:
+        """Positions of a project's categories, in snapshot order."""
+        return self._by_project.get(project_id, [])
+
+    def row(self, position: int, row: int) -> Dict[str, Any]:
+        """The stored participation dict a row was built from (read-only)."""
+        return self.categories[position]["vendorParticipation"][row]
+
+    def project_vendor_activity(self, project_id: int, status: int) -> Tuple[int, int]:
+        """
+        How many distinct vendors bid on any of a project's categories, and how many
+        bids have this status. Computed once per project and snapshot.
+        """
+        key = (project_id, status)
+        cached = self._project_metrics.get(key)
+        if cached is None:
+            vendor_ids: Set[int] = set()
+            count = 0
+            for position in self.project_positions(project_id):
+                bids = self.bids[position]
+                vendor_ids.update(bids.vendor_ids)
+                count += bids.statuses.count(status)
+            cached = self._project_metrics[key] = (len(vendor_ids), count)
+        return cached
+
+    def priced_bids(self, position: int, codes: Iterable[int]) -> Dict[int, Any]:
+        """vendor id -> stored bid amount, for positive bids with these statuses in a category."""
+        wanted = frozenset(codes)
+        bids = self.bids[position]
+        participations = self.categories[position]["vendorParticipation"]
+        rows = compress(range(len(bids)), map(operator.and_, map(wanted.__contains__, bids.statuses),
+                                              map((0.0).__lt__, bids.amounts)))
+        return {participations[row]["vendorId"]: participations[row]["bidAmount"] for row in rows}
+
+    def latest(self, positions: Iterable[int], limit: int) -> List[Tuple[int, int]]:
+        """
+        (position, row) of the `limit` bids with the latest dates across these
+        categories, newest first; equal dates keep snapshot order. Categories are
+        visited newest first and the scan stops once no remaining category can
+        have a bid later than the ones already found.
+        """
+        if limit <= 0:
+            return []
+        ordered = sorted(positions, key=lambda position: self.bids[position].latest_date, reverse=True)
+        newest: List[Tuple[int, int, int]] = []  # heap of (date, -position, -row)
+        for position in ordered:
+            bids = self.bids[position]
+            if len(newest) == limit and bids.latest_date < newest[0][0]:
+                break
+            for row, day in enumerate(bids.dates):
+                item = (day, -position, -row)
+                if len(newest) < limit:
+                    heapq.heappush(newest, item)
+                elif item > newest[0]:
+                    heapq.heapreplace(newest, item)
+        newest.sort(reverse=True)
+        return [(-position, -row) for _, position, row in newest]
+
@@ -0,0 +1,203 @@
+import operator
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows - only the in-process locks apply there
+    fcntl = None
+
+# The data is stored as one JSON file per partition:
+#   shared      vendors, plus any top-level key that isn't partitioned
+#   sequences   the last id handed out per collection, so partitions written in
+#               parallel never hand out the same id
+#   group-<id>  a group's record with its projects, their categories and documents,
+#               and the price index of the bids in those categories
+#   ungrouped   projects without a (known) group, with their categories and documents
+SHARED_PARTITION = "shared"
+SEQUENCES_PARTITION = "sequences"
+UNGROUPED_PARTITION = "ungrouped"
+GROUP_PARTITION_PREFIX = "group-"
+
+# Collections split by group, in every group and the ungrouped partition
+GROUPED_COLLECTIONS = ("groups", "projects", "categories", "documents")
+
+PARTITION_SUFFIX = ".json"
+LOCK_SUFFIX = ".lock"
+
+FileVersion = Tuple[int, int, int]
+
+
+def group_partition(group_id: Any) -> str:
+    return f"{GROUP_PARTITION_PREFIX}{group_id}"
+
+
+def empty_partitions() -> Dict[str, Dict[str, Any]]:
+    return {
+        SHARED_PARTITION: {"vendors": []},
+        SEQUENCES_PARTITION: {"sequences": {}},
+        UNGROUPED_PARTITION: {name: [] for name in GROUPED_COLLECTIONS},
+    }
+
+
+def project_partitions(data: Dict[str, Any]) -> Dict[Any, str]:
+    """The partition of every project: its group's, or ungrouped."""
+    group_ids = {group["id"] for group in data.get("groups", [])}
+    return {
+        project["id"]: group_partition(project.get("groupId")) if project.get("groupId") in group_ids
+        else UNGROUPED_PARTITION
+        for project in data.get("projects", [])
+    }
+
+
+def split_partitions(data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Split the merged data into partitions. Records are shared with `data`, not copied.
+    Categories and documents follow their project; those whose project is missing
+    are kept in the ungrouped partition.
+    """
+    partitions = empty_partitions()
+    for group in data.get("groups", []):
+        partitions[group_partition(group["id"])] = {name: [] for name in GROUPED_COLLECTIONS}
+        partitions[group_partition(group["id"])]["groups"].append(group)
+
+    projects = project_partitions(data)
+    for project in data.get("projects", []):
+        partitions[projects[project["id"]]]["projects"].append(project)
+    for name in ("categories", "documents"):
+        for record in data.get(name, []):
+            partitions[projects.get(record["projectId"], UNGROUPED_PARTITION)][name].append(record)
+
+    for key, index in data.get("priceIndexes", {}).items():
+        if key in partitions:
+            partitions[key]["priceIndex"] = index
+
+    shared = partitions[SHARED_PARTITION]
+    shared["vendors"] = data.get("vendors", [])
+    partitions[SEQUENCES_PARTITION]["sequences"] = data.get("sequences", {})
+    for name, value in data.items():
+        if name not in GROUPED_COLLECTIONS and name not in ("vendors", "sequences", "priceIndexes"):
+            shared[name] = value
+    return partitions
+
+
+def merge_partitions(partitions: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merge partitions back into one view with the shape of the original data file.
+    Grouped collections come back in id order, as they were in the single file.
+    """
+    shared = partitions.get(SHARED_PARTITION, {})
+    data: Dict[str, Any] = {"vendors": shared.get("vendors", [])}
+    for name in GROUPED_COLLECTIONS:
+        data[name] = []
+    data["sequences"] = partitions.get(SEQUENCES_PARTITION, {}).get("sequences", {})
+    data["priceIndexes"] = {}
+
+    for key in sorted(partitions):
+        if key in (SHARED_PARTITION, SEQUENCES_PARTITION):
+            continue
+        partition = partitions[key]
+        for name in GROUPED_COLLECTIONS:
+            data[name].extend(partition.get(name, []))
+        if "priceIndex" in partition:
+            data["priceIndexes"][key] = partition["priceIndex"]
+
+    if len(partitions) > 3:
+        # Each partition is already in id order, so this is a cheap merge of sorted runs
+        by_id = operator.itemgetter("id")
+        for name in GROUPED_COLLECTIONS:
+            data[name].sort(key=by_id)
+
+    for name, value in shared.items():
+        if name != "vendors":
+            data[name] = value
+    return data
+
+
+def same_records(partition: Dict[str, Any], base: Dict[str, Any]) -> bool:
+    """
+    Whether a partition split from modified data still holds exactly the objects it
+    was built from - a cheap identity check, used for partitions a write didn't lock.
+    """
+    if partition.keys() != base.keys():
+        return False
+    for name, value in partition.items():
+        original = base[name]
+        if value is original:
+            continue
+        if not (isinstance(value, list) and isinstance(original, list) and len(value) == len(original)
+                and all(map(operator.is_, value, original))):
+            return False
+    return True
+
+
+class PartitionLocks:
+    """
+    One exclusive lock per partition: a thread lock for this process and a lock
+    file for the other worker processes. Callers always lock in sorted key order,
+    so two writers can never wait on each other.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._guard = threading.Lock()
+        self._thread_locks: Dict[str, threading.Lock] = {}
+
+    def _thread_lock(self, key: str) -> threading.Lock:
+        with self._guard:
+            lock = self._thread_locks.get(key)
+            if lock is None:
+                lock = self._thread_locks[key] = threading.Lock()
+            return lock
+
+    def acquire(self, keys: Iterable[str]) -> Tuple[List[Tuple[threading.Lock, Optional[Any]]], float]:
+        """Lock the partitions in sorted order. Returns the held locks and the seconds spent waiting."""
+        start = time.perf_counter()
+        held: List[Tuple[threading.Lock, Optional[Any]]] = []
+        try:
+            for key in sorted(set(keys)):
+                lock = self._thread_lock(key)
+                lock.acquire()
+                lock_file = None
+                try:
+                    if fcntl is not None:
+                        lock_file = open(os.path.join(self.directory, key + LOCK_SUFFIX), "a")
+                        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                except BaseException:
+                    if lock_file is not None:
+                        lock_file.close()
+                    lock.release()
+                    raise
+                held.append((lock, lock_file))
+        except BaseException:
+            self.release(held)
+            raise
+        return held, time.perf_counter() - start
+
+    @staticmethod
+    def release(held: List[Tuple[threading.Lock, Optional[Any]]]):
+        for lock, lock_file in reversed(held):
+            if lock_file is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+                lock_file.close()
+            lock.release()
+
+
+def partition_versions(directory: str) -> Dict[str, FileVersion]:
+    """(mtime, size, inode) of every partition file. Writes replace files atomically, so any change shows."""
+    versions = {}
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return versions
+    for entry in entries:
+        if not entry.name.endswith(PARTITION_SUFFIX):
+            continue
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue
+        versions[entry.name[:-len(PARTITION_SUFFIX)]] = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    return versions
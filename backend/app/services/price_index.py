@@ -0,0 +1,140 @@
+import math
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Accuracy parameter: rank error is about 1.7 / k, so k=200 keeps percentiles within ~1%
+DEFAULT_K = 200
+_CAPACITY_DECAY = 2 / 3
+
+
+class KLLSketch:
+    """
+    KLL streaming quantile sketch (Karnin, Lang, Liberty 2016).
+
+    Values go into level 0. When a level fills up it is sorted and every other
+    value is promoted to the next level, where each value stands for twice as many
+    originals; lower levels get geometrically smaller capacities. Memory stays at
+    roughly 3k values however many are added, two sketches merge by concatenating
+    levels, and any quantile or rank can be read off at any time.
+
+    Which half of a level is promoted alternates instead of being random, so every
+    worker builds the same sketch from the same bids.
+    """
+
+    __slots__ = ("k", "count", "levels", "_flip")
+
+    def __init__(self, k: int = DEFAULT_K):
+        self.k = k
+        self.count = 0
+        self.levels: List[List[float]] = [[]]
+        self._flip = 0
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * _CAPACITY_DECAY ** depth)))
+
+    def add(self, value: float):
+        self.levels[0].append(float(value))
+        self.count += 1
+        if len(self.levels[0]) >= self._capacity(0):
+            self._compress()
+
+    def merge(self, other: "KLLSketch"):
+        """Fold another sketch into this one."""
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for level, values in enumerate(other.levels):
+            self.levels[level].extend(values)
+        self.count += other.count
+        self._compress()
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            values = self.levels[level]
+            if len(values) >= self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append([])
+                values.sort()
+                # An odd value out stays behind so total weight is preserved exactly
+                leftover = [values.pop()] if len(values) % 2 else []
+                self.levels[level + 1].extend(values[self._flip::2])
+                self._flip ^= 1
+                self.levels[level] = leftover
+            level += 1
+
+    def _weighted(self) -> List[Tuple[float, int]]:
+        weighted = [(value, 1 << level) for level, values in enumerate(self.levels) for value in values]
+        weighted.sort()
+        return weighted
+
+    def quantiles(self, fractions: Iterable[float]) -> List[Optional[float]]:
+        """Estimated values at each fraction in [0, 1] (None for an empty sketch)."""
+        weighted = self._weighted()
+        total = sum(weight for _, weight in weighted)
+        results = []
+        for fraction in fractions:
+            if not weighted:
+                results.append(None)
+                continue
+            target = fraction * total
+            cumulative = 0
+            for value, weight in weighted:
+                cumulative += weight
+                if cumulative >= target:
+                    results.append(value)
+                    break
+            else:
+                results.append(weighted[-1][0])
+        return results
+
+    def rank(self, value: float) -> Optional[float]:
+        """Estimated fraction of values below `value` (ties count half), or None if empty."""
+        below = equal = total = 0
+        for level, values in enumerate(self.levels):
+            weight = 1 << level
+            for item in values:
+                total += weight
+                if item < value:
+                    below += weight
+                elif item == value:
+                    equal += weight
+        if total == 0:
+            return None
+        return (below + equal / 2) / total
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"k": self.k, "count": self.count, "levels": self.levels, "flip": self._flip}
+
+    @classmethod
+    def from_dict(cls, stored: Dict[str, Any]) -> "KLLSketch":
+        sketch = cls(stored.get("k", DEFAULT_K))
+        sketch.count = stored.get("count", 0)
+        sketch.levels = [list(values) for values in stored.get("levels", [[]])] or [[]]
+        sketch._flip = stored.get("flip", 0)
+        return sketch
+
+
+def trade_key(name: Optional[str]) -> str:
+    """The trade a category belongs to, from its name: 'Structural  Steel' -> 'structural steel'."""
+    return " ".join((name or "").lower().split())
+
+
+def price_summary(stored: Optional[Dict[str, Any]], bids: List[Tuple[int, float]]) -> Optional[Dict[str, Any]]:
+    """
+    p10/p50/p90 of a trade's price index and the percentile rank of each (vendor id, amount) bid.
+    Returns None when the trade has no indexed bids yet.
+    """
+    if not stored or not stored.get("count"):
+        return None
+    sketch = KLLSketch.from_dict(stored)
+    p10, p50, p90 = sketch.quantiles((0.1, 0.5, 0.9))
+    return {
+        "sampleSize": sketch.count,
+        "p10": p10,
+        "p50": p50,
+        "p90": p90,
+        "bids": [
+            {"vendorId": vendor_id, "bidAmount": amount, "percentileRank": round(sketch.rank(amount) * 100, 1)}
+            for vendor_id, amount in bids
+        ],
+    }
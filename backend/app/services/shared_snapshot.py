@@ -0,0 +1,161 @@
+import logging
+import marshal
+import mmap
+import os
+import stat
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.core.metrics import REGISTRY
+
+try:
+    import fcntl
+except ImportError:  # Windows - concurrent publishers just race, which is harmless
+    fcntl = None
+
+logger = logging.getLogger("app.storage")
+
+# Bumped from CMSNAP1 (pickle), so files in the old format are never decoded
+SNAPSHOT_MAGIC = b"CMSNAP2\n"
+# marshal format version; 4 shares repeated strings such as the records' keys
+MARSHAL_VERSION = 4
+SNAPSHOT_SUFFIX = ".snap"
+
+SNAPSHOT_LOADS = REGISTRY.counter(
+    "shared_snapshot_loads_total",
+    "Data loads by source: attached to a published snapshot, or parsed from JSON and published.",
+    ["source"],
+)
+SNAPSHOT_SECONDS = REGISTRY.histogram(
+    "shared_snapshot_operation_seconds",
+    "Time spent attaching to or publishing shared data snapshots.",
+    ["operation"],
+)
+
+FileVersion = Tuple[int, int, int]
+
+
+class SharedSnapshot:
+    """
+    Publishes the parsed data file once per data version so that every worker
+    process can load it without parsing JSON again.
+
+    Each version is stored in marshal format in its own read-only file, named after
+    the data file's (mtime, size, inode). Workers memory-map the file, so its bytes
+    live once in the OS page cache no matter how many workers attach. Decoding
+    marshal is about three times faster than json.loads and the file is much smaller
+    than the indented JSON.
+
+    Python objects can't be shared between processes, so every worker still decodes
+    its own full copy of each version: what is shared is the JSON parse and the
+    file's bytes, not the decoded data.
+
+    The data is plain JSON types, which marshal stores as they are. Unlike pickle,
+    loading marshal data never runs code, so a file planted in the snapshot
+    directory can at worst fail to load; anything that isn't a dict is ignored.
+    """
+
+    def __init__(self, directory: str, keep_versions: int = 3):
+        self.directory = directory
+        self.keep_versions = max(1, keep_versions)
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def _key(version: FileVersion) -> str:
+        return "-".join(str(part) for part in version)
+
+    def _path(self, version: FileVersion) -> str:
+        return os.path.join(self.directory, self._key(version) + SNAPSHOT_SUFFIX)
+
+    def load(self, version: FileVersion) -> Optional[Dict[str, Any]]:
+        """Attach to the published snapshot for this version, or return None if there isn't one."""
+        path = self._path(version)
+        header = SNAPSHOT_MAGIC + self._key(version).encode("ascii") + b"\n"
+        start = time.perf_counter()
+        try:
+            with open(path, "rb") as file:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    if mapped[:len(header)] != header:
+                        return None
+                    with memoryview(mapped) as view:
+                        with view[len(header):] as payload:
+                            data = marshal.loads(payload)
+        except (FileNotFoundError, ValueError):
+            # ValueError: empty file, which mmap refuses, or bad marshal data
+            return None
+        except Exception:
+            logger.warning("shared snapshot unreadable, ignoring it", exc_info=True, extra={"snapshot": path})
+            return None
+
+        if not isinstance(data, dict):
+            logger.warning("shared snapshot holds no data, ignoring it", extra={"snapshot": path})
+            return None
+        SNAPSHOT_SECONDS.observe(time.perf_counter() - start, "attach")
+        SNAPSHOT_LOADS.inc("shared")
+        return data
+
+    def publish(self, version: FileVersion, data: Dict[str, Any]):
+        """Write the snapshot for this version atomically and drop old versions."""
+        start = time.perf_counter()
+        path = self._path(version)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        header = SNAPSHOT_MAGIC + self._key(version).encode("ascii") + b"\n"
+        try:
+            with open(temp_path, "wb") as file:
+                file.write(header)
+                marshal.dump(data, file, MARSHAL_VERSION)
+            # Published snapshots are never modified, only replaced or pruned
+            os.chmod(temp_path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+            os.replace(temp_path, path)
+        except Exception:
+            logger.warning("could not publish shared snapshot", exc_info=True, extra={"snapshot": path})
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return
+        SNAPSHOT_SECONDS.observe(time.perf_counter() - start, "publish")
+        self._prune()
+
+    def load_or_publish(self, version: FileVersion,
+                        loader: Callable[[], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """
+        Return the data for this version, parsing it with `loader` only if no worker has yet.
+        A lock file makes the other workers wait for the one doing the parse, then attach.
+        """
+        data = self.load(version)
+        if data is not None:
+            return data
+
+        with open(os.path.join(self.directory, "publish.lock"), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                data = self.load(version)
+                if data is not None:
+                    return data
+                data = loader()
+                if data is not None:
+                    SNAPSHOT_LOADS.inc("parsed")
+                    self.publish(version, data)
+                return data
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _prune(self):
+        snapshots = []
+        for name in os.listdir(self.directory):
+            if name.endswith(SNAPSHOT_SUFFIX):
+                path = os.path.join(self.directory, name)
+                try:
+                    snapshots.append((os.path.getmtime(path), path))
+                except FileNotFoundError:
+                    continue
+        snapshots.sort(reverse=True)
+        for _, path in snapshots[self.keep_versions:]:
+            try:
+                # Workers that still have it mapped keep reading the old pages
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,262 @@
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.metrics import REGISTRY
+
+try:
+    import fcntl
+except ImportError:  # Windows - only the in-process lock applies there
+    fcntl = None
+
+SNAPSHOTS_CREATED = REGISTRY.counter(
+    "snapshot_store_snapshots_total",
+    "Point-in-time snapshots of the data file created.",
+)
+SNAPSHOT_OBJECTS_WRITTEN = REGISTRY.counter(
+    "snapshot_store_objects_written_total",
+    "Content-addressed objects written by snapshots (unchanged records are not rewritten).",
+)
+
+
+class SnapshotNotFoundError(Exception):
+    pass
+
+
+def _canonical(value: Any) -> bytes:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _is_record_collection(value: Any) -> bool:
+    return isinstance(value, list) and all(isinstance(item, dict) and "id" in item for item in value)
+
+
+class SnapshotStore:
+    """
+    Incremental point-in-time snapshots of the data file.
+
+    Every record (one project, one vendor, ...) is stored once as a content-addressed
+    object named by the SHA-256 of its canonical JSON. A collection is an object
+    listing its records' (id, hash) pairs, and a snapshot is a small manifest naming
+    each collection's object. Taking a snapshot hashes the data and writes only the
+    objects that don't exist yet, so an unchanged collection costs nothing and a
+    changed one costs the records that changed. Top-level values that aren't lists of
+    records are stored as a single object.
+
+        objects/ab/cdef...        record, collection or value, as JSON
+        manifests/<id>.json       {"id", "createdAt", "label", "collections": {...}}
+
+    Any snapshot is restored by reading its manifest and the objects it names, and two
+    snapshots are compared by hash without reading the records that are the same.
+    Retention deletes old manifests and then every object no manifest reaches.
+    """
+
+    def __init__(self, directory: str = "data/snapshots", keep_last: int = 50, keep_daily: int = 14):
+        self.directory = directory
+        # Retention policy applied after every snapshot (see prune)
+        self.keep_last = keep_last
+        self.keep_daily = keep_daily
+        self._objects_dir = os.path.join(directory, "objects")
+        self._manifests_dir = os.path.join(directory, "manifests")
+        os.makedirs(self._objects_dir, exist_ok=True)
+        os.makedirs(self._manifests_dir, exist_ok=True)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _exclusive(self):
+        """Keep snapshots and pruning from interleaving, across threads and worker processes."""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(os.path.join(self.directory, ".lock"), "a") as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    # Objects
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self._objects_dir, digest[:2], digest[2:])
+
+    def _put(self, value: Any, written: List[int]) -> str:
+        """Store a value under the hash of its content, unless it is already stored."""
+        content = _canonical(value)
+        digest = hashlib.sha256(content).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, "wb") as file:
+                file.write(content)
+            os.replace(temp_path, path)
+            written[0] += 1
+            written[1] += len(content)
+        return digest
+
+    def _get(self, digest: str) -> Any:
+        with open(self._object_path(digest), "rb") as file:
+            return json.loads(file.read())
+
+    # Snapshots
+
+    def create(self, data: Dict[str, Any], label: str = "") -> Dict[str, Any]:
+        """
+        Capture a point-in-time version of the data and apply the retention policy.
+        Returns the snapshot's manifest.
+        """
+        with self._exclusive():
+            written = [0, 0]
+            collections: Dict[str, Dict[str, str]] = {}
+            record_count = 0
+            for name, value in data.items():
+                if _is_record_collection(value):
+                    index = [[record["id"], self._put(record, written)] for record in value]
+                    collections[name] = {"records": self._put(index, written)}
+                    record_count += len(index)
+                else:
+                    collections[name] = {"value": self._put(value, written)}
+
+            created = datetime.now(timezone.utc)
+            snapshot_id = created.strftime("%Y%m%dT%H%M%S%fZ")
+            suffix = 1
+            while os.path.exists(self._manifest_path(snapshot_id)):
+                snapshot_id = f"{created.strftime('%Y%m%dT%H%M%S%fZ')}-{suffix}"
+                suffix += 1
+
+            manifest = {
+                "id": snapshot_id,
+                "createdAt": created.isoformat(timespec="milliseconds"),
+                "label": label,
+                "records": record_count,
+                "objectsWritten": written[0],
+                "bytesWritten": written[1],
+                "collections": collections,
+            }
+            temp_path = self._manifest_path(snapshot_id) + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump(manifest, file, indent=2)
+            os.replace(temp_path, self._manifest_path(snapshot_id))
+
+        SNAPSHOTS_CREATED.inc()
+        SNAPSHOT_OBJECTS_WRITTEN.inc(amount=written[0])
+        self.prune()
+        return manifest
+
+    def _manifest_path(self, snapshot_id: str) -> str:
+        return os.path.join(self._manifests_dir, f"{snapshot_id}.json")
+
+    def manifest(self, snapshot_id: str) -> Dict[str, Any]:
+        if os.path.basename(snapshot_id) != snapshot_id:
+            raise SnapshotNotFoundError(snapshot_id)
+        try:
+            with open(self._manifest_path(snapshot_id), encoding="utf-8") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            raise SnapshotNotFoundError(snapshot_id) from None
+
+    def list_snapshots(self) -> List[Dict[str, Any]]:
+        """Every snapshot's manifest summary, newest first."""
+        summaries = []
+        snapshot_ids = [filename[:-len(".json")] for filename in os.listdir(self._manifests_dir)
+                        if filename.endswith(".json")]
+        for snapshot_id in sorted(snapshot_ids, reverse=True):
+            try:
+                manifest = self.manifest(snapshot_id)
+            except (SnapshotNotFoundError, json.JSONDecodeError):
+                continue
+            summaries.append({key: value for key, value in manifest.items() if key != "collections"})
+        return summaries
+
+    def load(self, snapshot_id: str) -> Dict[str, Any]:
+        """Rebuild the complete data of a snapshot."""
+        manifest = self.manifest(snapshot_id)
+        data: Dict[str, Any] = {}
+        for name, entry in manifest["collections"].items():
+            if "records" in entry:
+                data[name] = [self._get(digest) for _, digest in self._get(entry["records"])]
+            else:
+                data[name] = self._get(entry["value"])
+        return data
+
+    def diff(self, from_id: str, to_id: str) -> Dict[str, Any]:
+        """
+        What changed between two snapshots, per collection: ids of records added,
+        removed and changed, or whether a plain value changed. Only the collection
+        indexes are read; records are compared by hash.
+        """
+        old = self.manifest(from_id)["collections"]
+        new = self.manifest(to_id)["collections"]
+        changes: Dict[str, Any] = {}
+        for name in sorted(set(old) | set(new)):
+            old_entry, new_entry = old.get(name, {}), new.get(name, {})
+            if old_entry == new_entry:
+                continue
+            if "records" in old_entry or "records" in new_entry:
+                old_records = dict(map(tuple, self._get(old_entry["records"]))) if "records" in old_entry else {}
+                new_records = dict(map(tuple, self._get(new_entry["records"]))) if "records" in new_entry else {}
+                changes[name] = {
+                    "added": [key for key in new_records if key not in old_records],
+                    "removed": [key for key in old_records if key not in new_records],
+                    "changed": [key for key, digest in new_records.items()
+                                if key in old_records and old_records[key] != digest],
+                }
+            else:
+                changes[name] = {"changed": True}
+        return {"from": from_id, "to": to_id, "collections": changes}
+
+    # Retention
+
+    def prune(self, keep_last: Optional[int] = None, keep_daily: Optional[int] = None,
+              now: Optional[datetime] = None) -> Tuple[int, int]:
+        """
+        Delete snapshots outside the retention policy: the newest `keep_last` are kept,
+        plus the newest snapshot of each of the last `keep_daily` days (both default to
+        the store's policy). Objects no remaining snapshot refers to are deleted too.
+        Returns (snapshots deleted, objects deleted).
+        """
+        keep_last = self.keep_last if keep_last is None else keep_last
+        keep_daily = self.keep_daily if keep_daily is None else keep_daily
+        now = now or datetime.now(timezone.utc)
+        with self._exclusive():
+            manifests = self.list_snapshots()
+            keep: Set[str] = {manifest["id"] for manifest in manifests[:max(0, keep_last)]}
+            oldest_day = (now - timedelta(days=keep_daily - 1)).date() if keep_daily > 0 else None
+            days_seen: Set[Any] = set()
+            for manifest in manifests:
+                day = datetime.fromisoformat(manifest["createdAt"]).date()
+                if oldest_day is not None and day >= oldest_day and day not in days_seen:
+                    days_seen.add(day)
+                    keep.add(manifest["id"])
+
+            expired = [manifest["id"] for manifest in manifests if manifest["id"] not in keep]
+            if not expired:
+                return 0, 0
+            for snapshot_id in expired:
+                os.remove(self._manifest_path(snapshot_id))
+            return len(expired), self._collect_garbage(keep)
+
+    def _collect_garbage(self, snapshot_ids: Iterable[str]) -> int:
+        reachable: Set[str] = set()
+        for snapshot_id in snapshot_ids:
+            for entry in self.manifest(snapshot_id)["collections"].values():
+                if "records" in entry:
+                    reachable.add(entry["records"])
+                    reachable.update(digest for _, digest in self._get(entry["records"]))
+                else:
+                    reachable.add(entry["value"])
+
+        deleted = 0
+        for prefix in os.listdir(self._objects_dir):
+            prefix_dir = os.path.join(self._objects_dir, prefix)
+            for name in os.listdir(prefix_dir):
+                if prefix + name not in reachable:
+                    os.remove(os.path.join(prefix_dir, name))
+                    deleted += 1
+        return deleted
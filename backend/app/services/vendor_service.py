@@ -0,0 +1,298 @@
+import random
+import re
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# MinHash signature length and its split into LSH bands. Two names land in the same
+# bucket of at least one band with probability 1 - (1 - s^ROWS)^BANDS for name
+# similarity s: ~0.001 at s=0.3, ~0.17 at s=0.5, ~0.97 at s=0.8. A name alone has to be
+# about 0.9 similar to reach DEFAULT_THRESHOLD, and weaker name matches are found
+# through the blocking keys, so the bands favour few false candidates
+NUM_PERMUTATIONS = 72
+LSH_BANDS = 12
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+
+SHINGLE_SIZE = 3
+
+# Blocks bigger than this (a shared office park zip, a very common name) say too little
+# about any one pair; they are skipped rather than compared against every member
+MAX_BLOCK_SIZE = 200
+
+# Vendors an extended index keeps on top of its base before the two are merged
+MAX_OVERLAY_SIZE = 1024
+
+# Candidates scoring below this are not reported
+DEFAULT_THRESHOLD = 0.5
+
+# How much each signal contributes to a candidate's score
+_WEIGHTS = {"name": 0.55, "phone": 0.3, "emailDomain": 0.1, "zip": 0.05}
+
+# Legal forms that don't tell two companies apart: "Steel Corp Inc." and "SteelCorp" are one vendor
+_LEGAL_FORMS = {"inc", "incorporated", "llc", "ltd", "limited", "co", "company", "plc", "lp", "llp", "the"}
+_ABBREVIATIONS = {"corporation": "corp", "and": "", "brothers": "bros"}
+
+# Shared mail providers say nothing about which company an address belongs to
+_FREE_MAIL_DOMAINS = {
+    "gmail.com", "googlemail.com", "yahoo.com", "hotmail.com", "outlook.com", "live.com",
+    "aol.com", "icloud.com", "me.com", "msn.com", "protonmail.com", "comcast.net",
+}
+
+# One random mask per signature slot. Shingle hashes are uniformly random, so XOR-ing
+# them with a mask gives an independent-enough ordering per slot, at the cost of one
+# C-level min() instead of a modular hash per shingle and slot. 30 bits keep the values
+# single-digit ints, which is several times faster, and are plenty for trigram shingles
+_HASH_MASK = (1 << 30) - 1
+_MASKS = [random.Random(slot).getrandbits(30) for slot in range(NUM_PERMUTATIONS)]
+
+
+class DuplicateVendorError(Exception):
+    """A vendor being added looks like one already in the catalog."""
+
+    def __init__(self, candidates: List[Dict[str, Any]]):
+        super().__init__(f"{len(candidates)} possible duplicate vendor(s)")
+        self.candidates = candidates
+
+
+def normalize_company_name(name: str) -> str:
+    """Lowercase words of the name, without punctuation or legal forms."""
+    words = re.sub(r"[^a-z0-9]+", " ", (name or "").lower().replace("&", " and ")).split()
+    words = [_ABBREVIATIONS.get(word, word) for word in words]
+    return " ".join(word for word in words if word and word not in _LEGAL_FORMS)
+
+
+def name_shingles(normalized_name: str) -> Set[str]:
+    """Character shingles of the name with spaces removed, so "Steel Corp" and "SteelCorp" match."""
+    compact = normalized_name.replace(" ", "")
+    if len(compact) <= SHINGLE_SIZE:
+        return {compact} if compact else set()
+    return {compact[i:i + SHINGLE_SIZE] for i in range(len(compact) - SHINGLE_SIZE + 1)}
+
+
+def minhash_signature(shingles: Iterable[str]) -> Tuple[int, ...]:
+    """
+    MinHash signature of a set of shingles. Built on Python's string hash, which is
+    randomized per process: signatures are only comparable within one process and
+    are never stored.
+    """
+    hashes = [hash(shingle) & _HASH_MASK for shingle in shingles]
+    if not hashes:
+        return ()
+    return tuple(min(map(mask.__xor__, hashes)) for mask in _MASKS)
+
+
+def normalize_phone(phone: Any) -> Optional[str]:
+    """The last ten digits, which drops country codes and formatting."""
+    digits = re.sub(r"\D", "", str(phone or ""))
+    return digits[-10:] if len(digits) >= 7 else None
+
+
+def email_domain(email: Any) -> Optional[str]:
+    """The domain of a company email address; None for free-mail providers."""
+    _, _, domain = str(email or "").strip().lower().rpartition("@")
+    domain = domain.strip(".")
+    if not domain or "." not in domain or domain in _FREE_MAIL_DOMAINS:
+        return None
+    return domain
+
+
+def normalize_zip(zip_code: Any) -> Optional[str]:
+    """The five-digit US zip code, or the whole code uppercased without spaces elsewhere."""
+    value = re.sub(r"\s+", "", str(zip_code or "")).upper()
+    match = re.match(r"^(\d{5})(-?\d{4})?$", value)
+    if match:
+        return match.group(1)
+    return value or None
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class _VendorKeys:
+    __slots__ = ("shingles", "signature", "phone", "email_domain", "zip", "blocking_keys", "bands")
+
+    def __init__(self, vendor: Dict[str, Any]):
+        contact = vendor.get("contactInfo") or {}
+        address = vendor.get("address") or {}
+        name = normalize_company_name(vendor.get("companyName", ""))
+        self.shingles = name_shingles(name)
+        self.signature = minhash_signature(self.shingles)
+        self.phone = normalize_phone(contact.get("phone"))
+        self.email_domain = email_domain(contact.get("email"))
+        self.zip = normalize_zip(address.get("zipCode"))
+
+        self.blocking_keys = []
+        if self.phone:
+            self.blocking_keys.append(("phone", self.phone))
+        if self.email_domain:
+            self.blocking_keys.append(("emailDomain", self.email_domain))
+        if self.zip:
+            self.blocking_keys.append(("zip", self.zip))
+        self.bands = [(band, self.signature[band * LSH_ROWS:(band + 1) * LSH_ROWS])
+                      for band in range(LSH_BANDS)] if self.signature else []
+
+
+class VendorDuplicateIndex:
+    """
+    Finds likely duplicates of a vendor without comparing it to the whole catalog.
+
+    Candidates come from two kinds of buckets: blocking keys (the same normalized
+    phone number, company email domain or zip code) and MinHash-LSH bands over the
+    normalized company name, which put names with similar character shingles in a
+    shared bucket with high probability. Only vendors sharing a bucket are scored,
+    so a lookup costs the size of its buckets rather than the size of the catalog.
+
+    A candidate's score weighs the names' shingle similarity with phone, email
+    domain and zip matches; the signals that matched are reported as reasons.
+
+    The index only grows: vendors are added, never updated or removed. Callers
+    rebuild it when the catalog changes in any other way (see DataService).
+
+    An index that may be in use elsewhere is never changed: `extended` returns a new
+    index with the extra vendors, so a search always sees one consistent catalog.
+    To keep that cheap, an extended index is a small overlay of the added vendors
+    over a frozen base index; once the overlay reaches MAX_OVERLAY_SIZE vendors the
+    two are folded into a new base.
+    """
+
+    def __init__(self, vendors: Iterable[Dict[str, Any]] = (), base: Optional["VendorDuplicateIndex"] = None):
+        # Frozen index of the older vendors, or None when this index holds them all itself
+        self._base = base
+        self._keys: Dict[Any, _VendorKeys] = {}
+        self._buckets: Dict[Tuple[Any, ...], List[Any]] = defaultdict(list)
+        for vendor in vendors:
+            self.add(vendor)
+
+    def __len__(self) -> int:
+        return len(self._keys) + (len(self._base) if self._base is not None else 0)
+
+    def add(self, vendor: Dict[str, Any]):
+        """Add a vendor - only while building an index, before anyone else can search it."""
+        keys = _VendorKeys(vendor)
+        self._keys[vendor["id"]] = keys
+        for bucket in (*keys.blocking_keys, *keys.bands):
+            self._buckets[bucket].append(vendor["id"])
+
+    def extended(self, vendors: Iterable[Dict[str, Any]]) -> "VendorDuplicateIndex":
+        """A new index with these vendors added, leaving this one unchanged."""
+        vendors = list(vendors)
+        if self._base is None:
+            return VendorDuplicateIndex(vendors, base=self)
+        if len(self._keys) + len(vendors) > MAX_OVERLAY_SIZE:
+            return VendorDuplicateIndex(vendors, base=self._flattened())
+        # Copy the overlay (small) and add to the copy; the base is shared
+        index = VendorDuplicateIndex(base=self._base)
+        index._keys = dict(self._keys)
+        index._buckets = defaultdict(list, {bucket: list(members) for bucket, members in self._buckets.items()})
+        for vendor in vendors:
+            index.add(vendor)
+        return index
+
+    def _flattened(self) -> "VendorDuplicateIndex":
+        """The base and overlay as one index. Bucket lists the overlay didn't touch stay shared with the base."""
+        base = self._base
+        index = VendorDuplicateIndex()
+        index._keys = {**base._keys, **self._keys}
+        index._buckets = defaultdict(list, base._buckets)
+        for bucket, members in self._buckets.items():
+            index._buckets[bucket] = base._buckets.get(bucket, []) + members
+        return index
+
+    def _members(self, bucket: Tuple[Any, ...]) -> List[Any]:
+        members = self._buckets.get(bucket, [])
+        if self._base is None:
+            return members
+        base_members = self._base._buckets.get(bucket, [])
+        return base_members + members if members and base_members else members or base_members
+
+    def _vendor_keys(self, vendor_id: Any) -> _VendorKeys:
+        keys = self._keys.get(vendor_id)
+        return keys if keys is not None else self._base._keys[vendor_id]
+
+    def _all_keys(self) -> Iterable[Tuple[Any, _VendorKeys]]:
+        if self._base is not None:
+            yield from self._base._keys.items()
+        yield from self._keys.items()
+
+    def _candidate_ids(self, keys: _VendorKeys) -> Set[Any]:
+        candidates: Set[Any] = set()
+        for block in keys.blocking_keys:
+            members = self._members(block)
+            if len(members) <= MAX_BLOCK_SIZE:
+                candidates.update(members)
+        for band in keys.bands:
+            candidates.update(self._members(band))
+        return candidates
+
+    @staticmethod
+    def _score(keys: _VendorKeys, other: _VendorKeys) -> Tuple[float, Dict[str, Any]]:
+        name_similarity = jaccard(keys.shingles, other.shingles)
+        reasons: Dict[str, Any] = {"nameSimilarity": round(name_similarity, 3)}
+        score = _WEIGHTS["name"] * name_similarity
+        for signal, mine, theirs in (("phone", keys.phone, other.phone),
+                                     ("emailDomain", keys.email_domain, other.email_domain),
+                                     ("zip", keys.zip, other.zip)):
+            if mine and mine == theirs:
+                score += _WEIGHTS[signal]
+                reasons[signal] = mine
+        return score, reasons
+
+    def find(self, vendor: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD,
+             limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Vendors in the index that are likely duplicates of `vendor` (which needn't be
+        in the index), best first: [{"vendorId", "score", "reasons"}].
+        """
+        keys = _VendorKeys(vendor)
+        return self._matches(vendor.get("id"), keys, threshold)[:limit]
+
+    def _matches(self, vendor_id: Any, keys: _VendorKeys, threshold: float,
+                 after: Any = None) -> List[Dict[str, Any]]:
+        matches = []
+        for candidate_id in self._candidate_ids(keys):
+            if candidate_id == vendor_id or (after is not None and str(candidate_id) <= str(after)):
+                continue
+            score, reasons = self._score(keys, self._vendor_keys(candidate_id))
+            if score >= threshold:
+                matches.append({"vendorId": candidate_id, "score": round(score, 3), "reasons": reasons})
+        matches.sort(key=lambda match: (-match["score"], str(match["vendorId"])))
+        return matches
+
+    def report(self, threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+        """
+        Every group of likely duplicates in the index: vendors linked by a chain of
+        matching pairs, with those pairs. Groups are ordered by their best pair.
+        """
+        parent: Dict[Any, Any] = {}
+
+        def find_root(vendor_id):
+            while parent.get(vendor_id, vendor_id) != vendor_id:
+                parent[vendor_id] = parent.get(parent[vendor_id], parent[vendor_id])
+                vendor_id = parent[vendor_id]
+            return vendor_id
+
+        pairs = []
+        for vendor_id, keys in self._all_keys():
+            # Each pair would be found from both sides; score it from the lower id only
+            for match in self._matches(vendor_id, keys, threshold, after=vendor_id):
+                other_id = match["vendorId"]
+                pairs.append({"vendorIds": [vendor_id, other_id], "score": match["score"],
+                              "reasons": match["reasons"]})
+                root, other_root = find_root(vendor_id), find_root(other_id)
+                if root != other_root:
+                    parent[other_root] = root
+
+        groups: Dict[Any, Dict[str, Any]] = {}
+        for pair in pairs:
+            group = groups.setdefault(find_root(pair["vendorIds"][0]), {"vendorIds": set(), "pairs": []})
+            group["vendorIds"].update(pair["vendorIds"])
+            group["pairs"].append(pair)
+
+        report = []
+        for group in groups.values():
+            group["pairs"].sort(key=lambda pair: -pair["score"])
+            report.append({"vendorIds": sorted(group["vendorIds"], key=str), "pairs": group["pairs"]})
+        report.sort(key=lambda group: -group["pairs"][0]["score"])
+        return report
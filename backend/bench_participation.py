@@ -0,0 +1,154 @@
+# Participation Table Benchmark
+# File: backend/bench_participation.py
+#
+# Builds synthetic bid data, then measures what the ParticipationTable costs in
+# memory and build time, and how the scans that use it compare with the plain
+# loops over vendorParticipation dicts they replaced.
+#
+#   python bench_participation.py                         # 20,000 categories x 50 bids
+#   python bench_participation.py --categories 2000 --bids 20
+#
+# The table is kept next to the parsed dicts, not instead of them: the memory it
+# reports is added on top of the snapshot, once per data version.
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BACKEND_DIR)
+
+from app.services.data_service import _PRICED_CODES, _SUBMITTED_CODE, PRICED_BID_STATUSES  # noqa: E402
+from app.services.participation import ParticipationTable  # noqa: E402
+
+STATUSES = ["invited", "pending", "submitted", "submitted", "selected", "not_selected", "declined"]
+
+
+def synthetic_data(projects: int, categories: int, bids: int, seed: int) -> str:
+    """The categories of a data file, as JSON text."""
+    rng = random.Random(seed)
+    return json.dumps({"categories": [{
+        "id": 300 + index,
+        "projectId": 1 + index % projects,
+        "name": "Steel",
+        "totalItems": 10,
+        "quotedItems": 5,
+        "vendorParticipation": [{
+            "vendorId": 101 + rng.randrange(2000),
+            "bidAmount": rng.randrange(1000, 500000),
+            "bidStatus": rng.choice(STATUSES),
+            "bidDate": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "notes": "",
+        } for _ in range(bids)],
+    } for index in range(categories)]})
+
+
+def traced(fn: Callable[[], Any]) -> Tuple[Any, int, int]:
+    """fn's result, the bytes it left allocated and its peak allocation."""
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak
+
+
+def timed(fn: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the columnar participation table")
+    parser.add_argument("--projects", type=int, default=2000)
+    parser.add_argument("--categories", type=int, default=20000)
+    parser.add_argument("--bids", type=int, default=50, help="bids per category")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    text = synthetic_data(args.projects, args.categories, args.bids, args.seed)
+    categories, dict_bytes, _ = traced(lambda: json.loads(text)["categories"])
+    del text
+    total = sum(len(category["vendorParticipation"]) for category in categories)
+    print(f"bids: {total:,}")
+    print(f"parsed categories with their participation dicts: {dict_bytes / 1e6:.0f} MB")
+
+    table, table_bytes, _ = traced(lambda: ParticipationTable(categories))
+    print(f"participation table, kept in addition to the dicts: +{table_bytes / 1e6:.1f} MB "
+          f"({table_bytes / total:.1f} B/bid) per data version")
+    del table
+    gc.collect()
+    start = time.perf_counter()
+    table = ParticipationTable(categories)
+    print(f"table build: {(time.perf_counter() - start) * 1000:.0f} ms")
+    changed = list(categories)
+    changed[len(changed) // 2] = json.loads(json.dumps(changed[len(changed) // 2]))
+    print(f"next snapshot, one category changed: "
+          f"{timed(lambda: ParticipationTable(changed, previous=table)) * 1000:.0f} ms")
+
+    project_ids = range(1, args.projects + 1)
+    by_project: Dict[int, List[Dict[str, Any]]] = {}
+    for category in categories:
+        by_project.setdefault(category["projectId"], []).append(category)
+
+    # The loops over dicts the table replaced
+    def dict_metrics():
+        result = []
+        for project_id in project_ids:
+            vendor_ids, submitted = set(), 0
+            for category in by_project.get(project_id, []):
+                for participation in category["vendorParticipation"]:
+                    vendor_ids.add(participation["vendorId"])
+                    submitted += participation["bidStatus"] == "submitted"
+            result.append((len(vendor_ids), submitted))
+        return result
+
+    def dict_activity(limit=10):
+        activity = [(participation.get("bidDate") or "", category["id"], participation["vendorId"])
+                    for category in categories for participation in category["vendorParticipation"]]
+        activity.sort(key=lambda item: item[0], reverse=True)
+        return [(vendor_id, day) for day, _, vendor_id in activity[:limit]]
+
+    def dict_priced():
+        return {category["id"]: {p["vendorId"]: p["bidAmount"] for p in category["vendorParticipation"]
+                                 if p.get("bidStatus") in PRICED_BID_STATUSES and (p.get("bidAmount") or 0) > 0}
+                for category in categories}
+
+    def table_metrics_cold():
+        table._project_metrics.clear()
+        return table_metrics()
+
+    def table_metrics():
+        return [table.project_vendor_activity(project_id, _SUBMITTED_CODE) for project_id in project_ids]
+
+    def table_activity(limit=10):
+        return [(table.row(position, row)["vendorId"], table.row(position, row)["bidDate"])
+                for position, row in table.latest(range(len(categories)), limit)]
+
+    def table_priced():
+        return {categories[position]["id"]: table.priced_bids(position, _PRICED_CODES)
+                for position in range(len(categories))}
+
+    assert dict_metrics() == table_metrics_cold()
+    assert dict_priced() == table_priced()
+    assert sorted(dict_activity()) == sorted(table_activity())
+
+    for name, loop, scan in (("project metrics, all projects (first use)", dict_metrics, table_metrics_cold),
+                             ("project metrics, all projects (again)", dict_metrics, table_metrics),
+                             ("recent bid activity (top 10)", dict_activity, table_activity),
+                             ("priced bids per category", dict_priced, table_priced)):
+        peaks = [traced(fn)[2] for fn in (loop, scan)]
+        elapsed = [timed(fn) for fn in (loop, scan)]
+        print(f"{name}: {elapsed[0] * 1000:.0f} ms -> {elapsed[1] * 1000:.0f} ms; "
+              f"peak allocation {peaks[0] / 1e6:.1f} MB -> {peaks[1] / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,515 @@
+# Concurrent Load Test Harness
+# File: backend/load_test.py
+#
+# Drives the FastAPI app with a configurable mix of dashboard reads, quote
+# comparisons and writes, then reports throughput and latency per route.
+#
+#   python load_test.py                                  # in-process, scratch data copy
+#   python load_test.py --users 50 --duration 30
+#   python load_test.py --mix dashboard=60,quotes=35,write=5 --json results.json
+#   python load_test.py --url http://127.0.0.1:8000      # against a running uvicorn
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_MIX = "dashboard=70,quotes=25,write=5"
+
+# A request function takes (method, path, json_body) and returns (status, body bytes)
+RequestFn = Callable[[str, str, Optional[Any]], Awaitable[Tuple[int, bytes]]]
+
+
+class InProcessClient:
+    """
+    Calls the ASGI app directly, without a network socket in between.
+    This measures the application itself: routing, handlers and DataService work.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._lifespan_task = None
+        self._lifespan_queue = None
+
+    async def startup(self):
+        """Run the app's lifespan startup so startup hooks behave like under uvicorn."""
+        self._lifespan_queue = asyncio.Queue()
+        started = asyncio.get_running_loop().create_future()
+
+        async def receive():
+            return await self._lifespan_queue.get()
+
+        async def send(message):
+            if message["type"].startswith("lifespan.startup") and not started.done():
+                started.set_result(message)
+
+        scope = {"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}}
+        self._lifespan_task = asyncio.create_task(self.app(scope, receive, send))
+        await self._lifespan_queue.put({"type": "lifespan.startup"})
+        message = await started
+        if message["type"] == "lifespan.startup.failed":
+            raise RuntimeError(f"App startup failed: {message.get('message', '')}")
+
+    async def shutdown(self):
+        if self._lifespan_task is None:
+            return
+        await self._lifespan_queue.put({"type": "lifespan.shutdown"})
+        try:
+            await asyncio.wait_for(self._lifespan_task, timeout=5)
+        except (asyncio.TimeoutError, Exception):
+            self._lifespan_task.cancel()
+
+    async def request(self, method: str, path: str, body: Optional[Any] = None) -> Tuple[int, bytes]:
+        raw_body = json.dumps(body).encode("utf-8") if body is not None else b""
+        path_only, _, query = path.partition("?")
+        headers = [(b"host", b"loadtest"), (b"content-length", str(len(raw_body)).encode())]
+        if body is not None:
+            headers.append((b"content-type", b"application/json"))
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path_only,
+            "raw_path": path_only.encode("utf-8"),
+            "query_string": query.encode("utf-8"),
+            "root_path": "",
+            "headers": headers,
+            "client": ("127.0.0.1", 50000),
+            "server": ("loadtest", 80),
+            "state": {},
+        }
+
+        body_sent = False
+
+        async def receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": raw_body, "more_body": False}
+            # Nothing else to send - wait until the app finishes
+            await asyncio.Event().wait()
+
+        status = 500
+        chunks: List[bytes] = []
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, send)
+        return status, b"".join(chunks)
+
+
+class HttpConnection:
+    """
+    A minimal keep-alive HTTP/1.1 connection built on asyncio streams.
+    Each virtual user owns one, the same way a browser tab reuses its socket.
+    """
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def _connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except Exception:
+                pass
+            self.writer = None
+
+    async def request(self, method: str, path: str, body: Optional[Any] = None) -> Tuple[int, bytes]:
+        try:
+            return await self._request_once(method, path, body)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            # The server may close idle keep-alive sockets - reconnect once
+            await self.close()
+            return await self._request_once(method, path, body)
+
+    async def _request_once(self, method: str, path: str, body: Optional[Any]) -> Tuple[int, bytes]:
+        if self.writer is None:
+            await self._connect()
+
+        raw_body = json.dumps(body).encode("utf-8") if body is not None else b""
+        head = [
+            f"{method} {path} HTTP/1.1",
+            f"Host: {self.host}:{self.port}",
+            f"Content-Length: {len(raw_body)}",
+            "Connection: keep-alive",
+        ]
+        if body is not None:
+            head.append("Content-Type: application/json")
+        self.writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + raw_body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readuntil(b"\r\n")
+        status = int(status_line.split()[1])
+
+        headers = {}
+        while True:
+            line = await self.reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await self.reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                if size == 0:
+                    await self.reader.readuntil(b"\r\n")
+                    break
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readexactly(2)
+            payload = b"".join(chunks)
+        else:
+            payload = await self.reader.readexactly(int(headers.get("content-length", 0)))
+
+        if headers.get("connection", "").lower() == "close":
+            await self.close()
+        return status, payload
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """Parse 'dashboard=70,quotes=25,write=5' into scenario weights."""
+    weights = {}
+    for part in mix.split(","):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario '{name}'. Choose from: {', '.join(SCENARIOS)}")
+        weights[name] = float(weight or 1)
+    if not weights or sum(weights.values()) <= 0:
+        raise ValueError("The scenario mix needs at least one positive weight")
+    return weights
+
+
+class LoadStats:
+    """Collects latency samples and error counts, keyed by route template."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.status_codes: Dict[str, Dict[int, int]] = {}
+
+    def record(self, route: str, latency: float, status: int):
+        self.samples.setdefault(route, []).append(latency)
+        codes = self.status_codes.setdefault(route, {})
+        codes[status] = codes.get(status, 0) + 1
+        if status >= 400:
+            self.errors[route] = self.errors.get(route, 0) + 1
+
+    @staticmethod
+    def _percentile(sorted_values: List[float], percent: float) -> float:
+        # Nearest-rank percentile, which is what most load tools report
+        if not sorted_values:
+            return 0.0
+        rank = max(1, int(round(percent / 100 * len(sorted_values) + 0.5)))
+        return sorted_values[min(rank, len(sorted_values)) - 1]
+
+    def _summarize(self, values: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+        ordered = sorted(values)
+        count = len(ordered)
+        return {
+            "requests": count,
+            "errors": errors,
+            "errorRate": round(errors / count, 4) if count else 0.0,
+            "throughput": round(count / elapsed, 2) if elapsed > 0 else 0.0,
+            "latencyMs": {
+                "mean": round(sum(ordered) / count * 1000, 3) if count else 0.0,
+                "p50": round(self._percentile(ordered, 50) * 1000, 3),
+                "p95": round(self._percentile(ordered, 95) * 1000, 3),
+                "p99": round(self._percentile(ordered, 99) * 1000, 3),
+                "max": round(ordered[-1] * 1000, 3) if count else 0.0,
+            },
+        }
+
+    def report(self, elapsed: float, settings: Dict[str, Any]) -> Dict[str, Any]:
+        routes = {}
+        for route in sorted(self.samples):
+            summary = self._summarize(self.samples[route], self.errors.get(route, 0), elapsed)
+            summary["statusCodes"] = {str(code): n for code, n in sorted(self.status_codes[route].items())}
+            routes[route] = summary
+
+        all_values = [latency for values in self.samples.values() for latency in values]
+        return {
+            "settings": settings,
+            "elapsedSeconds": round(elapsed, 3),
+            "total": self._summarize(all_values, sum(self.errors.values()), elapsed),
+            "routes": routes,
+        }
+
+
+def format_table(report: Dict[str, Any]) -> str:
+    """Render the report as a fixed-width table for the terminal."""
+    columns = ["route", "reqs", "err%", "req/s", "p50 ms", "p95 ms", "p99 ms", "max ms"]
+    rows = []
+    for route, summary in list(report["routes"].items()) + [("TOTAL", report["total"])]:
+        latency = summary["latencyMs"]
+        rows.append([
+            route,
+            str(summary["requests"]),
+            f"{summary['errorRate'] * 100:.1f}",
+            f"{summary['throughput']:.1f}",
+            f"{latency['p50']:.2f}",
+            f"{latency['p95']:.2f}",
+            f"{latency['p99']:.2f}",
+            f"{latency['max']:.2f}",
+        ])
+
+    widths = [max(len(columns[i]), *(len(row[i]) for row in rows)) for i in range(len(columns))]
+    lines = [
+        "  ".join(col.ljust(widths[0]) if i == 0 else col.rjust(widths[i]) for i, col in enumerate(columns)),
+        "  ".join("-" * width for width in widths),
+    ]
+    for row in rows:
+        lines.append("  ".join(cell.ljust(widths[0]) if i == 0 else cell.rjust(widths[i]) for i, cell in enumerate(row)))
+    return "\n".join(lines)
+
+
+# Scenarios - each one is a short sequence of requests a real user would make.
+# They receive the request function, the discovered ids and a stats recorder.
+
+async def scenario_dashboard(request: RequestFn, ids: Dict[str, List[int]], timed):
+    """Opening the dashboard: groups, then the project list."""
+    await timed("GET /api/groups", request("GET", "/api/groups"))
+    await timed("GET /api/projects", request("GET", "/api/projects"))
+
+
+async def scenario_quotes(request: RequestFn, ids: Dict[str, List[int]], timed):
+    """Opening a project and comparing the quotes for one of its categories."""
+    if ids["projects"]:
+        project_id = random.choice(ids["projects"])
+        await timed("GET /api/projects/{project_id}", request("GET", f"/api/projects/{project_id}"))
+    if ids["categories"]:
+        category_id = random.choice(ids["categories"])
+        await timed(
+            "GET /api/categories/{category_id}/quotes",
+            request("GET", f"/api/categories/{category_id}/quotes"),
+        )
+
+
+async def scenario_write(request: RequestFn, ids: Dict[str, List[int]], timed):
+    """Creating a project, which rewrites the data file."""
+    project = {
+        "name": f"Load Test Project {random.randint(1, 10**9)}",
+        "client": "Load Test Client",
+        "estimatedValue": random.randint(100000, 5000000),
+        "status": "early",
+    }
+    await timed("POST /api/projects", request("POST", "/api/projects", project))
+
+
+SCENARIOS = {
+    "dashboard": scenario_dashboard,
+    "quotes": scenario_quotes,
+    "write": scenario_write,
+}
+
+
+async def discover_ids(request: RequestFn) -> Dict[str, List[int]]:
+    """Look up existing project and category ids so read scenarios hit real records."""
+    ids = {"projects": [], "categories": []}
+    status, payload = await request("GET", "/api/projects", None)
+    if status != 200:
+        raise RuntimeError(f"GET /api/projects returned {status}; is the API healthy?")
+    ids["projects"] = [project["id"] for project in json.loads(payload)]
+
+    for project_id in ids["projects"]:
+        status, payload = await request("GET", f"/api/projects/{project_id}", None)
+        if status == 200:
+            ids["categories"].extend(category["id"] for category in json.loads(payload).get("categories", []))
+    return ids
+
+
+async def run_load(
+    make_request: Callable[[], Tuple[RequestFn, Callable[[], Awaitable[None]]]],
+    weights: Dict[str, float],
+    users: int,
+    duration: Optional[float],
+    total_requests: Optional[int],
+    warmup: float,
+) -> Tuple[LoadStats, float]:
+    """
+    Run `users` concurrent virtual users until the duration or request budget is spent.
+    Requests issued during the warmup window are not recorded or counted.
+    """
+    stats = LoadStats()
+    scenario_names = list(weights)
+    scenario_weights = [weights[name] for name in scenario_names]
+
+    discovery_request, discovery_close = make_request()
+    ids = await discover_ids(discovery_request)
+    await discovery_close()
+
+    issued = 0
+    start = time.perf_counter()
+    measure_from = start + warmup
+    deadline = measure_from + duration if duration else None
+
+    def budget_left() -> bool:
+        if deadline is not None and time.perf_counter() >= deadline:
+            return False
+        if total_requests is not None and issued >= total_requests:
+            return False
+        return True
+
+    async def timed(route: str, awaitable):
+        nonlocal issued
+        begin = time.perf_counter()
+        measured = begin >= measure_from
+        if measured:
+            issued += 1
+        try:
+            status, _ = await awaitable
+        except Exception:
+            status = 599  # Connection-level failure
+        end = time.perf_counter()
+        if measured:
+            stats.record(route, end - begin, status)
+
+    async def virtual_user():
+        request, close = make_request()
+        try:
+            while budget_left():
+                name = random.choices(scenario_names, scenario_weights)[0]
+                await SCENARIOS[name](request, ids, timed)
+        finally:
+            await close()
+
+    await asyncio.gather(*(virtual_user() for _ in range(users)))
+    elapsed = time.perf_counter() - measure_from
+    return stats, elapsed
+
+
+def prepare_in_process_app(data_dir: Optional[str]):
+    """
+    Import app.main against a scratch copy of the data directory.
+    Write scenarios then never touch the real application_data.json.
+    """
+    scratch_dir = tempfile.mkdtemp(prefix="loadtest-")
+    source = data_dir or os.path.join(BACKEND_DIR, "data")
+    shutil.copytree(source, os.path.join(scratch_dir, "data"))
+
+    # DataService resolves its data file relative to the working directory
+    os.chdir(scratch_dir)
+    # Per-request log lines would drown out the report
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    sys.path.insert(0, BACKEND_DIR)
+    from app.main import app
+    return app, scratch_dir
+
+
+async def main_async(args) -> Dict[str, Any]:
+    weights = parse_mix(args.mix)
+    scratch_dir = None
+
+    if args.url:
+        parts = urlsplit(args.url)
+        host, port = parts.hostname or "127.0.0.1", parts.port or 80
+        target = args.url
+
+        def make_request():
+            connection = HttpConnection(host, port)
+            return connection.request, connection.close
+
+        client = None
+    else:
+        app, scratch_dir = prepare_in_process_app(args.data_dir)
+        client = InProcessClient(app)
+        await client.startup()
+        target = "in-process"
+
+        async def noop():
+            return None
+
+        def make_request():
+            return client.request, noop
+
+    try:
+        stats, elapsed = await run_load(
+            make_request,
+            weights,
+            users=args.users,
+            duration=args.duration if args.requests is None else None,
+            total_requests=args.requests,
+            warmup=args.warmup,
+        )
+    finally:
+        if client is not None:
+            await client.shutdown()
+        if scratch_dir and not args.keep_data:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    settings = {
+        "target": target,
+        "users": args.users,
+        "duration": args.duration,
+        "requests": args.requests,
+        "warmup": args.warmup,
+        "mix": weights,
+    }
+    return stats.report(elapsed, settings)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Concurrent load test for the Construction Management API")
+    parser.add_argument("--url", help="Base URL of a running server, e.g. http://127.0.0.1:8000. "
+                                      "Omit to drive the app in-process against a scratch copy of the data.")
+    parser.add_argument("--users", type=int, default=10, help="Concurrent virtual users (default: 10)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run after warmup (default: 10)")
+    parser.add_argument("--requests", type=int, help="Stop after this many requests instead of a duration")
+    parser.add_argument("--warmup", type=float, default=1.0, help="Seconds of unrecorded warmup (default: 1)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Scenario weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--data-dir", help="Data directory to copy for in-process runs (default: backend/data)")
+    parser.add_argument("--keep-data", action="store_true", help="Keep the scratch data copy after the run")
+    parser.add_argument("--json", metavar="PATH", help="Also write the report as JSON ('-' for stdout)")
+    parser.add_argument("--seed", type=int, help="Random seed for a repeatable request sequence")
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+    if args.seed is not None:
+        random.seed(args.seed)
+    if args.url and "write" in parse_mix(args.mix):
+        print("⚠️  The write scenario creates real projects on the target server.")
+
+    report = asyncio.run(main_async(args))
+
+    if args.json == "-":
+        print(json.dumps(report, indent=2))
+        return
+    print(format_table(report))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        print(f"\n📄 JSON report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
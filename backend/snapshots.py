@@ -0,0 +1,107 @@
+# Point-in-time Snapshots of the Data File
+# File: backend/snapshots.py
+#
+# Take, list, compare and restore incremental snapshots of data/application_data.json
+# (see app/services/snapshot_store.py). Uses the same settings as the server.
+#
+#   python snapshots.py list
+#   python snapshots.py create --label "before import"
+#   python snapshots.py diff 20250101T090000000000Z 20250102T090000000000Z
+#   python snapshots.py export 20250101T090000000000Z --output old.json
+#   python snapshots.py restore 20250101T090000000000Z
+#   python snapshots.py prune --keep-last 10 --keep-daily 7
+
+import argparse
+import json
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _print_snapshots(snapshots):
+    if not snapshots:
+        print("No snapshots yet")
+        return
+    print(f"{'id':<30} {'created':<30} {'records':>8} {'new objects':>12}  label")
+    for snapshot in snapshots:
+        print(f"{snapshot['id']:<30} {snapshot['createdAt']:<30} {snapshot['records']:>8} "
+              f"{snapshot['objectsWritten']:>12}  {snapshot['label']}")
+
+
+def _print_diff(diff):
+    if not diff["collections"]:
+        print(f"No differences between {diff['from']} and {diff['to']}")
+        return
+    for name, changes in diff["collections"].items():
+        if changes.get("changed") is True:
+            print(f"{name}: changed")
+            continue
+        print(f"{name}: {len(changes['added'])} added, {len(changes['removed'])} removed, "
+              f"{len(changes['changed'])} changed")
+        for kind in ("added", "removed", "changed"):
+            if changes[kind]:
+                print(f"  {kind}: {', '.join(str(record_id) for record_id in changes[kind])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage point-in-time snapshots of the data file")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="list snapshots, newest first")
+    create = commands.add_parser("create", help="snapshot the current data")
+    create.add_argument("--label", default="", help="note stored with the snapshot")
+    diff = commands.add_parser("diff", help="records added, removed and changed between two snapshots")
+    diff.add_argument("from_id")
+    diff.add_argument("to_id")
+    diff.add_argument("--json", action="store_true", help="print the diff as JSON")
+    export = commands.add_parser("export", help="write a snapshot's data to a file without restoring it")
+    export.add_argument("snapshot_id")
+    export.add_argument("--output", required=True)
+    restore = commands.add_parser("restore", help="replace the data with a snapshot's version")
+    restore.add_argument("snapshot_id")
+    prune = commands.add_parser("prune", help="apply a retention policy now")
+    prune.add_argument("--keep-last", type=int, default=None)
+    prune.add_argument("--keep-daily", type=int, default=None)
+    args = parser.parse_args()
+
+    # Data paths in the settings are relative to backend/
+    os.chdir(BACKEND_DIR)
+    sys.path.insert(0, BACKEND_DIR)
+    from app.core import config
+    from app.services.data_service import DataService
+    from app.services.snapshot_store import SnapshotNotFoundError, SnapshotStore
+
+    store = SnapshotStore(config.SNAPSHOT_DIR, keep_last=config.SNAPSHOT_KEEP_LAST,
+                          keep_daily=config.SNAPSHOT_KEEP_DAILY)
+    data_service = DataService(snapshots=store)
+
+    try:
+        if args.command == "list":
+            _print_snapshots(store.list_snapshots())
+        elif args.command == "create":
+            manifest = data_service.create_snapshot(args.label)
+            print(f"Created {manifest['id']}: {manifest['records']} records, "
+                  f"{manifest['objectsWritten']} new objects ({manifest['bytesWritten']} bytes)")
+        elif args.command == "diff":
+            result = store.diff(args.from_id, args.to_id)
+            if args.json:
+                print(json.dumps(result, indent=2))
+            else:
+                _print_diff(result)
+        elif args.command == "export":
+            with open(args.output, "w", encoding="utf-8") as file:
+                json.dump(store.load(args.snapshot_id), file, indent=2, ensure_ascii=False)
+            print(f"Wrote {args.snapshot_id} to {args.output}")
+        elif args.command == "restore":
+            result = data_service.restore_snapshot(args.snapshot_id)
+            print(f"Restored {result['restored']}; the previous data is snapshot {result['previousSnapshot']}")
+        elif args.command == "prune":
+            snapshots, objects = store.prune(args.keep_last, args.keep_daily)
+            print(f"Deleted {snapshots} snapshots and {objects} unreferenced objects")
+    except SnapshotNotFoundError as e:
+        print(f"❌ Snapshot not found: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
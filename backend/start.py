@@ -1,10 +1,18 @@
 # Simple Backend Startup Script
 # File: backend/start.py
 
+import argparse
 import subprocess
 import sys
 import os
 import time
+from importlib import metadata
+
+# Recorded before anything else so workers can report the full launch-to-ready time
+LAUNCH_STARTED = time.time()
+
+# Packages the server cannot run without; the rest of requirements.txt is dev tooling
+RUNTIME_PACKAGES = {"fastapi", "starlette", "uvicorn", "pydantic", "anyio", "python-decouple"}
 
 def check_python():
     """Check if Python is available and the right version."""
@@ -20,6 +28,33 @@ def check_python():
         print(f"❌ Error checking Python version: {e}")
         return False
 
+def read_requirements(path="requirements.txt"):
+    """Parse pinned 'name==version' lines from requirements.txt."""
+    pins = {}
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            line = line.split("#", 1)[0].strip()
+            if "==" in line:
+                name, version = line.split("==", 1)
+                pins[name.strip().lower()] = version.strip()
+    return pins
+
+def check_dependencies(path="requirements.txt"):
+    """
+    Compare installed package versions against requirements.txt using importlib.metadata.
+    This takes milliseconds, unlike running pip. Returns (missing, mismatched) package lists.
+    """
+    missing, mismatched = [], []
+    for name, pinned in read_requirements(path).items():
+        try:
+            installed = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            missing.append(name)
+            continue
+        if installed != pinned:
+            mismatched.append(f"{name} {installed} (pinned {pinned})")
+    return missing, mismatched
+
 def install_dependencies():
     """Install required dependencies if they're not already installed."""
     print("📦 Checking dependencies...")
@@ -29,6 +64,11 @@ def install_dependencies():
             print("❌ requirements.txt not found")
             return False
         
+        missing, mismatched = check_dependencies()
+        if not missing and not mismatched:
+            print("✅ Dependencies already installed")
+            return True
+        
         # Try to install dependencies
         print("🔄 Installing dependencies from requirements.txt...")
         result = subprocess.run([
@@ -46,14 +86,15 @@ def install_dependencies():
         print(f"❌ Error installing dependencies: {e}")
         return False
 
-def start_backend():
+def start_backend(host="127.0.0.1", port=8000, workers=1, reload=True):
     """Start the FastAPI backend server."""
     print("\n🚀 Starting Construction Management Backend...")
     print("=" * 60)
-    print("📍 Server will be available at: http://localhost:8000")
-    print("📋 Quick form available at: http://localhost:8000/simple-form")
-    print("📚 API documentation at: http://localhost:8000/docs")
+    print(f"📍 Server will be available at: http://{host}:{port}")
+    print(f"📚 API documentation at: http://{host}:{port}/docs")
     print("🖥️  Frontend (if running): http://localhost:3000")
+    if workers > 1:
+        print(f"⚙️  Running {workers} worker processes")
     print("⏹️  Press Ctrl+C to stop the server")
     print("=" * 60)
     
@@ -65,7 +106,7 @@ def start_backend():
         
         # Start the server using Python directly
         from app.main import start_server
-        start_server()
+        start_server(host=host, port=port, workers=workers, reload=reload)
         
     except KeyboardInterrupt:
         print("\n\n⏹️  Server stopped by user")
@@ -74,17 +115,33 @@ def start_backend():
         print("❌ Could not import the main app. Make sure you're in the backend directory.")
         print("🔄 Trying alternative startup method...")
         try:
-            subprocess.run([
-                sys.executable, "-m", "uvicorn", "app.main:app", 
-                "--reload", "--host", "127.0.0.1", "--port", "8000"
-            ])
+            command = [
+                sys.executable, "-m", "uvicorn", "app.main:app",
+                "--host", host, "--port", str(port)
+            ]
+            command += ["--workers", str(workers)] if workers > 1 else (["--reload"] if reload else [])
+            subprocess.run(command)
         except Exception as e:
             print(f"❌ Failed to start server: {e}")
     except Exception as e:
         print(f"❌ Error starting server: {e}")
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Start the Construction Management backend")
+    parser.add_argument("--prod", action="store_true",
+                        help="Production mode: no pip install, no reload, one worker per CPU")
+    parser.add_argument("--workers", type=int,
+                        help="Worker processes (default: CPU count with --prod, otherwise 1)")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="Port to bind (default: 8000)")
+    return parser.parse_args()
+
 def main():
     """Main startup function."""
+    args = parse_args()
+    # Workers report time-to-ready relative to this moment
+    os.environ["APP_LAUNCH_STARTED"] = str(LAUNCH_STARTED)
+
     print("🏗️  Construction Management Backend Startup")
     print("=" * 50)
     
@@ -92,15 +149,37 @@ def main():
     if not check_python():
         sys.exit(1)
     
+    if args.prod:
+        # Production: never run pip, just verify what's installed
+        if not os.path.exists("requirements.txt") and os.path.exists("backend"):
+            os.chdir("backend")
+        missing, mismatched = check_dependencies()
+        missing_runtime = [name for name in missing if name in RUNTIME_PACKAGES]
+        if missing_runtime:
+            print(f"❌ Missing required packages: {', '.join(missing_runtime)}")
+            print("📍 Install them with: pip install -r requirements.txt")
+            sys.exit(1)
+        for entry in mismatched:
+            if entry.split()[0] in RUNTIME_PACKAGES:
+                print(f"⚠️  Version differs from requirements.txt: {entry}")
+        other_differences = len([e for e in mismatched if e.split()[0] not in RUNTIME_PACKAGES])
+        if other_differences:
+            print(f"ℹ️  {other_differences} other package(s) differ from requirements.txt (not needed at runtime)")
+        print(f"✅ Dependency check finished in {(time.time() - LAUNCH_STARTED) * 1000:.0f} ms")
+        
+        workers = args.workers or os.cpu_count() or 1
+        if workers > 1:
+            # Workers share one parsed copy of each data version instead of each parsing the JSON
+            os.environ.setdefault("SHARED_SNAPSHOT_ENABLED", "true")
+        start_backend(host=args.host, port=args.port, workers=workers, reload=False)
+        return
+    
     # Install dependencies
     if not install_dependencies():
         print("⚠️  Continuing anyway, dependencies might already be installed...")
     
-    # Add a small delay for readability
-    time.sleep(1)
-    
     # Start the backend
-    start_backend()
+    start_backend(host=args.host, port=args.port, workers=args.workers or 1, reload=True)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
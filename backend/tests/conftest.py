@@ -0,0 +1,44 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_DATA = os.path.join(BACKEND_DIR, "data", "application_data.json")
+
+# Tests import the app as `app`, as uvicorn does when run from backend/
+sys.path.insert(0, BACKEND_DIR)
+
+from app.services.change_log import ChangeLog  # noqa: E402
+from app.services.data_service import DataService  # noqa: E402
+from app.services.snapshot_store import SnapshotStore  # noqa: E402
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """A scratch copy of the sample data file."""
+    shutil.copy(SAMPLE_DATA, tmp_path / "application_data.json")
+    return tmp_path
+
+
+@pytest.fixture
+def data_service(data_dir):
+    """A DataService over a scratch copy of the sample data, with snapshots and a change log."""
+    return DataService(
+        str(data_dir / "application_data.json"),
+        snapshots=SnapshotStore(str(data_dir / "snapshots")),
+        change_log=ChangeLog(str(data_dir / "changes")),
+    )
+
+
+@pytest.fixture
+def api(data_service, tmp_path, monkeypatch):
+    """The FastAPI app, serving data_service. Imported from a scratch directory so its
+    module-level services never touch backend/data."""
+    monkeypatch.chdir(tmp_path)
+    from fastapi.testclient import TestClient
+
+    from app import main
+    monkeypatch.setattr(main, "data_service", data_service)
+    return TestClient(main.app)
@@ -0,0 +1,50 @@
+import random
+import time
+
+from app.services.award_optimizer import AwardProblem, solve
+
+
+def random_bids(categories: int, vendors: int, seed: int = 1):
+    rng = random.Random(seed)
+    return {
+        category_id: {vendor_id: rng.randint(1000, 10000) for vendor_id in rng.sample(range(1, vendors + 1), 4)}
+        for category_id in range(1, categories + 1)
+    }
+
+
+def test_small_portfolio_is_solved_exactly():
+    bids = {1: {1: 100, 2: 120}, 2: {1: 200, 2: 150}, 3: {1: 300, 2: 310}}
+    result = solve(AwardProblem(bids))
+    assert result["method"] == "exact"
+    assert result["assignment"] == {1: 1, 2: 2, 3: 1}
+    assert result["cost"] == 550
+
+
+def test_required_vendor_is_placed_where_it_costs_least():
+    bids = {1: {1: 100, 2: 130}, 2: {1: 200, 2: 210}, 3: {1: 300, 2: 400}}
+    result = solve(AwardProblem(bids, required_vendors={2}))
+    assert result["feasible"]
+    assert result["assignment"] == {1: 1, 2: 2, 3: 1}
+
+
+def test_bundle_discount_and_max_per_vendor():
+    bids = {1: {1: 100, 2: 105}, 2: {1: 100, 2: 105}, 3: {1: 100, 2: 105}}
+    discounted = solve(AwardProblem(bids, bundle_discounts={2: [(3, 0.1)]}))
+    assert discounted["assignment"] == {1: 2, 2: 2, 3: 2}
+    capped = solve(AwardProblem(bids, max_per_vendor=2, bundle_discounts={2: [(3, 0.1)]}))
+    assert capped["feasible"] and max(list(capped["assignment"].values()).count(v) for v in (1, 2)) <= 2
+
+
+def test_large_portfolio_with_required_vendors_respects_time_limit():
+    bids = random_bids(3000, 60)
+    # Required vendors that bid everywhere but never win on price, so every one has to be placed
+    required = set(range(101, 111))
+    for vendor_bids in bids.values():
+        for vendor_id in required:
+            vendor_bids[vendor_id] = 20000
+    start = time.perf_counter()
+    result = solve(AwardProblem(bids, required_vendors=required), time_limit=1.0)
+    elapsed = time.perf_counter() - start
+    assert elapsed < 3.0
+    assert result["feasible"]
+    assert required <= set(result["assignment"].values())
@@ -0,0 +1,108 @@
+import asyncio
+import concurrent.futures
+import csv
+import io
+import zipfile
+
+from app.services import bid_tab
+from app.services.bid_tab import BidTabReports
+
+PROJECT = {"id": 1, "name": "Downtown Office", "client": "Metro", "bidDeadline": "2025-08-15"}
+CATEGORIES = [
+    {"id": 10, "projectId": 1, "name": "Steel", "estimatedValue": 100000, "vendorParticipation": [
+        {"vendorId": 1, "bidAmount": 90000, "bidStatus": "selected"},
+        {"vendorId": 2, "bidAmount": 110000, "bidStatus": "submitted"},
+        {"vendorId": 3, "bidAmount": 0, "bidStatus": "invited"},
+    ]},
+    {"id": 11, "projectId": 1, "name": "Concrete", "estimatedValue": 50000, "vendorParticipation": [
+        {"vendorId": 2, "bidAmount": 48000, "bidStatus": "submitted"},
+    ]},
+]
+
+
+def report_data():
+    return bid_tab.report_input(PROJECT, CATEGORIES, {1: "SteelCorp", 2: "Metro Steel", 3: "Idle Co"})
+
+
+class DoneExecutor:
+    """Hands back futures that are already finished, as a pool does for very fast or rejected work."""
+
+    def submit(self, function, *args):
+        future = concurrent.futures.Future()
+        future.set_result(function(*args))
+        return future
+
+
+def test_tabulate_rows_and_totals():
+    header, rows = bid_tab.tabulate(report_data())
+    assert header[:6] == ["Category", "Estimate", "SteelCorp", "SteelCorp vs estimate %",
+                          "Metro Steel", "Metro Steel vs estimate %"]
+    steel, concrete, total = rows
+    assert steel[:6] == ["Steel", 100000, 90000, -10.0, 110000, 10.0]
+    # Low bid, low bidder, its deviation, then the award
+    assert steel[6:] == [90000, "SteelCorp", -10.0, "SteelCorp", 90000, -10.0]
+    assert concrete[2] is None and concrete[6:9] == [48000, "Metro Steel", -4.0]
+    assert total[:2] == ["Total", 150000] and total[-2] == 90000
+
+
+def test_report_input_digest_changes_with_bids():
+    before = bid_tab.input_digest(report_data())
+    CATEGORIES[1]["vendorParticipation"][0]["bidAmount"] = 47000
+    try:
+        assert bid_tab.input_digest(report_data()) != before
+    finally:
+        CATEGORIES[1]["vendorParticipation"][0]["bidAmount"] = 48000
+
+
+def test_finished_future_does_not_deadlock(tmp_path):
+    reports = BidTabReports(str(tmp_path))
+    reports._pool = DoneExecutor()
+
+    async def run():
+        paths = []
+        for report_format in ("csv", "xlsx", "html"):
+            paths.append(await asyncio.wait_for(reports.get("project-1", report_data(), report_format, 5), 5))
+        return paths
+
+    paths = asyncio.run(run())
+    assert len(set(paths)) == 3
+    assert not reports._running
+
+
+def test_back_to_back_reports_in_worker_pool(tmp_path):
+    reports = BidTabReports(str(tmp_path), workers=1)
+
+    async def run():
+        paths = {}
+        for report_format in ("csv", "xlsx", "html"):
+            paths[report_format] = await reports.get("project-1", report_data(), report_format, 60)
+        # Served from disk the second time round
+        again = await reports.get("project-1", report_data(), "csv", 60)
+        return paths, again
+
+    try:
+        paths, again = asyncio.run(run())
+    finally:
+        reports.shutdown()
+
+    assert again == paths["csv"]
+    with open(paths["csv"], encoding="utf-8-sig") as file:
+        rows = list(csv.reader(io.StringIO(file.read())))
+    assert rows[3][0] == "Category" and rows[-1][0] == "Total"
+    with zipfile.ZipFile(paths["xlsx"]) as archive:
+        assert "xl/worksheets/sheet1.xml" in archive.namelist()
+    with open(paths["html"], encoding="utf-8") as file:
+        assert "<h1>Bid tabulation - Downtown Office</h1>" in file.read()
+
+
+def test_new_version_replaces_old(tmp_path):
+    reports = BidTabReports(str(tmp_path))
+    reports._pool = DoneExecutor()
+    first = asyncio.run(reports.get("project-1", report_data(), "csv", 5))
+    CATEGORIES[0]["vendorParticipation"][1]["bidAmount"] = 105000
+    try:
+        second = asyncio.run(reports.get("project-1", report_data(), "csv", 5))
+    finally:
+        CATEGORIES[0]["vendorParticipation"][1]["bidAmount"] = 110000
+    assert first != second
+    assert sorted(path.name for path in tmp_path.iterdir()) == [second.rsplit("/", 1)[1]]
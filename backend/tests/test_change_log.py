@@ -0,0 +1,53 @@
+from app.services.change_log import CREATED, UPDATED, ChangeLog
+
+
+def test_since_pages_through_changes(tmp_path):
+    log = ChangeLog(str(tmp_path))
+    assert log.append([("vendors", 1, CREATED), ("vendors", 2, CREATED)]) == 2
+    assert log.append([("vendors", 1, UPDATED)]) == 3
+
+    first = log.since(0, limit=2)
+    assert [entry[:4] for entry in first["entries"]] == [(1, "vendors", 1, CREATED), (2, "vendors", 2, CREATED)]
+    assert first["hasMore"] and not first["resync"] and first["latestSeq"] == 3
+    rest = log.since(2, limit=2)
+    assert [entry[0] for entry in rest["entries"]] == [3] and not rest["hasMore"]
+    assert log.since(3)["entries"] == []
+
+
+def test_since_across_compaction(tmp_path):
+    log = ChangeLog(str(tmp_path), max_entries=10)
+    for record_id in range(1, 12):
+        log.append([("projects", record_id, CREATED)])
+    # Eleven entries went past max_entries, so only the newest five are kept
+    assert log._compacted_through == 6
+    assert log.latest_seq() == 11
+
+    kept = log.since(6)
+    assert [entry[0] for entry in kept["entries"]] == [7, 8, 9, 10, 11]
+    assert not kept["resync"]
+    assert [entry[0] for entry in log.since(9)["entries"]] == [10, 11]
+
+    # Numbering carries on after compaction, also for another process opening the log
+    assert ChangeLog(str(tmp_path), max_entries=10).append([("projects", 12, CREATED)]) == 12
+    assert log.since(11)["entries"][0][:3] == (12, "projects", 12)
+
+
+def test_resync_when_changes_were_compacted_away(tmp_path):
+    log = ChangeLog(str(tmp_path), max_entries=10)
+    for record_id in range(1, 12):
+        log.append([("projects", record_id, CREATED)])
+
+    behind = log.since(3)
+    assert behind["resync"] and behind["entries"] == [] and behind["latestSeq"] == 11
+    # A sequence number from a log that no longer exists
+    assert log.since(500)["resync"]
+
+
+def test_get_changes_resync(data_service):
+    data_service.change_log.max_entries = 4
+    for index in range(6):
+        data_service.add_vendor({"name": f"Vendor {index}", "email": f"v{index}@example.com"})
+
+    assert data_service.get_changes(0)["resync"]
+    latest = data_service.get_changes(data_service.change_log.latest_seq())
+    assert not latest["resync"] and latest["changes"] == []
@@ -0,0 +1,90 @@
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.core.idempotency import IdempotencyMiddleware
+from app.services.idempotency import IN_PROGRESS, PROCEED, IdempotencyStore
+
+
+def make_client(store):
+    created = []
+
+    async def create(request):
+        body = await request.json()
+        created.append(body)
+        return JSONResponse({"id": len(created), **body}, status_code=201)
+
+    app = Starlette(routes=[Route("/items", create, methods=["POST"])])
+    app.add_middleware(IdempotencyMiddleware, store=store, paths=["/items"])
+    return TestClient(app), created
+
+
+def test_retry_replays_the_stored_response(tmp_path):
+    client, created = make_client(IdempotencyStore(str(tmp_path)))
+
+    first = client.post("/items", json={"name": "Steel"}, headers={"Idempotency-Key": "k1"})
+    retry = client.post("/items", json={"name": "Steel"}, headers={"Idempotency-Key": "k1"})
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json() == {"id": 1, "name": "Steel"}
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert len(created) == 1
+    # Without a key every request runs
+    client.post("/items", json={"name": "Steel"})
+    assert len(created) == 2
+
+
+def test_key_reused_for_another_request_is_rejected(tmp_path):
+    client, created = make_client(IdempotencyStore(str(tmp_path)))
+    client.post("/items", json={"name": "Steel"}, headers={"Idempotency-Key": "k1"})
+
+    response = client.post("/items", json={"name": "Concrete"}, headers={"Idempotency-Key": "k1"})
+
+    assert response.status_code == 422
+    assert len(created) == 1
+
+
+def test_key_pending_for_another_request_is_rejected(tmp_path):
+    store = IdempotencyStore(str(tmp_path), pending_timeout=60)
+    client, created = make_client(store)
+    # Another worker has claimed the key and is still running the request
+    fingerprint = "0" * 64
+    assert store.begin("k1", fingerprint) == (PROCEED, None)
+    assert store.begin("k1", fingerprint) == (IN_PROGRESS, None)
+
+    response = client.post("/items", json={"name": "Steel"}, headers={"Idempotency-Key": "k1"})
+
+    assert response.status_code == 422
+    assert created == []
+
+
+def test_concurrent_retry_gets_409_with_retry_after(tmp_path):
+    store = IdempotencyStore(str(tmp_path), pending_timeout=60)
+    client, created = make_client(store)
+    store.complete = lambda *args: None  # the first request never finishes
+    client.post("/items", json={"name": "Steel"}, headers={"Idempotency-Key": "k1"})
+
+    response = client.post("/items", json={"name": "Steel"}, headers={"Idempotency-Key": "k1"})
+
+    assert response.status_code == 409
+    assert response.headers["Retry-After"] == "1"
+    assert len(created) == 1
+
+
+def test_server_error_releases_the_key(tmp_path):
+    store = IdempotencyStore(str(tmp_path))
+    calls = []
+
+    async def flaky(request):
+        calls.append(1)
+        return JSONResponse({"ok": len(calls) > 1}, status_code=500 if len(calls) == 1 else 201)
+
+    app = Starlette(routes=[Route("/items", flaky, methods=["POST"])])
+    app.add_middleware(IdempotencyMiddleware, store=store, paths=["/items"])
+    client = TestClient(app)
+
+    assert client.post("/items", json={}, headers={"Idempotency-Key": "k1"}).status_code == 500
+    assert client.post("/items", json={}, headers={"Idempotency-Key": "k1"}).status_code == 201
+    assert len(calls) == 2
@@ -0,0 +1,98 @@
+import json
+
+import pytest
+
+from app.services.data_service import DataService
+from app.services.partitioned_store import (
+    SEQUENCES_PARTITION, SHARED_PARTITION, UNGROUPED_PARTITION, group_partition, merge_partitions,
+    split_partitions,
+)
+
+
+def read_partition(data_service, key):
+    with open(data_service._partition_path(key), encoding="utf-8") as file:
+        return json.load(file)
+
+
+def test_split_and_merge_round_trip(data_dir):
+    with open(data_dir / "application_data.json", encoding="utf-8") as file:
+        data = json.load(file)
+    data["sequences"] = {"projects": 4}
+    data["priceIndexes"] = {}
+
+    partitions = split_partitions(data)
+    assert set(partitions) == {SHARED_PARTITION, SEQUENCES_PARTITION, UNGROUPED_PARTITION,
+                               group_partition(1), group_partition(2)}
+    assert [p["id"] for p in partitions[group_partition(2)]["projects"]] == [1, 2, 3]
+    assert [c["projectId"] for c in partitions[group_partition(2)]["categories"]] == [1, 1]
+    assert partitions[group_partition(1)]["categories"] == []
+
+    merged = merge_partitions(partitions)
+    for name, value in data.items():
+        assert merged[name] == value, name
+
+
+def test_project_moves_between_groups(data_service):
+    categories = [c["id"] for c in data_service.snapshot()["categories"] if c["projectId"] == 1]
+    assert categories
+
+    assert data_service.update_project(1, {"groupId": 1})
+
+    new_group = read_partition(data_service, group_partition(1))
+    old_group = read_partition(data_service, group_partition(2))
+    assert 1 in [p["id"] for p in new_group["projects"]]
+    assert [c["id"] for c in new_group["categories"]] == categories
+    assert 1 not in [p["id"] for p in old_group["projects"]]
+    assert old_group["categories"] == []
+    # The groups' project lists follow the move
+    assert 1 in new_group["groups"][0]["projectIds"]
+    assert 1 not in old_group["groups"][0]["projectIds"]
+
+    # A fresh service reading the files sees the same data
+    reopened = DataService(data_service.data_file_path)
+    assert next(p for p in reopened.snapshot()["projects"] if p["id"] == 1)["groupId"] == 1
+
+
+def test_failed_transaction_writes_nothing(data_service):
+    before = json.dumps(data_service.snapshot(), sort_keys=True)
+    files = {key: read_partition(data_service, key)
+             for key in (SHARED_PARTITION, SEQUENCES_PARTITION, group_partition(1), group_partition(2))}
+
+    with pytest.raises(RuntimeError):
+        with data_service.transaction():
+            project = data_service.create_new_project({"name": "Annex", "groupId": 1})
+            data_service.add_category_to_project(project["id"], {"name": "Glazing"})
+            data_service.update_project(1, {"name": "Renamed"})
+            raise RuntimeError("abandon")
+
+    assert json.dumps(data_service.snapshot(), sort_keys=True) == before
+    for key, contents in files.items():
+        assert read_partition(data_service, key) == contents, key
+    assert data_service.get_changes(0)["changes"] == []
+
+
+def test_committed_transaction_writes_everything(data_service):
+    with data_service.transaction():
+        project = data_service.create_new_project({"name": "Annex", "groupId": 1})
+        category = data_service.add_category_to_project(project["id"], {"name": "Glazing"})
+
+    group = read_partition(data_service, group_partition(1))
+    assert project["id"] in [p["id"] for p in group["projects"]]
+    assert category["id"] in [c["id"] for c in group["categories"]]
+
+
+def test_moved_project_takes_its_bids_to_the_new_price_index(data_service):
+    category = next(c for c in data_service.snapshot()["categories"] if c["projectId"] == 1)
+    vendor_id = category["vendorParticipation"][0]["vendorId"]
+    data_service.update_vendor_bid(category["id"], vendor_id, {"bidAmount": 50000, "bidStatus": "submitted"})
+    before = data_service.get_price_index_summary(category["id"])["sampleSize"]
+
+    assert data_service.update_project(1, {"groupId": 1})
+    data_service.update_vendor_bid(category["id"], vendor_id, {"bidAmount": 51000})
+
+    assert data_service.get_price_index_summary(category["id"])["sampleSize"] == before
+    data = data_service.snapshot()
+    stored = {key: index for key, index in data["priceIndexes"].items() if index}
+    assert stored == data_service._compute_partition_price_indexes(data)
+    # Project 1 held the old group's only categories
+    assert not read_partition(data_service, group_partition(2)).get("priceIndex")
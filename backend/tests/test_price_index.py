@@ -0,0 +1,84 @@
+from app.services.price_index import trade_key
+
+
+def first_bid(data_service):
+    for category in data_service.snapshot()["categories"]:
+        for participation in category.get("vendorParticipation", []):
+            return category, participation
+    raise AssertionError("sample data has no bids")
+
+
+def assert_index_matches_rebuild(data_service):
+    data = data_service.snapshot()
+    stored = {key: index for key, index in data["priceIndexes"].items() if index}
+    assert stored == data_service._compute_partition_price_indexes(data)
+
+
+def test_revised_bid_counts_once(data_service):
+    category, participation = first_bid(data_service)
+    trade = trade_key(category["name"])
+    data_service.update_vendor_bid(category["id"], participation["vendorId"],
+                                   {"bidAmount": 12345, "bidStatus": "submitted"})
+    count = data_service._price_index(data_service.snapshot())[trade]["count"]
+
+    for amount in (12000, 11000, 10500):
+        data_service.update_vendor_bid(category["id"], participation["vendorId"], {"bidAmount": amount})
+
+    data = data_service.snapshot()
+    assert data_service._price_index(data)[trade]["count"] == count
+    assert data_service._compute_price_index(data["categories"])[trade]["count"] == count
+
+
+def test_stored_index_matches_rebuild(data_service):
+    category, participation = first_bid(data_service)
+    for amount in (50000, 42000, 0, 47000):
+        data_service.update_vendor_bid(category["id"], participation["vendorId"], {"bidAmount": amount})
+
+    assert_index_matches_rebuild(data_service)
+    assert data_service.get_price_index_summary(category["id"])["trade"] == category["name"]
+
+
+def sample_size(data_service, category_id):
+    return data_service.get_price_index_summary(category_id)["sampleSize"]
+
+
+def add_priced_category(data_service, name, amounts, group_id=None):
+    project = data_service.create_new_project({"name": "Annex", "groupId": group_id})
+    category = data_service.add_category_to_project(project["id"], {"name": name})
+    vendor_ids = [v["id"] for v in data_service.snapshot()["vendors"]][:len(amounts)]
+    for vendor_id, amount in zip(vendor_ids, amounts):
+        data_service.invite_vendor(category["id"], vendor_id)
+        data_service.update_vendor_bid(category["id"], vendor_id, {"bidAmount": amount, "bidStatus": "submitted"})
+    return project, category
+
+
+def test_deleted_bids_leave_the_index(data_service):
+    category, _ = first_bid(data_service)
+    before = sample_size(data_service, category["id"])
+
+    project, added = add_priced_category(data_service, category["name"], [50000, 60000])
+    assert sample_size(data_service, category["id"]) == before + 2
+    assert data_service.delete_category(added["id"])
+    assert sample_size(data_service, category["id"]) == before
+
+    project, added = add_priced_category(data_service, category["name"], [50000, 60000], group_id=1)
+    assert sample_size(data_service, category["id"]) == before + 2
+    assert data_service.delete_project(project["id"])
+    assert sample_size(data_service, category["id"]) == before
+    assert_index_matches_rebuild(data_service)
+
+
+def test_only_priced_bids_are_indexed(data_service):
+    category, participation = first_bid(data_service)
+    data_service.update_vendor_bid(category["id"], participation["vendorId"],
+                                   {"bidAmount": 50000, "bidStatus": "submitted"})
+    before = sample_size(data_service, category["id"])
+
+    data_service.update_vendor_bid(category["id"], participation["vendorId"], {"bidStatus": "declined"})
+    summary = data_service.get_price_index_summary(category["id"])
+    assert (summary["sampleSize"] if summary else 0) == before - 1
+    assert participation["vendorId"] not in [bid["vendorId"] for bid in (summary or {}).get("bids", [])]
+
+    data_service.update_vendor_bid(category["id"], participation["vendorId"], {"bidStatus": "selected"})
+    assert sample_size(data_service, category["id"]) == before
+    assert_index_matches_rebuild(data_service)
@@ -0,0 +1,44 @@
+import os
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.core.profiling import ProfilingMiddleware
+from app.core.single_flight import SingleFlight
+
+
+def build_report(size):
+    return sum(value * value for value in range(size))
+
+
+def make_client(tmp_path, coalescing=True):
+    single_flight = SingleFlight(enabled=coalescing)
+
+    async def report(request):
+        return JSONResponse({"total": await single_flight.run("/report", 1, build_report, 50_000)})
+
+    app = Starlette(routes=[Route("/report", report)])
+    app.add_middleware(ProfilingMiddleware, output_dir=str(tmp_path), token="secret")
+    return TestClient(app)
+
+
+def collapsed(tmp_path, response):
+    with open(os.path.join(tmp_path, response.headers["x-profile-id"] + ".collapsed"), encoding="utf-8") as file:
+        return file.read()
+
+
+def test_profile_includes_coalesced_threadpool_work(tmp_path):
+    for coalescing in (True, False):
+        client = make_client(tmp_path, coalescing)
+        response = client.get("/report", headers={"X-Profile": "secret"})
+        assert response.status_code == 200
+        assert "build_report (test_profiling.py" in collapsed(tmp_path, response)
+
+
+def test_unprofiled_requests_run_as_usual(tmp_path):
+    response = make_client(tmp_path).get("/report")
+    assert response.json() == {"total": build_report(50_000)}
+    assert "x-profile-id" not in response.headers
+    assert os.listdir(tmp_path) == []
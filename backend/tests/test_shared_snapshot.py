@@ -0,0 +1,54 @@
+import marshal
+import os
+import pickle
+import stat
+
+from app.services.shared_snapshot import SNAPSHOT_MAGIC, SharedSnapshot
+
+VERSION = (1700000000000000000, 1234, 42)
+DATA = {"vendors": [{"id": 101, "companyName": "SteelCorp", "rating": 4.5, "active": True, "notes": None}],
+        "categories": []}
+
+ran = []
+
+
+class Planted:
+    def __reduce__(self):
+        return ran.append, ("code ran",)
+
+
+def test_publish_then_load(tmp_path):
+    snapshots = SharedSnapshot(str(tmp_path))
+    snapshots.publish(VERSION, DATA)
+
+    assert snapshots.load(VERSION) == DATA
+    assert snapshots.load((1, 2, 3)) is None
+    path = snapshots._path(VERSION)
+    assert not os.stat(path).st_mode & (stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH)
+
+
+def test_load_or_publish_parses_once(tmp_path):
+    snapshots = SharedSnapshot(str(tmp_path))
+    loads = []
+    loader = lambda: loads.append(1) or DATA  # noqa: E731
+    assert snapshots.load_or_publish(VERSION, loader) == DATA
+    assert SharedSnapshot(str(tmp_path)).load_or_publish(VERSION, loader) == DATA
+    assert len(loads) == 1
+
+
+def test_planted_files_never_run_code(tmp_path):
+    snapshots = SharedSnapshot(str(tmp_path))
+    header = snapshots._key(VERSION).encode("ascii") + b"\n"
+    path = snapshots._path(VERSION)
+
+    # A pickle, in the old format or under the current header, is not decoded as one
+    for magic in (b"CMSNAP1\n", SNAPSHOT_MAGIC):
+        with open(path, "wb") as file:
+            file.write(magic + header + pickle.dumps(Planted()))
+        assert snapshots.load(VERSION) is None
+    assert ran == []
+
+    # Well-formed data of the wrong shape is ignored too
+    with open(path, "wb") as file:
+        file.write(SNAPSHOT_MAGIC + header + marshal.dumps([1, 2, 3]))
+    assert snapshots.load(VERSION) is None
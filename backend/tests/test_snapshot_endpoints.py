@@ -0,0 +1,14 @@
+def test_snapshot_endpoints(api):
+    created = api.post("/api/snapshots", json={"label": "before import"})
+    assert created.status_code == 200 and created.json()["label"] == "before import"
+    assert [s["id"] for s in api.get("/api/snapshots").json()] == [created.json()["id"]]
+    assert api.post("/api/snapshots/nope/restore").status_code == 404
+
+
+def test_snapshots_not_configured(api, data_service):
+    data_service.snapshots = None
+    for method, path in (("get", "/api/snapshots"), ("post", "/api/snapshots"),
+                         ("get", "/api/snapshots/diff?from_id=a&to_id=b"), ("post", "/api/snapshots/a/restore")):
+        response = getattr(api, method)(path)
+        assert response.status_code == 503, path
+        assert response.json() == {"detail": "Snapshots are not configured on this server"}
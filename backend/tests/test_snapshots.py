@@ -0,0 +1,29 @@
+def category_ids(data_service):
+    return {category["id"] for category in data_service.snapshot()["categories"]}
+
+
+def test_restore_brings_back_the_snapshot(data_service):
+    before = category_ids(data_service)
+    snapshot = data_service.create_snapshot("before")
+    data_service.add_category_to_project(1, {"name": "Glazing"})
+    assert category_ids(data_service) != before
+
+    result = data_service.restore_snapshot(snapshot["id"])
+    assert result["restored"] == snapshot["id"]
+    assert category_ids(data_service) == before
+
+
+def test_restore_never_reuses_ids(data_service):
+    snapshot = data_service.create_snapshot("before")
+    discarded = data_service.add_category_to_project(1, {"name": "Glazing"})
+    data_service.restore_snapshot(snapshot["id"])
+
+    created = data_service.add_category_to_project(1, {"name": "Roofing"})
+    assert created["id"] > discarded["id"]
+
+    changes = data_service.get_changes(0)["changes"]
+    assert ("categories", discarded["id"], "created") not in {
+        (change["collection"], change["id"], change["op"]) for change in changes
+    }
+    created_ids = [change["id"] for change in changes if change["collection"] == "categories"]
+    assert created_ids.count(created["id"]) == 1
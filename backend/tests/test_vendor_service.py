@@ -0,0 +1,112 @@
+import json
+import threading
+
+from app.services.data_service import DataService
+from app.services.vendor_service import (
+    MAX_OVERLAY_SIZE, VendorDuplicateIndex, normalize_company_name, normalize_phone,
+)
+
+
+def vendor(vendor_id, name, phone=None, zip_code=None, email=None):
+    return {"id": vendor_id, "companyName": name,
+            "contactInfo": {"phone": phone, "email": email}, "address": {"zipCode": zip_code}}
+
+
+def catalog(size):
+    return [vendor(i, f"Vendor {i} Supply", phone=f"555{i:07d}", zip_code=f"{10000 + i % 50}")
+            for i in range(1, size + 1)]
+
+
+def test_normalizers():
+    assert normalize_company_name("SteelCorp, Inc.") == normalize_company_name("Steelcorp")
+    assert normalize_company_name("Smith & Sons Corporation") == "smith sons corp"
+    assert normalize_phone("+1 (555) 123-4567") == "5551234567"
+
+
+def test_find_matches_on_name_and_phone():
+    index = VendorDuplicateIndex([vendor(1, "Metro Steel Supply LLC", phone="555-111-2222"),
+                                  vendor(2, "Pacific Concrete", phone="555-999-0000")])
+    matches = index.find(vendor(None, "Metro Steel Supply", phone="(555) 111-2222"))
+    assert [match["vendorId"] for match in matches] == [1]
+    assert matches[0]["reasons"]["phone"] == "5551112222"
+
+
+def test_extended_matches_a_rebuild_and_leaves_the_original_alone():
+    vendors = catalog(300) + [vendor(9001, "Vendor 7 Supply Inc", phone="5550000007")]
+    base = VendorDuplicateIndex(vendors[:100])
+    index = base
+    for start in range(100, len(vendors), 7):
+        index = index.extended(vendors[start:start + 7])
+    rebuilt = VendorDuplicateIndex(vendors)
+
+    assert len(base) == 100 and len(index) == len(vendors)
+    assert index.report() == rebuilt.report()
+    probe = vendor(None, "Vendor 7 Supply", phone="5550000007")
+    assert index.find(probe) == rebuilt.find(probe)
+    assert [match["vendorId"] for match in base.find(probe)] == [7]
+
+
+def test_overlay_is_folded_into_a_new_base():
+    vendors = catalog(MAX_OVERLAY_SIZE + 20)
+    index = VendorDuplicateIndex(vendors[:10]).extended(vendors[10:MAX_OVERLAY_SIZE]).extended(vendors[MAX_OVERLAY_SIZE:])
+    assert len(index) == len(vendors)
+    assert len(index._keys) == MAX_OVERLAY_SIZE + 20 - len(index._base)
+    assert index.report() == VendorDuplicateIndex(vendors).report()
+
+
+def test_report_while_vendors_are_added(data_dir):
+    path = data_dir / "application_data.json"
+    data = json.loads(path.read_text())
+    data["vendors"] += [vendor(10000 + i, f"Bulk Vendor {i}", phone=f"555{i:07d}", zip_code="10001")
+                        for i in range(1500)]
+    path.write_text(json.dumps(data))
+    data_service = DataService(str(path))
+    errors = []
+
+    def report():
+        try:
+            for _ in range(3):
+                data_service.get_vendor_duplicate_report()
+        except Exception as error:  # noqa: BLE001 - any failure is what this test looks for
+            errors.append(error)
+
+    thread = threading.Thread(target=report)
+    thread.start()
+    for i in range(30):
+        new_vendor, _ = data_service.add_vendor({"companyName": f"Late Vendor {i}", "contactInfo": {},
+                                                 "address": {}})
+        data_service.find_duplicate_vendors(new_vendor)
+    thread.join()
+    assert errors == []
+
+
+def test_create_vendor_searches_for_duplicates_once(api, data_service, monkeypatch):
+    searches = []
+    find = data_service._find_duplicate_vendors
+    monkeypatch.setattr(data_service, "_find_duplicate_vendors",
+                        lambda *args, **kwargs: searches.append(1) or find(*args, **kwargs))
+    vendor = {
+        "companyName": "Steel Corp Inc",
+        "contactInfo": {"representative": "Sam Lee", "email": "sam@steelcorp.com", "phone": "555-123-4567"},
+        "specialties": ["Structural Steel"],
+        "address": {"street": "1 Main St", "city": "Pittsburgh", "state": "PA", "zipCode": "15201"},
+    }
+
+    response = api.post("/api/vendors", json=vendor)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [match["vendorId"] for match in body["possibleDuplicates"]][:1] == [101]
+    assert body["vendor"]["id"] not in [match["vendorId"] for match in body["possibleDuplicates"]]
+    assert len(searches) == 1
+
+    rejected = api.post("/api/vendors?reject_duplicates=true", json=vendor)
+    assert rejected.status_code == 409
+    assert len(searches) == 2
+
+    # A vendor that passes the duplicate check isn't searched for again after it is added
+    unique = {**vendor, "companyName": "Harbor Glazing", "address": {**vendor["address"], "zipCode": "02110"},
+              "contactInfo": {"representative": "Ana Ruiz", "email": "ana@harborglazing.com", "phone": "617-555-0199"}}
+    created = api.post("/api/vendors?reject_duplicates=true", json=unique)
+    assert created.status_code == 200 and created.json()["possibleDuplicates"] == []
+    assert len(searches) == 3
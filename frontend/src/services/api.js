@@ -84,6 +84,26 @@ export const fetchCategoryVendors = async (categoryId) => {
   return await apiRequest(`/api/categories/${categoryId}/vendors`);
 };
 
+/**
+ * Get several vendors in one request, in the order of vendorIds
+ * Pass include: ['stats'] to add each vendor's category count and bids by status
+ */
+export const fetchVendorsByIds = async (vendorIds, { include = [] } = {}) => {
+  const params = new URLSearchParams({ ids: vendorIds.join(',') });
+  if (include.length) params.set('include', include.join(','));
+  return await apiRequest(`/api/vendors?${params}`);
+};
+
+/**
+ * Get several categories in one request, in the order of categoryIds
+ * Pass include: ['vendors', 'project'] to add enriched vendors and the owning project
+ */
+export const fetchCategoriesByIds = async (categoryIds, { include = [] } = {}) => {
+  const params = new URLSearchParams({ ids: categoryIds.join(',') });
+  if (include.length) params.set('include', include.join(','));
+  return await apiRequest(`/api/categories/batch?${params}`);
+};
+
 /**
  * Health check function to verify backend connectivity
  * This is useful for debugging connection issues during development